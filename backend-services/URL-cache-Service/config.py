@@ -17,6 +17,40 @@ class Settings(BaseSettings):
     # Cache TTL Configuration
     CACHE_TTL_DAYS: int = int(os.getenv("CACHE_TTL_DAYS"))
     
+    # Expired reports are still served (marked stale) for this long while they are refreshed
+    CACHE_STALE_GRACE_HOURS: float = float(os.getenv("CACHE_STALE_GRACE_HOURS", "24"))
+
+    # Delete entries with a TTL index once they are past the grace window
+    # (makes /cleanup a no-op); without it, /cleanup has to be run by a cron job
+    CACHE_TTL_INDEX_ENABLED: bool = os.getenv("CACHE_TTL_INDEX_ENABLED", "true").lower() == "true"
+
+    # /stats counters: entries counted per expires_at bucket in a stats document,
+    # updated by this process every STATS_PERSIST_INTERVAL_SECONDS
+    STATS_COLLECTION: str = os.getenv("STATS_COLLECTION", "cache_stats")
+    STATS_BUCKET_SECONDS: int = int(os.getenv("STATS_BUCKET_SECONDS", "3600"))
+    STATS_PERSIST_INTERVAL_SECONDS: float = float(os.getenv("STATS_PERSIST_INTERVAL_SECONDS", "10"))
+
+    # In-process LRU tier in front of MongoDB, bounded by the BSON size of its documents
+    MEMORY_CACHE_ENABLED: bool = os.getenv("MEMORY_CACHE_ENABLED", "true").lower() == "true"
+    MEMORY_CACHE_MAX_BYTES: int = int(os.getenv("MEMORY_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+    # Cap on an entry's lifetime, bounds staleness across replicas of the service
+    MEMORY_CACHE_TTL_SECONDS: float = float(os.getenv("MEMORY_CACHE_TTL_SECONDS", "300"))
+
+    # Counting Bloom filter of cached url_hashes: /check-cache answers definite misses
+    # without a query. Sized for BLOOM_EXPECTED_ENTRIES at BLOOM_FALSE_POSITIVE_RATE
+    # (one byte per counter, about 9.6 MB for the defaults) and rebuilt from the
+    # collection every BLOOM_REBUILD_INTERVAL_SECONDS. Only used when this process is
+    # the only writer of the collection (BLOOM_SOLE_WRITER): a report stored through
+    # another replica would be reported missing until the next rebuild
+    BLOOM_FILTER_ENABLED: bool = os.getenv("BLOOM_FILTER_ENABLED", "true").lower() == "true"
+    BLOOM_SOLE_WRITER: bool = os.getenv("BLOOM_SOLE_WRITER", "false").lower() == "true"
+    BLOOM_EXPECTED_ENTRIES: int = int(os.getenv("BLOOM_EXPECTED_ENTRIES", "1000000"))
+    BLOOM_FALSE_POSITIVE_RATE: float = float(os.getenv("BLOOM_FALSE_POSITIVE_RATE", "0.01"))
+    BLOOM_REBUILD_INTERVAL_SECONDS: float = float(os.getenv("BLOOM_REBUILD_INTERVAL_SECONDS", "300"))
+
+    # Most URLs accepted by one /check-cache/batch or /store/batch call
+    BATCH_MAX_URLS: int = int(os.getenv("BATCH_MAX_URLS", "1000"))
+    
     # Tracking parameters to remove during URL normalization
     TRACKING_PARAMS: set = {
         'utm_source', 'utm_medium', 'utm_campaign', 'utm_term', 'utm_content',
@@ -0,0 +1,196 @@
+"""
+Negative-lookup filter - a counting Bloom filter of cached url_hashes, so definite misses skip MongoDB
+"""
+from typing import Dict, Any, Iterator, Optional, Set
+from datetime import datetime
+import logging
+import asyncio
+import math
+import time
+
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+# 8-bit counters; a saturated counter is never decremented again (no false negatives)
+MAX_COUNT = 255
+
+
+class CountingBloomFilter:
+    """
+    Bloom filter with a counter per slot, so entries can be removed again
+
+    Sized for `expected_entries` at `false_positive_rate`. Slot indexes
+    come from double hashing the url_hash itself (already a SHA-256 hex
+    digest), so no further hashing is needed.
+    """
+
+    def __init__(self, expected_entries: int, false_positive_rate: float):
+        self.size = max(8, math.ceil(-expected_entries * math.log(false_positive_rate) / math.log(2) ** 2))
+        self.hash_count = max(1, round(self.size / expected_entries * math.log(2)))
+        self._counters = bytearray(self.size)
+        self.entries = 0
+
+    def add(self, url_hash: str):
+        for index in self._indexes(url_hash):
+            if self._counters[index] < MAX_COUNT:
+                self._counters[index] += 1
+        self.entries += 1
+
+    def remove(self, url_hash: str):
+        """Remove an entry that was added before (removing anything else corrupts the filter)"""
+        for index in self._indexes(url_hash):
+            if 0 < self._counters[index] < MAX_COUNT:
+                self._counters[index] -= 1
+        self.entries = max(0, self.entries - 1)
+
+    def might_contain(self, url_hash: str) -> bool:
+        return all(self._counters[index] for index in self._indexes(url_hash))
+
+    def estimated_false_positive_rate(self) -> float:
+        """(1 - e^(-kn/m))^k for the current number of entries"""
+        return (1 - math.exp(-self.hash_count * self.entries / self.size)) ** self.hash_count
+
+    def _indexes(self, url_hash: str) -> Iterator[int]:
+        first = int(url_hash[:16], 16)
+        second = int(url_hash[16:32], 16) | 1
+        return ((first + i * second) % self.size for i in range(self.hash_count))
+
+
+class NegativeLookupFilter:
+    """
+    Answers /check-cache misses for url_hashes that were never stored, without a query
+
+    Only built when this process is the sole writer of the collection
+    (BLOOM_SOLE_WRITER): with other replicas storing reports, a miss here
+    proves nothing, so every lookup goes to MongoDB.
+
+    The filter is rebuilt from the collection on startup and every
+    BLOOM_REBUILD_INTERVAL_SECONDS; until the first build completes every
+    lookup goes to MongoDB. Stores and invalidations made through this
+    process update it directly. An invalidation only uncounts what the
+    filter counted (removing anything else could hide other entries);
+    entries left behind, like those deleted by the TTL index or /cleanup,
+    stay in the filter until the next rebuild, which only costs a query
+    (a false positive).
+    """
+
+    def __init__(self):
+        self._filter: Optional[CountingBloomFilter] = None
+        self._building: Optional[CountingBloomFilter] = None
+        # Stored through this process while a build runs (counted in it even if the scan missed them)
+        self._added_during_build: Set[str] = set()
+        self._task: Optional[asyncio.Task] = None
+        self._collection = None
+        self.built_at: Optional[datetime] = None
+        self.last_build_seconds = 0.0
+        self.build_failures = 0
+        self.definite_misses = 0
+        self.passed = 0
+        self.false_positives = 0
+
+    async def startup(self, collection):
+        """Start building the filter in the background (called on startup)"""
+        if settings.BLOOM_FILTER_ENABLED and settings.BLOOM_SOLE_WRITER:
+            self._collection = collection
+            self._task = asyncio.create_task(self._rebuild_loop())
+
+    async def shutdown(self):
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    def might_contain(self, url_hash: str) -> bool:
+        """False only when url_hash is certainly not cached"""
+        if self._filter is None:
+            return True
+        if self._filter.might_contain(url_hash):
+            self.passed += 1
+            return True
+        self.definite_misses += 1
+        return False
+
+    def record_false_positive(self):
+        """A lookup the filter let through found nothing"""
+        if self._filter is not None:
+            self.false_positives += 1
+
+    def add(self, url_hash: str):
+        """Count a newly stored url_hash (also in a filter being built)"""
+        if self._filter is not None:
+            self._filter.add(url_hash)
+        if self._building is not None:
+            self._building.add(url_hash)
+            self._added_during_build.add(url_hash)
+
+    def remove(self, url_hash: str):
+        """
+        Uncount an invalidated url_hash, in the filters that counted it
+
+        The current filter counted every document in the collection (it is
+        only built for a sole writer), unless the document was written
+        around the service; a url_hash it never saw is left alone. A filter
+        being built only counted the documents its scan has reached so far,
+        which are unknown, so only those stored during the build are removed.
+        """
+        if self._filter is not None and self._filter.might_contain(url_hash):
+            self._filter.remove(url_hash)
+        if self._building is not None and url_hash in self._added_during_build:
+            self._added_during_build.discard(url_hash)
+            self._building.remove(url_hash)
+
+    async def rebuild(self):
+        """Build a new filter from every url_hash in the collection, then swap it in"""
+        started = time.monotonic()
+        self._building = CountingBloomFilter(settings.BLOOM_EXPECTED_ENTRIES, settings.BLOOM_FALSE_POSITIVE_RATE)
+        try:
+            async for document in self._collection.find({}, {"url_hash": 1, "_id": 0}).batch_size(10000):
+                if document.get("url_hash"):
+                    self._building.add(document["url_hash"])
+            self._filter = self._building
+        finally:
+            self._building = None
+            self._added_during_build = set()
+
+        self.built_at = datetime.utcnow()
+        self.last_build_seconds = time.monotonic() - started
+        logger.info(f"Negative-lookup filter rebuilt with {self._filter.entries} entries in {self.last_build_seconds:.2f}s")
+
+    def stats(self) -> Dict[str, Any]:
+        """Filter size, configured and estimated false-positive rates, and lookups answered"""
+        bloom = self._filter
+        filtered = self.definite_misses + self.false_positives
+        return {
+            "enabled": settings.BLOOM_FILTER_ENABLED,
+            "sole_writer": settings.BLOOM_SOLE_WRITER,
+            "ready": bloom is not None,
+            "entries": bloom.entries if bloom else 0,
+            "expected_entries": settings.BLOOM_EXPECTED_ENTRIES,
+            "counters": bloom.size if bloom else 0,
+            "bytes": bloom.size if bloom else 0,
+            "hash_functions": bloom.hash_count if bloom else 0,
+            "target_false_positive_rate": settings.BLOOM_FALSE_POSITIVE_RATE,
+            "estimated_false_positive_rate": round(bloom.estimated_false_positive_rate(), 6) if bloom else None,
+            # Among lookups of uncached URLs: the share the filter failed to answer
+            "observed_false_positive_rate": round(self.false_positives / filtered, 6) if filtered else None,
+            "definite_misses": self.definite_misses,
+            "passed_to_database": self.passed,
+            "false_positives": self.false_positives,
+            "built_at": self.built_at.isoformat() if self.built_at else None,
+            "last_build_seconds": round(self.last_build_seconds, 3),
+            "build_failures": self.build_failures
+        }
+
+    async def _rebuild_loop(self):
+        while True:
+            try:
+                await self.rebuild()
+            except Exception as e:
+                self.build_failures += 1
+                logger.warning(f"Rebuilding the negative-lookup filter failed: {str(e)}")
+            await asyncio.sleep(settings.BLOOM_REBUILD_INTERVAL_SECONDS)
+
+
+# Global negative-lookup filter (built on startup)
+negative_filter = NegativeLookupFilter()
@@ -2,9 +2,15 @@
 MongoDB connection management and database operations
 """
 from motor.motor_asyncio import AsyncIOMotorClient
-from typing import Dict, Any, Optional
+from pymongo import UpdateOne, ReturnDocument
+from typing import Dict, Any, List, Optional
+from datetime import datetime, timedelta
 import logging
 from config import settings
+from db.memory_cache import memory_cache
+from db.indexes import index_manager
+from db.stats_counters import cache_counters
+from db.bloom_filter import negative_filter
 
 logger = logging.getLogger(__name__)
 
@@ -15,10 +21,24 @@ async def startup_db_client():
     global mongo_client
     mongo_client = AsyncIOMotorClient(settings.MONGO_URI)
     logger.info("MongoDB client initialized")
+    
+    try:
+        await index_manager.ensure(get_collection())
+    except Exception as e:
+        logger.error(f"Index management failed, queries will scan the collection: {str(e)}")
+    
+    try:
+        await cache_counters.startup(get_collection(), get_db()[settings.STATS_COLLECTION])
+    except Exception as e:
+        logger.error(f"Loading cache stats counters failed: {str(e)}")
+    
+    await negative_filter.startup(get_collection())
 
 
 async def shutdown_db_client():
     global mongo_client
+    await negative_filter.shutdown()
+    await cache_counters.shutdown()
     if mongo_client:
         mongo_client.close()
         logger.info("MongoDB client closed")
@@ -36,16 +56,84 @@ def get_collection():
 
 
 async def get_cached_report(url_hash: str) -> Optional[Dict[str, Any]]:
-    """Retrieve cached report from MongoDB"""
+    """Retrieve cached report from the in-memory tier or, failing that, MongoDB"""
+    cached = memory_cache.get(url_hash)
+    if cached is not None:
+        return cached
+
+    # Never stored (this process is the only writer): a definite miss, no query needed
+    if not negative_filter.might_contain(url_hash):
+        return None
+
     try:
         collection = get_collection()
+        read_generation = memory_cache.generation
         cached = await collection.find_one({"url_hash": url_hash})
+        if cached is not None:
+            memory_cache.put(url_hash, cached, read_generation)
+        else:
+            negative_filter.record_false_positive()
         return cached
     except Exception as e:
         logger.error(f"Cache retrieval error: {str(e)}")
         return None
 
 
+async def get_cached_reports(url_hashes: List[str]) -> Dict[str, Dict[str, Any]]:
+    """
+    Retrieve several cached reports, querying MongoDB once for those not in memory
+    (and not ruled out by the negative-lookup filter)
+    
+    Returns:
+        Dict mapping each cached url_hash to its document (misses are left out)
+    
+    Raises:
+        Exception: If the MongoDB query fails
+    """
+    found = {}
+    missing = []
+    for url_hash in dict.fromkeys(url_hashes):
+        cached = memory_cache.get(url_hash)
+        if cached is not None:
+            found[url_hash] = cached
+        elif negative_filter.might_contain(url_hash):
+            missing.append(url_hash)
+    
+    if missing:
+        collection = get_collection()
+        read_generation = memory_cache.generation
+        async for cached in collection.find({"url_hash": {"$in": missing}}):
+            found[cached["url_hash"]] = cached
+            memory_cache.put(cached["url_hash"], cached, read_generation)
+        for url_hash in missing:
+            if url_hash not in found:
+                negative_filter.record_false_positive()
+    
+    return found
+
+
+def build_cache_document(
+    url: str,
+    url_hash: str,
+    normalized_url: str,
+    report: Dict[str, Any],
+    ttl_days: int,
+    now: datetime
+) -> Dict[str, Any]:
+    """Cache document for a report stored at `now`"""
+    return {
+        "url_hash": url_hash,
+        "original_url": url,
+        "normalized_url": normalized_url,
+        "report": report,
+        "cached_at": now,
+        "expires_at": now + timedelta(days=ttl_days),
+        "ttl_days": ttl_days,
+        "created_at": now,
+        "updated_at": now
+    }
+
+
 async def store_cached_report(
     url: str,
     url_hash: str,
@@ -57,28 +145,23 @@ async def store_cached_report(
     try:
         collection = get_collection()
         
-        now = datetime.utcnow()
-        expires_at = now + timedelta(days=ttl_days)
-        
-        document = {
-            "url_hash": url_hash,
-            "original_url": url,
-            "normalized_url": normalized_url,
-            "report": report,
-            "cached_at": now,
-            "expires_at": expires_at,
-            "ttl_days": ttl_days,
-            "created_at": now,
-            "updated_at": now
-        }
+        document = build_cache_document(url, url_hash, normalized_url, report, ttl_days, datetime.utcnow())
+        expires_at = document["expires_at"]
         
-        # Upsert: update if exists, insert if not
-        result = await collection.update_one(
+        # Upsert: update if exists, insert if not (the old expiry keeps the counters right)
+        previous = await collection.find_one_and_update(
             {"url_hash": url_hash},
             {"$set": document},
-            upsert=True
+            projection={"expires_at": 1},
+            upsert=True,
+            return_document=ReturnDocument.BEFORE
         )
         
+        if previous is None:
+            negative_filter.add(url_hash)
+        cache_counters.record_store(document, previous.get("expires_at") if previous else None)
+        memory_cache.invalidate(url_hash)
+        memory_cache.put(url_hash, document)
         logger.info(f"Report cached for hash {url_hash}, expires: {expires_at}")
         return True
         
@@ -87,24 +170,87 @@ async def store_cached_report(
         return False
 
 
+async def store_cached_reports(documents: List[Dict[str, Any]]) -> int:
+    """
+    Upsert several cache documents (see build_cache_document) in one unordered bulk write
+    
+    Returns:
+        Number of documents inserted or updated
+    
+    Raises:
+        Exception: If the bulk write fails
+    """
+    collection = get_collection()
+    
+    # Last write wins for repeated URLs (upserts on one key must not race)
+    latest = {document["url_hash"]: document for document in documents}
+    
+    # Expiry of the documents about to be replaced, for the stats counters
+    previous = {}
+    async for existing in collection.find({"url_hash": {"$in": list(latest)}}, {"url_hash": 1, "expires_at": 1}):
+        previous[existing["url_hash"]] = existing.get("expires_at")
+    
+    result = await collection.bulk_write(
+        [
+            UpdateOne({"url_hash": url_hash}, {"$set": document}, upsert=True)
+            for url_hash, document in latest.items()
+        ],
+        ordered=False
+    )
+    
+    # upserted_ids is keyed by operation index: those are the newly inserted url_hashes
+    url_hashes = list(latest)
+    for index in result.upserted_ids:
+        negative_filter.add(url_hashes[index])
+    
+    for url_hash, document in latest.items():
+        cache_counters.record_store(document, previous.get(url_hash))
+        memory_cache.invalidate(url_hash)
+        memory_cache.put(url_hash, document)
+    
+    stored = result.upserted_count + result.modified_count
+    logger.info(f"Bulk cached {stored} reports ({result.upserted_count} new)")
+    return stored
+
+
 async def invalidate_cached_report(url_hash: str) -> bool:
     """Delete cached report"""
+    memory_cache.invalidate(url_hash)
     try:
         collection = get_collection()
-        result = await collection.delete_one({"url_hash": url_hash})
-        return result.deleted_count > 0
+        deleted = await collection.find_one_and_delete({"url_hash": url_hash}, projection={"expires_at": 1})
+        if deleted is None:
+            return False
+        negative_filter.remove(url_hash)
+        if deleted.get("expires_at"):
+            cache_counters.record_delete(deleted["expires_at"])
+        return True
     except Exception as e:
         logger.error(f"Cache invalidation error: {str(e)}")
         return False
 
 
+def stale_cutoff() -> datetime:
+    """Entries that expired before this are past the stale grace window"""
+    return datetime.utcnow() - timedelta(hours=settings.CACHE_STALE_GRACE_HOURS)
+
+
 async def cleanup_expired_cache():
-    """Remove expired cache entries (called by cron job)"""
+    """
+    Remove expired cache entries past the stale grace window
+    
+    Fallback for deployments without the TTL index (called by cron job);
+    with it, MongoDB deletes the same entries on its own.
+    """
+    memory_cache.clear()
     try:
         collection = get_collection()
+        # Whole counter buckets only, so the stats counters can drop exactly what was deleted
+        cutoff = cache_counters.bucket_floor(stale_cutoff())
         result = await collection.delete_many({
-            "expires_at": {"$lt": datetime.utcnow()}
+            "expires_at": {"$lt": cutoff}
         })
+        cache_counters.drop_before(cutoff)
         logger.info(f"Cleaned up {result.deleted_count} expired cache entries")
         return result.deleted_count
     except Exception as e:
@@ -112,28 +258,11 @@ async def cleanup_expired_cache():
         return 0
 
 
-async def get_cache_statistics():
-    """Get cache statistics"""
-    try:
-        collection = get_collection()
-        
-        total = await collection.count_documents({})
-        valid = await collection.count_documents({
-            "expires_at": {"$gt": datetime.utcnow()}
-        })
-        expired = total - valid
-        
-        # Get oldest and newest cache entries
-        oldest = await collection.find_one(sort=[("cached_at", 1)])
-        newest = await collection.find_one(sort=[("cached_at", -1)])
-        
-        return {
-            "total_entries": total,
-            "valid_entries": valid,
-            "expired_entries": expired,
-            "oldest_cache": oldest.get("cached_at").isoformat() if oldest else None,
-            "newest_cache": newest.get("cached_at").isoformat() if newest else None,
-        }
-    except Exception as e:
-        logger.error(f"Stats retrieval error: {str(e)}")
-        return None
\ No newline at end of file
+def get_cache_statistics() -> Dict[str, Any]:
+    """Get cache statistics from the incrementally maintained counters (no collection scan)"""
+    return cache_counters.stats()
+
+
+async def recount_cache_statistics() -> Dict[str, Any]:
+    """Recount the cache statistics with a full pass over the collection"""
+    return await cache_counters.recount()
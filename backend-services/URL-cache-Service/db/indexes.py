@@ -0,0 +1,135 @@
+"""
+Index management for the cache collection - created on startup, checked on demand
+"""
+from typing import Dict, Any, List, Tuple
+from datetime import datetime, timedelta
+from pymongo.errors import OperationFailure
+import logging
+
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+# MongoDB error codes for an index that exists with other options
+INDEX_CONFLICT_CODES = {85, 86}  # IndexOptionsConflict, IndexKeySpecsConflict
+
+
+def ttl_seconds() -> int:
+    """Documents are deleted this long after expires_at: once past the stale grace window"""
+    return int(settings.CACHE_STALE_GRACE_HOURS * 3600)
+
+
+def index_specs() -> List[Tuple[str, Dict[str, Any]]]:
+    """(field, options) of every index the service relies on (single-field, ascending)"""
+    expires_at_options = {"expireAfterSeconds": ttl_seconds()} if settings.CACHE_TTL_INDEX_ENABLED else {}
+    return [
+        ("url_hash", {"unique": True}),  # /check-cache lookups and upserts
+        ("expires_at", expires_at_options),  # TTL deletes, /cleanup and validity counts
+        ("cached_at", {})  # Oldest/newest entry in /stats
+    ]
+
+
+class IndexManager:
+    """
+    Creates the cache collection's indexes and reports whether queries use them
+
+    An index that already exists with other options (a TTL index whose
+    grace window changed, a url_hash index that is not unique yet) is
+    dropped and rebuilt. Failures are logged and reported rather than
+    stopping the service, which keeps working on collection scans.
+    """
+
+    def __init__(self):
+        self.ttl_index_active = False
+        self.errors: Dict[str, str] = {}
+
+    async def ensure(self, collection):
+        """Create missing indexes and rebuild those with outdated options (called on startup)"""
+        self.errors = {}
+        for field, options in index_specs():
+            try:
+                await self._create(collection, field, options)
+            except Exception as e:
+                self.errors[field] = str(e)
+                logger.error(f"Creating the {field} index failed: {str(e)}")
+
+        await self.refresh(collection)
+        logger.info(
+            f"Cache indexes ready (TTL index {'active' if self.ttl_index_active else 'inactive'}"
+            f"{', errors: ' + ', '.join(self.errors) if self.errors else ''})"
+        )
+
+    async def refresh(self, collection) -> Dict[str, Any]:
+        """Re-read the collection's indexes and whether the TTL index is in place"""
+        indexes = await collection.index_information()
+        ttl = indexes.get("expires_at_1", {}).get("expireAfterSeconds")
+        self.ttl_index_active = ttl is not None
+        return indexes
+
+    async def report(self, collection) -> Dict[str, Any]:
+        """
+        Indexes with their use since the server started, and the plans of the hot queries
+
+        A query plan is "IXSCAN" when the query is answered from an index and
+        "COLLSCAN" when it reads the whole collection.
+        """
+        indexes = await self.refresh(collection)
+
+        accesses = {}
+        async for entry in collection.aggregate([{"$indexStats": {}}]):
+            accesses[entry["name"]] = {
+                "ops": entry["accesses"]["ops"],
+                "since": entry["accesses"]["since"].isoformat()
+            }
+
+        cutoff = datetime.utcnow() - timedelta(hours=settings.CACHE_STALE_GRACE_HOURS)
+        queries = {
+            "lookup_by_url_hash": collection.find({"url_hash": ""}).limit(1),
+            "expired_past_grace": collection.find({"expires_at": {"$lt": cutoff}}),
+            "newest_entry": collection.find({}).sort("cached_at", -1).limit(1)
+        }
+        plans = {name: _scan_type((await cursor.explain())["queryPlanner"]["winningPlan"]) for name, cursor in queries.items()}
+
+        return {
+            "indexes": [
+                {
+                    "name": name,
+                    "keys": [field for field, _ in info["key"]],
+                    "unique": info.get("unique", False),
+                    "expire_after_seconds": info.get("expireAfterSeconds"),
+                    "accesses": accesses.get(name)
+                }
+                for name, info in indexes.items()
+            ],
+            "query_plans": plans,
+            "ttl_index_active": self.ttl_index_active,
+            "errors": self.errors
+        }
+
+    async def _create(self, collection, field: str, options: Dict[str, Any]):
+        name = f"{field}_1"
+        try:
+            await collection.create_index(field, name=name, **options)
+        except OperationFailure as e:
+            if e.code not in INDEX_CONFLICT_CODES:
+                raise
+            logger.warning(f"Rebuilding index {name} with options {options or 'none'}")
+            await collection.drop_index(name)
+            await collection.create_index(field, name=name, **options)
+
+
+def _scan_type(plan: Dict[str, Any]) -> str:
+    """IXSCAN if any stage of a winning plan reads an index, else its scan stage"""
+    stages = []
+    pending = [plan]
+    while pending:
+        stage = pending.pop()
+        stages.append(stage.get("stage"))
+        pending.extend(stage.get("inputStages", []))
+        if "inputStage" in stage:
+            pending.append(stage["inputStage"])
+    return "IXSCAN" if "IXSCAN" in stages else ("COLLSCAN" if "COLLSCAN" in stages else stages[-1])
+
+
+# Global index manager (indexes ensured on startup)
+index_manager = IndexManager()
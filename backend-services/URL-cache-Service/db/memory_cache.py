@@ -0,0 +1,143 @@
+"""
+In-process LRU tier - cached report documents kept in memory in front of MongoDB
+"""
+from typing import Dict, Any, Optional
+from collections import OrderedDict
+from datetime import datetime, timedelta
+import logging
+import time
+
+import bson
+
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class MemoryEntry:
+    __slots__ = ("document", "expires_at", "size")
+
+    def __init__(self, document: Dict[str, Any], expires_at: float, size: int):
+        self.document = document
+        self.expires_at = expires_at  # time.monotonic() deadline
+        self.size = size
+
+
+class MemoryCache:
+    """
+    LRU cache of report documents keyed by url_hash, bounded by BSON bytes
+
+    An entry lives until its stored expires_at plus the stale grace window
+    (after which /check-cache no longer serves its report), capped at
+    MEMORY_CACHE_TTL_SECONDS so that writes and invalidations made through
+    another replica of the service are picked up within that window.
+
+    A document read from MongoDB is only cached if nothing was written or
+    invalidated since the read started, so a slow read cannot put back an
+    entry that was just dropped.
+    """
+
+    def __init__(self):
+        self._entries: "OrderedDict[str, MemoryEntry]" = OrderedDict()
+        self.bytes_used = 0
+        self.generation = 0  # Bumped by every write and invalidation
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, url_hash: str) -> Optional[Dict[str, Any]]:
+        """Return the cached document for url_hash, or None if absent/expired"""
+        entry = self._entries.get(url_hash)
+
+        if entry is None:
+            self.misses += 1
+            return None
+
+        if entry.expires_at <= time.monotonic():
+            self._remove(url_hash)
+            self.expirations += 1
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(url_hash)
+        self.hits += 1
+        return entry.document
+
+    def put(self, url_hash: str, document: Dict[str, Any], read_generation: Optional[int] = None):
+        """
+        Cache a report document
+
+        Args:
+            url_hash: Hash of the normalized URL
+            document: Document as stored in MongoDB
+            read_generation: For documents read from MongoDB, the generation
+                when the read started; stale reads are not cached
+        """
+        if not settings.MEMORY_CACHE_ENABLED:
+            return
+        if read_generation is not None and read_generation != self.generation:
+            return
+
+        ttl = settings.MEMORY_CACHE_TTL_SECONDS
+        expires_at = document.get("expires_at")
+        if expires_at is not None:
+            served_until = expires_at + timedelta(hours=settings.CACHE_STALE_GRACE_HOURS)
+            ttl = min(ttl, (served_until - datetime.utcnow()).total_seconds())
+        if ttl <= 0:
+            return
+
+        size = len(bson.encode(document))
+        if size > settings.MEMORY_CACHE_MAX_BYTES:
+            return
+
+        if url_hash in self._entries:
+            self._remove(url_hash)
+
+        self._entries[url_hash] = MemoryEntry(document, time.monotonic() + ttl, size)
+        self.bytes_used += size
+
+        # Evict least recently used entries until back within the byte budget
+        while self.bytes_used > settings.MEMORY_CACHE_MAX_BYTES:
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+            self.evictions += 1
+
+    def invalidate(self, url_hash: str) -> bool:
+        """Drop the entry for url_hash; returns whether one existed"""
+        self.generation += 1
+        if url_hash in self._entries:
+            self._remove(url_hash)
+            return True
+        return False
+
+    def clear(self) -> int:
+        """Drop every entry; returns how many there were"""
+        self.generation += 1
+        dropped = len(self._entries)
+        self._entries.clear()
+        self.bytes_used = 0
+        return dropped
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit ratio and memory use"""
+        lookups = self.hits + self.misses
+        return {
+            "enabled": settings.MEMORY_CACHE_ENABLED,
+            "entries": len(self._entries),
+            "bytes": self.bytes_used,
+            "max_bytes": settings.MEMORY_CACHE_MAX_BYTES,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations
+        }
+
+    def _remove(self, url_hash: str):
+        entry = self._entries.pop(url_hash)
+        self.bytes_used -= entry.size
+
+
+# Global in-memory tier (shared by all requests of this process)
+memory_cache = MemoryCache()
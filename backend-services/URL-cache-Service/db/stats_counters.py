@@ -0,0 +1,237 @@
+"""
+Cache statistics counters - entry counts kept up to date by writes instead of counted per request
+"""
+from typing import Dict, Any, Optional, Set
+from datetime import datetime, timedelta
+import logging
+import asyncio
+import time
+
+from config import settings
+from db.indexes import index_manager
+
+logger = logging.getLogger(__name__)
+
+STATS_DOCUMENT_ID = "cache_stats"
+
+EPOCH = datetime(1970, 1, 1)  # expires_at is naive UTC
+
+
+class CacheCounters:
+    """
+    Number of cache entries per expires_at bucket, shared through a stats document
+
+    Entries are counted by the STATS_BUCKET_SECONDS bucket their expires_at
+    falls in, so valid, stale and expired counts follow the clock without
+    rescanning the collection: /stats sums a few hundred buckets at most.
+    Counts are exact to within one bucket at the valid/stale and
+    stale/expired boundaries.
+
+    Stores and invalidations update this process's pending deltas, which
+    are added ($inc) to the stats document every STATS_PERSIST_INTERVAL_SECONDS;
+    the same cycle re-reads the document, so the totals include every
+    replica's writes within about one interval. Buckets past the grace
+    window are dropped once the TTL index has deleted their entries, or
+    when /cleanup deletes them. A full recount (admin operation) replaces
+    the document, correcting any drift from writes that raced each other.
+    """
+
+    def __init__(self):
+        self._buckets: Dict[int, int] = {}  # Bucket start (epoch seconds) -> entries, as persisted
+        self._pending: Dict[int, int] = {}  # Local deltas not yet persisted
+        self._dropped: Set[int] = set()  # Buckets to remove from the stats document
+        self.oldest_cache: Optional[datetime] = None
+        self.newest_cache: Optional[datetime] = None
+        self.persisted_at: Optional[datetime] = None
+        self.recounted_at: Optional[datetime] = None
+        self.persist_failures = 0
+        self._task: Optional[asyncio.Task] = None
+        self._cache_collection = None
+        self._stats_collection = None
+
+    async def startup(self, cache_collection, stats_collection):
+        """Load the stats document (recounting if there is none) and start persisting"""
+        self._cache_collection = cache_collection
+        self._stats_collection = stats_collection
+
+        document = await stats_collection.find_one({"_id": STATS_DOCUMENT_ID})
+        if document is None or document.get("bucket_seconds") != settings.STATS_BUCKET_SECONDS:
+            logger.info("No usable cache stats document, recounting the collection")
+            await self.recount()
+        else:
+            self._load(document)
+            await self._refresh_range()
+
+        self._task = asyncio.create_task(self._persist_loop())
+
+    async def shutdown(self):
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        try:
+            await self.persist()
+        except Exception as e:
+            logger.warning(f"Persisting cache stats on shutdown failed: {str(e)}")
+
+    def bucket(self, expires_at: datetime) -> int:
+        """Start of the bucket expires_at falls in (epoch seconds)"""
+        seconds = int((expires_at - EPOCH).total_seconds())
+        return seconds - seconds % settings.STATS_BUCKET_SECONDS
+
+    def bucket_floor(self, moment: datetime) -> datetime:
+        """Start of the bucket containing moment, as a datetime"""
+        return EPOCH + timedelta(seconds=self.bucket(moment))
+
+    def record_store(self, document: Dict[str, Any], previous_expires_at: Optional[datetime]):
+        """Count a stored document (previous_expires_at: that of the document it replaced)"""
+        if previous_expires_at is not None:
+            self._add(self.bucket(previous_expires_at), -1)
+        self._add(self.bucket(document["expires_at"]), 1)
+
+        cached_at = document["cached_at"]
+        if self.newest_cache is None or cached_at > self.newest_cache:
+            self.newest_cache = cached_at
+        if self.oldest_cache is None:
+            self.oldest_cache = cached_at
+
+    def record_delete(self, expires_at: datetime):
+        """Count an invalidated document"""
+        self._add(self.bucket(expires_at), -1)
+
+    def drop_before(self, cutoff: datetime):
+        """Forget the buckets that end at or before cutoff (their entries were deleted)"""
+        limit = self.bucket(cutoff)
+        for bucket in [b for b in set(self._buckets) | set(self._pending) if b < limit]:
+            self._buckets.pop(bucket, None)
+            self._pending.pop(bucket, None)
+            self._dropped.add(bucket)
+
+    def stats(self) -> Dict[str, Any]:
+        """Entry counts by validity, from the counters"""
+        now = time.time()
+        grace = settings.CACHE_STALE_GRACE_HOURS * 3600
+        size = settings.STATS_BUCKET_SECONDS
+
+        counts = self._counts()
+        valid = stale = expired = 0
+        for bucket, count in counts.items():
+            # A bucket counts as valid until it ends (see the class docstring)
+            if bucket + size > now:
+                valid += count
+            elif bucket + size + grace > now:
+                stale += count
+            else:
+                expired += count
+
+        return {
+            "total_entries": valid + stale + expired,
+            "valid_entries": valid,
+            "expired_entries": stale + expired,
+            "stale_entries": stale,
+            "oldest_cache": self.oldest_cache.isoformat() if self.oldest_cache else None,
+            "newest_cache": self.newest_cache.isoformat() if self.newest_cache else None,
+            "counters": {
+                "bucket_seconds": size,
+                "buckets": len(counts),
+                "pending_deltas": sum(abs(delta) for delta in self._pending.values()),
+                "persisted_at": self.persisted_at.isoformat() if self.persisted_at else None,
+                "recounted_at": self.recounted_at.isoformat() if self.recounted_at else None,
+                "persist_failures": self.persist_failures
+            }
+        }
+
+    async def persist(self):
+        """Add the pending deltas to the stats document and reload it"""
+        pending, self._pending = self._pending, {}
+        dropped, self._dropped = self._dropped, set()
+
+        update: Dict[str, Any] = {"$set": {"bucket_seconds": settings.STATS_BUCKET_SECONDS}}
+        if pending:
+            update["$inc"] = {f"buckets.{bucket}": delta for bucket, delta in pending.items()}
+        unset = {f"buckets.{bucket}": "" for bucket in dropped if bucket not in pending}
+        if unset:
+            update["$unset"] = unset
+
+        try:
+            await self._stats_collection.update_one({"_id": STATS_DOCUMENT_ID}, update, upsert=True)
+        except Exception:
+            # Keep them for the next attempt
+            for bucket, delta in pending.items():
+                self._pending[bucket] = self._pending.get(bucket, 0) + delta
+            self._dropped |= dropped
+            raise
+
+        self._load(await self._stats_collection.find_one({"_id": STATS_DOCUMENT_ID}))
+        self.persisted_at = datetime.utcnow()
+
+    async def recount(self) -> Dict[str, Any]:
+        """Rebuild the counters from a full pass over the collection (admin operation)"""
+        started = time.monotonic()
+        epoch_ms = {"$subtract": ["$expires_at", EPOCH]}  # Date minus date: milliseconds
+        pipeline = [
+            {"$group": {
+                "_id": {"$subtract": [epoch_ms, {"$mod": [epoch_ms, settings.STATS_BUCKET_SECONDS * 1000]}]},
+                "count": {"$sum": 1}
+            }}
+        ]
+
+        buckets = {}
+        async for group in self._cache_collection.aggregate(pipeline):
+            if group["_id"] is not None:
+                buckets[str(int(group["_id"]) // 1000)] = group["count"]
+
+        recounted_at = datetime.utcnow()
+        await self._stats_collection.replace_one(
+            {"_id": STATS_DOCUMENT_ID},
+            {"bucket_seconds": settings.STATS_BUCKET_SECONDS, "buckets": buckets, "recounted_at": recounted_at},
+            upsert=True
+        )
+        self._pending.clear()
+        self._dropped.clear()
+        self._load({"buckets": buckets, "recounted_at": recounted_at})
+        await self._refresh_range()
+
+        elapsed = time.monotonic() - started
+        logger.info(f"Recounted {sum(buckets.values())} cache entries in {elapsed:.2f}s")
+        return {"total_entries": sum(buckets.values()), "buckets": len(buckets), "elapsed_seconds": round(elapsed, 3)}
+
+    def _add(self, bucket: int, delta: int):
+        self._pending[bucket] = self._pending.get(bucket, 0) + delta
+        self._dropped.discard(bucket)
+
+    def _counts(self) -> Dict[int, int]:
+        counts = dict(self._buckets)
+        for bucket, delta in self._pending.items():
+            counts[bucket] = counts.get(bucket, 0) + delta
+        return {bucket: count for bucket, count in counts.items() if count > 0}
+
+    def _load(self, document: Dict[str, Any]):
+        self._buckets = {int(bucket): count for bucket, count in document.get("buckets", {}).items()}
+        self.recounted_at = document.get("recounted_at", self.recounted_at)
+
+    async def _refresh_range(self):
+        """Oldest and newest cached_at, two lookups on the cached_at index"""
+        oldest = await self._cache_collection.find_one({}, {"cached_at": 1}, sort=[("cached_at", 1)])
+        newest = await self._cache_collection.find_one({}, {"cached_at": 1}, sort=[("cached_at", -1)])
+        self.oldest_cache = oldest.get("cached_at") if oldest else None
+        self.newest_cache = newest.get("cached_at") if newest else None
+
+    async def _persist_loop(self):
+        while True:
+            await asyncio.sleep(settings.STATS_PERSIST_INTERVAL_SECONDS)
+            try:
+                if index_manager.ttl_index_active:
+                    # MongoDB has deleted these (its TTL monitor runs every minute)
+                    self.drop_before(
+                        datetime.utcnow() - timedelta(hours=settings.CACHE_STALE_GRACE_HOURS, minutes=1)
+                    )
+                await self.persist()
+                await self._refresh_range()
+            except Exception as e:
+                self.persist_failures += 1
+                logger.warning(f"Persisting cache stats failed: {str(e)}")
+
+
+# Global cache statistics counters (started with the database client)
+cache_counters = CacheCounters()
@@ -1,8 +1,8 @@
 """
 Pydantic models for request/response validation
 """
-from pydantic import BaseModel
-from typing import Optional, Dict, Any
+from pydantic import BaseModel, Field
+from typing import Optional, Dict, Any, List
 
 from config import settings
 
@@ -14,6 +14,7 @@ class CheckCacheRequest(BaseModel):
 class CacheCheckResponse(BaseModel):
     cached: bool
     valid: bool
+    stale: bool = False  # Expired, but within the grace window (report included)
     report: Optional[Dict[str, Any]] = None
     cached_at: Optional[str] = None
     expires_at: Optional[str] = None
@@ -33,4 +34,30 @@ class CacheStoreResponse(BaseModel):
 
 
 class InvalidateCacheRequest(BaseModel):
-    url: str
\ No newline at end of file
+    url: str
+
+
+class CheckCacheBatchRequest(BaseModel):
+    urls: List[str] = Field(..., min_length=1)
+
+
+class CacheCheckBatchItem(CacheCheckResponse):
+    url: str
+
+
+class CacheCheckBatchResponse(BaseModel):
+    results: List[CacheCheckBatchItem]  # One per requested URL, in request order
+
+
+class StoreCacheBatchRequest(BaseModel):
+    items: List[StoreCacheRequest] = Field(..., min_length=1)
+
+
+class CacheStoreBatchItem(CacheStoreResponse):
+    url: str
+
+
+class CacheStoreBatchResponse(BaseModel):
+    success: bool
+    stored: int  # Documents inserted or updated
+    results: List[CacheStoreBatchItem]  # One per stored item, in request order
@@ -2,6 +2,7 @@
 Cache management routes - Check, store, and invalidate cache
 """
 from fastapi import APIRouter, HTTPException, status
+from typing import Dict, Any, Optional
 from datetime import datetime, timedelta
 import logging
 
@@ -9,15 +10,26 @@ from models import (
     CacheCheckResponse, 
     StoreCacheRequest, 
     CacheStoreResponse,
-    InvalidateCacheRequest
+    InvalidateCacheRequest,
+    CheckCacheBatchRequest,
+    CacheCheckBatchItem,
+    CacheCheckBatchResponse,
+    StoreCacheBatchRequest,
+    CacheStoreBatchItem,
+    CacheStoreBatchResponse
 )
 from db.database import (
     get_cached_report,
+    get_cached_reports,
     store_cached_report,
+    store_cached_reports,
+    build_cache_document,
     invalidate_cached_report,
     cleanup_expired_cache
 )
+from db.indexes import index_manager
 from utils.url_utils import generate_url_hash, normalize_url
+from config import settings
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
@@ -31,7 +43,8 @@ async def check_cache(url: str):
     Returns:
     - cached: Whether report exists
     - valid: Whether cache is still within TTL
-    - report: The cached report data (if valid)
+    - stale: Expired, but still within the grace window
+    - report: The cached report data (if valid or stale)
     - cached_at: When report was cached
     - expires_at: When cache will expire
     - age_days: How old the cache is
@@ -40,44 +53,10 @@ async def check_cache(url: str):
         # Generate hash from normalized URL
         url_hash = generate_url_hash(url)
         
-        # Retrieve from database
+        # Retrieve from the in-memory tier or the database
         cached_data = await get_cached_report(url_hash)
         
-        if not cached_data:
-            logger.info(f"Cache MISS for {url}")
-            return CacheCheckResponse(
-                cached=False,
-                valid=False
-            )
-        
-        # Check if cache is still valid
-        now = datetime.utcnow()
-        cached_at = cached_data.get("cached_at")
-        expires_at = cached_data.get("expires_at")
-        
-        if expires_at and expires_at > now:
-            # Cache is valid
-            age = (now - cached_at).total_seconds() / 86400  # Convert to days
-            
-            logger.info(f"Cache HIT for {url} (age: {age:.2f} days)")
-            
-            return CacheCheckResponse(
-                cached=True,
-                valid=True,
-                report=cached_data.get("report"),
-                cached_at=cached_at.isoformat() if cached_at else None,
-                expires_at=expires_at.isoformat() if expires_at else None,
-                age_days=round(age, 2)
-            )
-        else:
-            # Cache exists but expired
-            logger.info(f"Cache EXPIRED for {url}")
-            return CacheCheckResponse(
-                cached=True,
-                valid=False,
-                cached_at=cached_at.isoformat() if cached_at else None,
-                expires_at=expires_at.isoformat() if expires_at else None
-            )
+        return _check_response(url, cached_data)
     
     except Exception as e:
         logger.error(f"Cache check failed: {str(e)}")
@@ -87,6 +66,33 @@ async def check_cache(url: str):
         )
 
 
+@router.post("/check-cache/batch", response_model=CacheCheckBatchResponse)
+async def check_cache_batch(request: CheckCacheBatchRequest):
+    """
+    Check several URLs in one call, with a single database query
+    
+    Each result has the same fields as a /check-cache response plus the
+    URL it is for, in the order the URLs were sent.
+    """
+    _check_batch_size(len(request.urls))
+    
+    try:
+        url_hashes = [generate_url_hash(url) for url in request.urls]
+        cached = await get_cached_reports(url_hashes)
+        
+        return CacheCheckBatchResponse(results=[
+            CacheCheckBatchItem(url=url, **_check_response(url, cached.get(url_hash)).model_dump())
+            for url, url_hash in zip(request.urls, url_hashes)
+        ])
+    
+    except Exception as e:
+        logger.error(f"Batch cache check failed: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Batch cache check failed: {str(e)}"
+        )
+
+
 @router.post("/store", response_model=CacheStoreResponse)
 async def store_cache(request: StoreCacheRequest):
     """
@@ -133,6 +139,54 @@ async def store_cache(request: StoreCacheRequest):
         )
 
 
+@router.post("/store/batch", response_model=CacheStoreBatchResponse)
+async def store_cache_batch(request: StoreCacheBatchRequest):
+    """
+    Store several reports in one unordered bulk write
+    
+    Same semantics as /store for each item; when a URL appears more than
+    once, the last item wins. Results are in the order the items were sent.
+    """
+    _check_batch_size(len(request.items))
+    
+    try:
+        now = datetime.utcnow()
+        documents = [
+            build_cache_document(
+                url=item.url,
+                url_hash=generate_url_hash(item.url),
+                normalized_url=normalize_url(item.url),
+                report=item.report,
+                ttl_days=item.ttl_days,
+                now=now
+            )
+            for item in request.items
+        ]
+        
+        stored = await store_cached_reports(documents)
+        
+        return CacheStoreBatchResponse(
+            success=True,
+            stored=stored,
+            results=[
+                CacheStoreBatchItem(
+                    url=document["original_url"],
+                    success=True,
+                    url_hash=document["url_hash"],
+                    expires_at=document["expires_at"].isoformat()
+                )
+                for document in documents
+            ]
+        )
+    
+    except Exception as e:
+        logger.error(f"Batch cache storage failed: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Batch cache storage failed: {str(e)}"
+        )
+
+
 @router.post("/invalidate")
 async def invalidate_cache(request: InvalidateCacheRequest):
     """
@@ -160,8 +214,16 @@ async def invalidate_cache(request: InvalidateCacheRequest):
 async def cleanup_cache():
     """
     Manually trigger cleanup of expired cache entries
-    Normally handled automatically by MongoDB TTL index
+    Normally handled automatically by MongoDB TTL index, in which case this is a no-op
     """
+    if index_manager.ttl_index_active:
+        return {
+            "success": True,
+            "deleted_count": 0,
+            "ttl_index_active": True,
+            "message": "Expired entries are removed by the TTL index"
+        }
+    
     try:
         deleted_count = await cleanup_expired_cache()
         return {
@@ -174,4 +236,66 @@ async def cleanup_cache():
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Cache cleanup failed: {str(e)}"
-        )
\ No newline at end of file
+        )
+
+
+def _check_batch_size(count: int):
+    if count > settings.BATCH_MAX_URLS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Batch too large. Max {settings.BATCH_MAX_URLS} URLs per request"
+        )
+
+
+def _check_response(url: str, cached_data: Optional[Dict[str, Any]]) -> CacheCheckResponse:
+    """Classify a cached document as valid, stale or expired (None: a miss)"""
+    if not cached_data:
+        logger.info(f"Cache MISS for {url}")
+        return CacheCheckResponse(
+            cached=False,
+            valid=False
+        )
+    
+    # Check if cache is still valid
+    now = datetime.utcnow()
+    cached_at = cached_data.get("cached_at")
+    expires_at = cached_data.get("expires_at")
+    
+    if expires_at and expires_at > now:
+        # Cache is valid
+        age = (now - cached_at).total_seconds() / 86400  # Convert to days
+        
+        logger.info(f"Cache HIT for {url} (age: {age:.2f} days)")
+        
+        return CacheCheckResponse(
+            cached=True,
+            valid=True,
+            report=cached_data.get("report"),
+            cached_at=cached_at.isoformat() if cached_at else None,
+            expires_at=expires_at.isoformat() if expires_at else None,
+            age_days=round(age, 2)
+        )
+    elif expires_at and expires_at + timedelta(hours=settings.CACHE_STALE_GRACE_HOURS) > now:
+        # Expired but within the grace window: served while the caller refreshes it
+        age = (now - cached_at).total_seconds() / 86400
+        
+        logger.info(f"Cache STALE for {url} (age: {age:.2f} days)")
+        
+        return CacheCheckResponse(
+            cached=True,
+            valid=False,
+            stale=True,
+            report=cached_data.get("report"),
+            cached_at=cached_at.isoformat() if cached_at else None,
+            expires_at=expires_at.isoformat(),
+            age_days=round(age, 2)
+        )
+    else:
+        # Cache exists but expired
+        logger.info(f"Cache EXPIRED for {url}")
+        return CacheCheckResponse(
+            cached=True,
+            valid=False,
+            cached_at=cached_at.isoformat() if cached_at else None,
+            expires_at=expires_at.isoformat() if expires_at else None
+        )
@@ -2,7 +2,10 @@ from fastapi import APIRouter, HTTPException, status
 import logging
 
 from config import settings
-from db.database import get_cache_statistics
+from db.database import get_cache_statistics, recount_cache_statistics, get_collection
+from db.indexes import index_manager
+from db.memory_cache import memory_cache
+from db.bloom_filter import negative_filter
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
@@ -10,26 +13,55 @@ router = APIRouter()
 
 @router.get("/stats")
 async def cache_stats():
-    """Get cache statistics"""
+    """Get cache statistics (from counters kept up to date by writes, see POST /stats/recount)"""
     try:
-        stats = await get_cache_statistics()
-        
-        if stats is None:
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail="Failed to retrieve statistics"
-            )
+        stats = get_cache_statistics()
         
         # Add TTL configuration to stats
         stats["cache_ttl_days"] = settings.CACHE_TTL_DAYS
+        stats["stale_grace_hours"] = settings.CACHE_STALE_GRACE_HOURS
+        stats["memory_cache"] = memory_cache.stats()
+        stats["bloom_filter"] = negative_filter.stats()
+        stats["ttl_index_active"] = index_manager.ttl_index_active
         
         return stats
     
-    except HTTPException:
-        raise
     except Exception as e:
         logger.error(f"Stats retrieval failed: {str(e)}")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Stats retrieval failed: {str(e)}"
-        )
\ No newline at end of file
+        )
+
+
+@router.post("/stats/recount")
+async def recount_cache_stats():
+    """
+    Rebuild the /stats counters from a full pass over the collection
+    
+    Admin operation: it reads every entry, so run it to correct drift
+    (e.g. after writes made outside the service), not routinely.
+    """
+    try:
+        return await recount_cache_statistics()
+    
+    except Exception as e:
+        logger.error(f"Stats recount failed: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Stats recount failed: {str(e)}"
+        )
+
+
+@router.get("/indexes")
+async def index_usage():
+    """Cache collection indexes, how often each was used, and whether the hot queries use them"""
+    try:
+        return await index_manager.report(get_collection())
+    
+    except Exception as e:
+        logger.error(f"Index check failed: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Index check failed: {str(e)}"
+        )
@@ -0,0 +1,44 @@
+"""
+Test setup - the service's modules are imported by their top-level names, as in the service
+"""
+from types import SimpleNamespace
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Required settings (config.py has no defaults for these); MongoDB is never contacted
+for name, value in {
+    "MONGO_URI": "mongodb://mongo.test:27017",
+    "MONGO_DB": "test",
+    "CACHE_COLLECTION": "url_cache",
+    "CACHE_TTL_DAYS": "7",
+}.items():
+    os.environ.setdefault(name, value)
+
+
+@pytest.fixture
+def fake_db(monkeypatch):
+    """
+    The database layer on an in-memory collection, with a fresh memory tier,
+    cache counters (not started) and negative-lookup filter (never built)
+    """
+    from db import database
+    from db.bloom_filter import NegativeLookupFilter
+    from db.memory_cache import MemoryCache
+    from db.stats_counters import CacheCounters
+    from fake_mongo import FakeCollection, FakeStatsCollection
+
+    db = SimpleNamespace(
+        collection=FakeCollection(),
+        stats_collection=FakeStatsCollection(),
+        memory_cache=MemoryCache(),
+        counters=CacheCounters()
+    )
+    monkeypatch.setattr(database, "get_collection", lambda: db.collection)
+    monkeypatch.setattr(database, "memory_cache", db.memory_cache)
+    monkeypatch.setattr(database, "cache_counters", db.counters)
+    monkeypatch.setattr(database, "negative_filter", NegativeLookupFilter())
+    return db
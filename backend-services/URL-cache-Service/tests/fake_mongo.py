@@ -0,0 +1,148 @@
+"""
+In-memory stand-ins for the MongoDB collections, shared by the service's tests
+
+FakeCollection holds cache documents keyed by url_hash and answers the
+queries the service makes (equality, $in and $lt filters, the stats
+recount's aggregation); its cursors can be paused part-way to interleave
+writes with a scan. FakeStatsCollection holds the stats document.
+"""
+import asyncio
+import copy
+import hashlib
+
+from config import settings
+from db.stats_counters import EPOCH
+
+
+def url_hash(name: str) -> str:
+    return hashlib.sha256(name.encode()).hexdigest()
+
+
+def _matches(document, query):
+    for field, condition in query.items():
+        value = document.get(field)
+        if isinstance(condition, dict):
+            if "$in" in condition and value not in condition["$in"]:
+                return False
+            if "$lt" in condition and (value is None or not value < condition["$lt"]):
+                return False
+        elif value != condition:
+            return False
+    return True
+
+
+class FakeCursor:
+    def __init__(self, documents, gate=None, pause_after=None):
+        self._documents = documents
+        self._gate = gate
+        self._pause_after = pause_after
+        self.paused = asyncio.Event()
+
+    def batch_size(self, size):
+        return self
+
+    async def __aiter__(self):
+        for index, document in enumerate(self._documents):
+            if index == self._pause_after:
+                self.paused.set()
+                await self._gate.wait()
+            yield document
+
+
+class BulkWriteResult:
+    def __init__(self, upserted_ids, modified_count):
+        self.upserted_ids = upserted_ids
+        self.upserted_count = len(upserted_ids)
+        self.modified_count = modified_count
+
+
+class DeleteResult:
+    def __init__(self, deleted_count):
+        self.deleted_count = deleted_count
+
+
+class FakeCollection:
+    def __init__(self, url_hashes=()):
+        self.documents = {h: {"url_hash": h} for h in url_hashes}
+        self.gate = None
+        self.pause_after = None
+        self.cursor = None
+        self.reads = 0  # find and find_one calls
+
+    def find(self, query, projection=None):
+        self.reads += 1
+        matching = [dict(d) for d in self.documents.values() if _matches(d, query)]
+        self.cursor = FakeCursor(matching, self.gate, self.pause_after)
+        return self.cursor
+
+    async def find_one(self, query, projection=None, sort=None):
+        self.reads += 1
+        if "url_hash" in query:
+            return self.documents.get(query["url_hash"])
+        matching = [d for d in self.documents.values() if _matches(d, query)]
+        if sort:
+            field, direction = sort[0]
+            matching = sorted((d for d in matching if field in d), key=lambda d: d[field], reverse=direction < 0)
+        return matching[0] if matching else None
+
+    async def find_one_and_update(self, query, update, projection=None, upsert=False, return_document=None):
+        previous = self.documents.get(query["url_hash"])
+        self.documents[query["url_hash"]] = dict(update["$set"])
+        return previous
+
+    async def find_one_and_delete(self, query, projection=None):
+        return self.documents.pop(query["url_hash"], None)
+
+    async def bulk_write(self, operations, ordered=True):
+        upserted_ids = {}
+        modified = 0
+        for index, operation in enumerate(operations):
+            url_hash = operation._filter["url_hash"]
+            if url_hash in self.documents:
+                modified += 1
+            else:
+                upserted_ids[index] = url_hash
+            self.documents[url_hash] = dict(operation._doc["$set"])
+        return BulkWriteResult(upserted_ids, modified)
+
+    async def delete_many(self, query):
+        deleted = [h for h, d in self.documents.items() if _matches(d, query)]
+        for url_hash in deleted:
+            del self.documents[url_hash]
+        return DeleteResult(len(deleted))
+
+    async def aggregate(self, pipeline):
+        """The stats recount's pipeline: entries grouped by expires_at bucket (epoch milliseconds)"""
+        bucket_ms = settings.STATS_BUCKET_SECONDS * 1000
+        groups = {}
+        for document in self.documents.values():
+            if document.get("expires_at") is None:
+                continue
+            epoch_ms = int((document["expires_at"] - EPOCH).total_seconds() * 1000)
+            bucket = epoch_ms - epoch_ms % bucket_ms
+            groups[bucket] = groups.get(bucket, 0) + 1
+        for bucket, count in groups.items():
+            yield {"_id": bucket, "count": count}
+
+
+class FakeStatsCollection:
+    def __init__(self):
+        self.documents = {}
+
+    async def find_one(self, query):
+        document = self.documents.get(query["_id"])
+        return copy.deepcopy(document) if document is not None else None
+
+    async def update_one(self, query, update, upsert=False):
+        document = self.documents.setdefault(query["_id"], {"_id": query["_id"]})
+        document.update(update.get("$set", {}))
+        for path, delta in update.get("$inc", {}).items():
+            field, key = path.split(".")
+            values = document.setdefault(field, {})
+            values[key] = values.get(key, 0) + delta
+        for path in update.get("$unset", {}):
+            field, key = path.split(".")
+            document.get(field, {}).pop(key, None)
+
+    async def replace_one(self, query, replacement, upsert=False):
+        self.documents[query["_id"]] = dict(copy.deepcopy(replacement), _id=query["_id"])
@@ -0,0 +1,87 @@
+"""
+Bulk endpoints: /store/batch and /check-cache/batch with hits, stale entries and misses in one call
+"""
+from fastapi.testclient import TestClient
+
+from app import app
+from config import settings
+
+# No `with`: the startup hooks (MongoDB client) do not run
+client = TestClient(app)
+
+REPORT = {"trust_score": 70}
+
+
+def test_batch_check_answers_hits_stale_entries_and_misses_in_request_order(fake_db):
+    stored = client.post("/store/batch", json={"items": [
+        {"url": "https://www.amazon.in/dp/B0HIT00001", "report": REPORT, "ttl_days": 7},
+        {"url": "https://www.amazon.in/dp/B0STALE001", "report": {"trust_score": 30}, "ttl_days": 0},
+    ]})
+    assert stored.status_code == 200
+    reads_before = fake_db.collection.reads
+    fake_db.memory_cache.clear()
+
+    response = client.post("/check-cache/batch", json={"urls": [
+        "https://www.amazon.in/dp/B0MISS0001",
+        # Tracking parameters are normalized away: the same entry as the stored URL
+        "https://www.amazon.in/dp/B0HIT00001?utm_source=mail&ref=abc",
+        "https://www.amazon.in/dp/B0STALE001",
+        "https://www.amazon.in/dp/B0HIT00001",
+    ]})
+
+    assert response.status_code == 200
+    results = response.json()["results"]
+    assert [result["url"] for result in results] == [
+        "https://www.amazon.in/dp/B0MISS0001",
+        "https://www.amazon.in/dp/B0HIT00001?utm_source=mail&ref=abc",
+        "https://www.amazon.in/dp/B0STALE001",
+        "https://www.amazon.in/dp/B0HIT00001",
+    ]
+    assert [(r["cached"], r["valid"], r["stale"]) for r in results] == [
+        (False, False, False), (True, True, False), (True, False, True), (True, True, False)
+    ]
+    assert results[0]["report"] is None
+    assert results[1]["report"] == REPORT and results[2]["report"] == {"trust_score": 30}
+    # One query for every URL not already in memory
+    assert fake_db.collection.reads - reads_before == 1
+
+
+def test_batch_check_is_served_from_memory_after_a_batch_store(fake_db):
+    urls = [f"https://www.amazon.in/dp/B0MEMORY0{i}" for i in range(3)]
+    client.post("/store/batch", json={"items": [{"url": url, "report": REPORT} for url in urls]})
+    reads_before = fake_db.collection.reads
+
+    results = client.post("/check-cache/batch", json={"urls": urls}).json()["results"]
+
+    assert all(result["valid"] for result in results)
+    assert fake_db.collection.reads == reads_before
+
+
+def test_batch_store_keeps_the_last_item_for_a_repeated_url(fake_db):
+    response = client.post("/store/batch", json={"items": [
+        {"url": "https://www.amazon.in/dp/B0REPEAT01", "report": {"trust_score": 1}},
+        {"url": "https://www.amazon.in/dp/B0OTHER001", "report": REPORT},
+        {"url": "https://www.amazon.in/dp/B0REPEAT01?ref=x", "report": {"trust_score": 2}},
+    ]})
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["stored"] == 2
+    assert [result["url"] for result in body["results"]] == [
+        "https://www.amazon.in/dp/B0REPEAT01",
+        "https://www.amazon.in/dp/B0OTHER001",
+        "https://www.amazon.in/dp/B0REPEAT01?ref=x",
+    ]
+    check = client.get("/check-cache", params={"url": "https://www.amazon.in/dp/B0REPEAT01"}).json()
+    assert check["report"] == {"trust_score": 2}
+
+
+def test_batches_over_the_limit_are_rejected(fake_db, monkeypatch):
+    monkeypatch.setattr(settings, "BATCH_MAX_URLS", 2)
+    urls = [f"https://www.amazon.in/dp/B0LIMIT00{i}" for i in range(3)]
+
+    check = client.post("/check-cache/batch", json={"urls": urls})
+    store = client.post("/store/batch", json={"items": [{"url": url, "report": REPORT} for url in urls]})
+
+    assert check.status_code == 400 and store.status_code == 400
+    assert fake_db.collection.reads == 0 and not fake_db.collection.documents
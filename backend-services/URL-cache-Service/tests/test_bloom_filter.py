@@ -0,0 +1,102 @@
+import asyncio
+
+import pytest
+
+from config import settings
+from db import database
+from db.bloom_filter import NegativeLookupFilter
+from db.memory_cache import memory_cache
+from fake_mongo import FakeCollection, url_hash
+
+
+@pytest.fixture
+def bloom(monkeypatch):
+    # Small enough for counters to be shared between entries
+    monkeypatch.setattr(settings, "BLOOM_EXPECTED_ENTRIES", 20)
+    monkeypatch.setattr(settings, "BLOOM_FALSE_POSITIVE_RATE", 0.1)
+    monkeypatch.setattr(settings, "BLOOM_SOLE_WRITER", True)
+    negative_filter = NegativeLookupFilter()
+    monkeypatch.setattr(database, "negative_filter", negative_filter)
+    memory_cache.clear()
+    yield negative_filter
+    memory_cache.clear()
+
+
+def use_collection(monkeypatch, collection):
+    monkeypatch.setattr(database, "get_collection", lambda: collection)
+    return collection
+
+
+async def store(name: str):
+    assert await database.store_cached_report(name, url_hash(name), name, {"trust_score": 50}, ttl_days=7)
+
+
+def test_invalidating_an_uncounted_hash_keeps_other_entries(bloom, monkeypatch):
+    stored = [url_hash(f"stored-{i}") for i in range(20)]
+    collection = use_collection(monkeypatch, FakeCollection(stored))
+    bloom._collection = collection
+    asyncio.run(bloom.rebuild())
+
+    # A document written around the service (the filter never counted it) whose
+    # slots overlap the stored entries': uncounting it would hide one of them
+    def hides_an_entry(candidate):
+        counters = bytearray(bloom._filter._counters)
+        bloom._filter.remove(candidate)
+        hidden = not all(bloom._filter.might_contain(h) for h in stored)
+        bloom._filter._counters = counters
+        return hidden
+
+    foreign = next(
+        h for h in (url_hash(f"foreign-{i}") for i in range(10000))
+        if not bloom.might_contain(h) and hides_an_entry(h)
+    )
+    collection.documents[foreign] = {"url_hash": foreign}
+
+    assert asyncio.run(database.invalidate_cached_report(foreign))
+    assert all(bloom.might_contain(h) for h in stored)
+    # Never stored at all: nothing to delete, nothing uncounted
+    assert not asyncio.run(database.invalidate_cached_report(url_hash("never-stored")))
+    assert all(bloom.might_contain(h) for h in stored)
+
+
+def test_store_and_invalidate_during_a_rebuild(bloom, monkeypatch):
+    scanned = [url_hash(f"scanned-{i}") for i in range(10)]
+    collection = use_collection(monkeypatch, FakeCollection(scanned))
+    bloom._collection = collection
+
+    async def scenario():
+        await bloom.rebuild()
+
+        # Pause the next build halfway through its scan
+        collection.gate = asyncio.Event()
+        collection.pause_after = 5
+        build = asyncio.create_task(bloom.rebuild())
+        while collection.cursor is None or not collection.cursor.paused.is_set():
+            await asyncio.sleep(0)
+
+        await store("https://example.com/kept")
+        await store("https://example.com/dropped")
+        assert await database.invalidate_cached_report(url_hash("https://example.com/dropped"))
+        # Scanned or not yet scanned by the build: either way it must not be uncounted from it
+        assert await database.invalidate_cached_report(scanned[0])
+
+        collection.gate.set()
+        await build
+
+    asyncio.run(scenario())
+
+    # The scan's 10 documents plus the one stored (and kept) during the build
+    assert bloom.stats()["entries"] == 11
+    assert bloom.might_contain(url_hash("https://example.com/kept"))
+    assert all(bloom.might_contain(h) for h in scanned[1:])
+    assert asyncio.run(database.get_cached_report(url_hash("https://example.com/kept"))) is not None
+
+
+def test_filter_is_not_built_without_a_sole_writer(monkeypatch):
+    monkeypatch.setattr(settings, "BLOOM_SOLE_WRITER", False)
+    negative_filter = NegativeLookupFilter()
+
+    asyncio.run(negative_filter.startup(FakeCollection([url_hash("stored")])))
+
+    assert negative_filter.might_contain(url_hash("anything"))
+    assert not negative_filter.stats()["ready"]
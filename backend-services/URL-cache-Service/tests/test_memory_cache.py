@@ -0,0 +1,126 @@
+"""
+In-memory tier: byte budget, expiry at expires_at plus the grace window, no stale read after an invalidation
+"""
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+
+import db.memory_cache as memory_cache_module
+from config import settings
+from db import database
+from db.memory_cache import MemoryCache
+from fake_mongo import url_hash
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(memory_cache_module.time, "monotonic", clock)
+    return clock
+
+
+def _document(name: str, expires_in: timedelta = timedelta(days=7)):
+    now = datetime.utcnow()
+    return database.build_cache_document(name, url_hash(name), name, {"trust_score": 50}, 7, now) | {
+        "expires_at": now + expires_in
+    }
+
+
+def test_least_recently_used_documents_are_evicted_past_the_byte_budget(monkeypatch):
+    cache = MemoryCache()
+    cache.put("probe", _document("a"))
+    size = cache.bytes_used
+    monkeypatch.setattr(settings, "MEMORY_CACHE_MAX_BYTES", int(size * 2.5))
+
+    cache = MemoryCache()
+    cache.put("a", _document("a"))
+    cache.put("b", _document("b"))
+    cache.get("a")
+    cache.put("c", _document("c"))
+
+    assert cache.get("b") is None
+    assert cache.get("a") is not None and cache.get("c") is not None
+    assert cache.bytes_used <= settings.MEMORY_CACHE_MAX_BYTES
+    assert cache.evictions == 1
+
+
+def test_document_is_dropped_once_past_expires_at_plus_the_grace_window(clock, monkeypatch):
+    monkeypatch.setattr(settings, "CACHE_STALE_GRACE_HOURS", 1.0)
+    cache = MemoryCache()
+    # Expired 59 minutes ago: still served (stale) for another minute
+    cache.put("stale", _document("stale", expires_in=timedelta(minutes=-59)))
+    cache.put("gone", _document("gone", expires_in=timedelta(minutes=-61)))
+
+    assert cache.get("gone") is None
+    clock.now += 50
+    assert cache.get("stale") is not None
+    clock.now += 20
+    assert cache.get("stale") is None
+    assert cache.expirations == 1
+
+
+def test_document_lifetime_is_capped_at_the_memory_cache_ttl(clock, monkeypatch):
+    monkeypatch.setattr(settings, "MEMORY_CACHE_TTL_SECONDS", 300.0)
+    cache = MemoryCache()
+    cache.put("a", _document("a"))
+
+    clock.now += 299
+    assert cache.get("a") is not None
+    clock.now += 2
+    assert cache.get("a") is None
+
+
+def test_read_started_before_an_invalidation_is_not_cached(fake_db, monkeypatch):
+    name = "https://example.com/invalidated"
+    fake_db.collection.documents[url_hash(name)] = _document(name)
+    release = asyncio.Event()
+    read_started = asyncio.Event()
+    find_one = fake_db.collection.find_one
+
+    async def slow_find_one(query, *args, **kwargs):
+        document = await find_one(query, *args, **kwargs)
+        read_started.set()
+        await release.wait()
+        return document
+
+    monkeypatch.setattr(fake_db.collection, "find_one", slow_find_one)
+
+    async def scenario():
+        read = asyncio.create_task(database.get_cached_report(url_hash(name)))
+        await read_started.wait()
+        assert await database.invalidate_cached_report(url_hash(name))
+        release.set()
+        return await read
+
+    read = asyncio.run(scenario())
+
+    # The slow read returns what it found, but must not repopulate the memory tier
+    assert read is not None
+    assert fake_db.memory_cache.get(url_hash(name)) is None
+    assert asyncio.run(database.get_cached_report(url_hash(name))) is None
+
+
+def test_store_replaces_the_memory_entry(fake_db):
+    name = "https://example.com/replaced"
+
+    async def scenario():
+        await database.store_cached_report(name, url_hash(name), name, {"trust_score": 10}, ttl_days=7)
+        await database.get_cached_report(url_hash(name))
+        await database.store_cached_report(name, url_hash(name), name, {"trust_score": 90}, ttl_days=7)
+        reads_before = fake_db.collection.reads
+        document = await database.get_cached_report(url_hash(name))
+        return document, fake_db.collection.reads - reads_before
+
+    document, reads = asyncio.run(scenario())
+
+    assert document["report"]["trust_score"] == 90
+    assert reads == 0
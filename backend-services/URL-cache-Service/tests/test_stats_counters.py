@@ -0,0 +1,100 @@
+"""
+Cache statistics counters: kept by stores, invalidations and cleanup, checked against a full recount
+"""
+import asyncio
+from datetime import datetime, timedelta
+
+from db import database
+from db.stats_counters import CacheCounters
+from fake_mongo import url_hash
+
+COUNTS = ("total_entries", "valid_entries", "stale_entries", "expired_entries")
+
+
+def _counts(stats):
+    return {key: stats[key] for key in COUNTS}
+
+
+async def _store(name: str, ttl_days: float):
+    assert await database.store_cached_report(name, url_hash(name), name, {"trust_score": 50}, ttl_days)
+
+
+def test_counters_match_a_recount_after_stores_invalidations_and_cleanup(fake_db):
+    async def scenario():
+        await fake_db.counters.startup(fake_db.collection, fake_db.stats_collection)
+        try:
+            for i in range(3):
+                await _store(f"https://example.com/valid-{i}", ttl_days=7)
+            await _store("https://example.com/stale", ttl_days=-0.5)  # Within the 24h grace window
+            await _store("https://example.com/expired", ttl_days=-3)
+            # Replaced: its old expiry bucket is uncounted
+            await _store("https://example.com/valid-0", ttl_days=1)
+            await _store("https://example.com/replaced-stale", ttl_days=-0.5)
+            await _store("https://example.com/replaced-stale", ttl_days=7)
+            assert await database.invalidate_cached_report(url_hash("https://example.com/valid-1"))
+
+            counted = _counts(database.get_cache_statistics())
+            await database.recount_cache_statistics()
+            recounted = _counts(database.get_cache_statistics())
+
+            # /cleanup deletes the expired entry and drops its bucket from the counters
+            assert await database.cleanup_expired_cache() == 1
+            after_cleanup = _counts(database.get_cache_statistics())
+            await database.recount_cache_statistics()
+            recounted_after_cleanup = _counts(database.get_cache_statistics())
+            return counted, recounted, after_cleanup, recounted_after_cleanup
+        finally:
+            await fake_db.counters.shutdown()
+
+    counted, recounted, after_cleanup, recounted_after_cleanup = asyncio.run(scenario())
+
+    assert counted == recounted == {"total_entries": 5, "valid_entries": 3, "stale_entries": 1, "expired_entries": 2}
+    assert after_cleanup == recounted_after_cleanup == {
+        "total_entries": 4, "valid_entries": 3, "stale_entries": 1, "expired_entries": 1
+    }
+
+
+def test_bulk_store_is_counted_like_single_stores(fake_db):
+    async def scenario():
+        await fake_db.counters.startup(fake_db.collection, fake_db.stats_collection)
+        try:
+            await _store("https://example.com/a", ttl_days=7)
+            now = datetime.utcnow()
+            documents = [
+                database.build_cache_document(name, url_hash(name), name, {"trust_score": 1}, 7, now)
+                for name in ("https://example.com/a", "https://example.com/b", "https://example.com/b")
+            ]
+            documents.append(database.build_cache_document(
+                "https://example.com/c", url_hash("https://example.com/c"), "https://example.com/c",
+                {"trust_score": 1}, 7, now - timedelta(days=7, hours=1)
+            ))
+            assert await database.store_cached_reports(documents) == 3
+
+            counted = _counts(database.get_cache_statistics())
+            await database.recount_cache_statistics()
+            return counted, _counts(database.get_cache_statistics())
+        finally:
+            await fake_db.counters.shutdown()
+
+    counted, recounted = asyncio.run(scenario())
+
+    assert counted == recounted == {"total_entries": 3, "valid_entries": 2, "stale_entries": 1, "expired_entries": 1}
+
+
+def test_persisted_counters_are_loaded_by_another_replica(fake_db):
+    async def scenario():
+        await fake_db.counters.startup(fake_db.collection, fake_db.stats_collection)
+        for i in range(4):
+            await _store(f"https://example.com/{i}", ttl_days=7)
+        await database.invalidate_cached_report(url_hash("https://example.com/0"))
+        await fake_db.counters.shutdown()  # Persists the pending deltas
+
+        replica = CacheCounters()
+        await replica.startup(fake_db.collection, fake_db.stats_collection)
+        await replica.shutdown()
+        return replica
+
+    replica = asyncio.run(scenario())
+
+    assert _counts(replica.stats()) == {"total_entries": 3, "valid_entries": 3, "stale_entries": 0, "expired_entries": 0}
+    assert replica.stats()["counters"]["recounted_at"] is not None
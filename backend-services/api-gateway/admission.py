@@ -0,0 +1,123 @@
+"""
+Admission control - caps concurrent pipeline runs with a bounded wait queue and per-request deadlines
+"""
+from typing import Dict, Any, Deque
+from collections import deque
+from contextlib import asynccontextmanager
+import logging
+import asyncio
+import time
+
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class AdmissionRejected(Exception):
+    """Raised when a pipeline run is shed instead of admitted"""
+
+    def __init__(self, reason: str, retry_after: float):
+        self.reason = reason
+        self.retry_after = retry_after
+        super().__init__(f"Pipeline run rejected: {reason}")
+
+
+class AdmissionController:
+    """
+    At most ADMISSION_MAX_IN_FLIGHT pipeline runs at once
+
+    Further runs wait in a FIFO queue of at most ADMISSION_MAX_QUEUED
+    entries. A run is rejected straight away when the queue is full, and
+    while queued once its deadline passes, so a traffic spike is shed at
+    the gateway instead of piling onto the downstream services.
+    """
+
+    def __init__(self):
+        self.in_flight = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+        self.admitted = 0
+        self.queued_total = 0
+        self.rejected_queue_full = 0
+        self.rejected_deadline = 0
+        self.avg_run_seconds = 0.0  # EWMA of slot hold times, for Retry-After
+
+    @asynccontextmanager
+    async def slot(self, deadline: float):
+        """
+        Hold one pipeline slot for the enclosed block
+
+        Args:
+            deadline: time.monotonic() value after which the run is no longer wanted
+
+        Raises:
+            AdmissionRejected: If the queue is full or the deadline passes while queued
+        """
+        await self._acquire(deadline)
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            elapsed = time.monotonic() - started
+            self.avg_run_seconds = elapsed if not self.avg_run_seconds else 0.8 * self.avg_run_seconds + 0.2 * elapsed
+            self._release()
+
+    def retry_after(self) -> float:
+        """Estimated seconds until a slot frees up for a newly queued run"""
+        backlog = len(self._waiters) + 1
+        return max(1.0, self.avg_run_seconds * backlog / settings.ADMISSION_MAX_IN_FLIGHT)
+
+    def stats(self) -> Dict[str, Any]:
+        """In-flight and queued gauges plus admission counters"""
+        return {
+            "in_flight": self.in_flight,
+            "queued": len(self._waiters),
+            "max_in_flight": settings.ADMISSION_MAX_IN_FLIGHT,
+            "max_queued": settings.ADMISSION_MAX_QUEUED,
+            "admitted": self.admitted,
+            "queued_total": self.queued_total,
+            "rejected_queue_full": self.rejected_queue_full,
+            "rejected_deadline": self.rejected_deadline,
+            "avg_run_seconds": round(self.avg_run_seconds, 3)
+        }
+
+    async def _acquire(self, deadline: float):
+        if self.in_flight < settings.ADMISSION_MAX_IN_FLIGHT and not self._waiters:
+            self.in_flight += 1
+            self.admitted += 1
+            return
+
+        if len(self._waiters) >= settings.ADMISSION_MAX_QUEUED:
+            self.rejected_queue_full += 1
+            raise AdmissionRejected("queue full", self.retry_after())
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        self.queued_total += 1
+
+        try:
+            # A released slot is handed over by resolving the waiter (in_flight unchanged)
+            await asyncio.wait_for(waiter, timeout=max(0.0, deadline - time.monotonic()))
+        except asyncio.TimeoutError:
+            self.rejected_deadline += 1
+            raise AdmissionRejected("deadline exceeded while queued", self.retry_after())
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                self._release()  # Slot was handed over just as the caller went away
+            raise
+        finally:
+            if waiter in self._waiters:
+                self._waiters.remove(waiter)
+
+        self.admitted += 1
+
+    def _release(self):
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self.in_flight -= 1
+
+
+# Global admission controller shared by every pipeline run
+admission_controller = AdmissionController()
@@ -6,8 +6,16 @@ from fastapi.middleware.cors import CORSMiddleware
 import logging
 
 from config import settings
+from backends import service_backend
+from jobs import job_queue
+from rate_limiter import rate_limiter
+from report_writer import report_writer
+from health_monitor import health_monitor
+from prewarm import prewarm_scheduler
+from pipeline import analysis_pipeline
+from metrics import ServerTimingMiddleware
 # from routes import auth, analysis, health  # Original import
-from routes import analysis, health  # Auth commented out for now
+from routes import analysis, jobs, health, metrics  # Auth commented out for now
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -27,12 +35,42 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["Server-Timing", "Retry-After", "X-Quota-Limit", "X-Quota-Remaining", "X-Quota-Cost"],
 )
 
+# Per-stage timings of each request, as a Server-Timing header
+app.add_middleware(ServerTimingMiddleware)
+
 # Include routers
 # app.include_router(auth.router, prefix="/auth", tags=["Authentication"])  # Auth disabled for now
 app.include_router(analysis.router, tags=["Analysis"])
+app.include_router(jobs.router, tags=["Analysis Jobs"])
 app.include_router(health.router, tags=["Health"])
+app.include_router(metrics.router, tags=["Metrics"])
+
+
+@app.on_event("startup")
+async def startup_event():
+    """Connect to the downstream services (HTTP clients or in-process) and start background workers"""
+    await service_backend.startup()
+    await rate_limiter.startup()
+    await report_writer.startup()
+    await health_monitor.startup()
+    await job_queue.startup()
+    await prewarm_scheduler.startup()
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Stop background workers and disconnect from the downstream services"""
+    await prewarm_scheduler.shutdown()
+    await job_queue.shutdown()
+    await health_monitor.shutdown()
+    await rate_limiter.shutdown()
+    await analysis_pipeline.shutdown()
+    await report_writer.shutdown()
+    await service_backend.shutdown()
+
 
 @app.get("/")
 async def root():
@@ -0,0 +1,503 @@
+"""
+Service backends - one interface to the downstream services, over HTTP or in-process
+
+In "services" mode (the default) every call goes over HTTP to the
+separately deployed services, through the shared pooled clients and their
+circuit breakers. In "monolith" mode the gateway imports the services'
+pipelines, scrapers and storage into its own process and calls them
+directly, saving the HTTP hops and JSON round-trips per analysis.
+"""
+from typing import Dict, Any, List, Optional, AsyncIterator
+from abc import ABC, abstractmethod
+from types import ModuleType
+from fastapi import HTTPException
+import logging
+import asyncio
+import json
+import os
+import sys
+import msgpack
+
+from common.deadline import DeadlineExceeded
+from config import settings
+from http_clients import service_clients
+from service_loader import load_service
+
+logger = logging.getLogger(__name__)
+
+MSGPACK_MEDIA_TYPE = "application/msgpack"
+
+# Service directory (under MONOLITH_SERVICES_ROOT) of each downstream service
+SERVICE_DIRS = {
+    'url_cache': 'URL-cache-Service',
+    'scraper': 'scraper-service',
+    'nlp': 'nlp-service',
+    'behavior': 'behavior-service',
+    'scoring': 'scoring-service',
+    'report': 'report-service'
+}
+
+
+class ServiceCallError(Exception):
+    """A downstream service answered, but with an error"""
+
+    def __init__(self, service_name: str, status_code: int, detail: Any):
+        self.service_name = service_name
+        self.status_code = status_code
+        self.detail = detail
+        super().__init__(str(detail))
+
+
+class ServiceBackend(ABC):
+    """Calls made by the gateway to the downstream services"""
+
+    mode = ""
+
+    async def startup(self):
+        pass
+
+    async def shutdown(self):
+        pass
+
+    @abstractmethod
+    async def check_cache(self, product_url: str) -> Dict[str, Any]:
+        """URL Cache Service lookup (cached, valid, report, expires_at, ...)"""
+        raise NotImplementedError
+
+    @abstractmethod
+    async def check_cache_batch(self, product_urls: List[str]) -> List[Dict[str, Any]]:
+        """URL Cache Service lookups for several URLs in one call, in the same order"""
+        raise NotImplementedError
+
+    @abstractmethod
+    async def store_cache(self, product_url: str, report: Dict[str, Any], ttl_days: int):
+        """Store (or replace) the URL Cache Service entry of a product"""
+        raise NotImplementedError
+
+    @abstractmethod
+    async def invalidate_cache(self, product_url: str) -> Dict[str, Any]:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def scrape(self, product_url: str) -> Dict[str, Any]:
+        """Mock-scrape the product's reviews and metadata"""
+        raise NotImplementedError
+
+    @abstractmethod
+    def scrape_stream(self, product_url: str, chunk_size: int) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Mock-scrape the product, yielding its reviews in chunks as they are scraped
+
+        Yields a "metadata" event, one "reviews" event per chunk and a final
+        "done" event (see the Scraper Service's /scrape/stream).
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    async def analyze(self, service_name: str, reviews: List[Dict[str, Any]], quick: bool = False) -> Dict[str, Any]:
+        """
+        Run the NLP ('nlp') or behavior ('behavior') analysis
+
+        quick=True runs the cheap variant used for provisional scores (VADER
+        sentiment only, or rating distribution and verification rate only).
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    async def open_session(self, service_name: str) -> str:
+        """Open an incremental NLP or behavior analysis session and return its id"""
+        raise NotImplementedError
+
+    @abstractmethod
+    async def add_chunk(self, service_name: str, session_id: str, reviews: List[Dict[str, Any]]):
+        raise NotImplementedError
+
+    @abstractmethod
+    async def finish_session(self, service_name: str, session_id: str) -> Dict[str, Any]:
+        """Close a session and return its analysis (same response as analyze())"""
+        raise NotImplementedError
+
+    @abstractmethod
+    async def discard_session(self, service_name: str, session_id: str):
+        raise NotImplementedError
+
+    @abstractmethod
+    async def score(self, payload: Dict[str, Any], quick: bool = False) -> Dict[str, Any]:
+        """Compute the trust score (quick=True: provisional score from the quick analyses)"""
+        raise NotImplementedError
+
+    @abstractmethod
+    async def store_reports(self, reports: List[Dict[str, Any]]):
+        """Persist reports ({url, report, ttl_days}) in the Report Service"""
+        raise NotImplementedError
+
+    @abstractmethod
+    async def record_accesses(self, accesses: Dict[str, int]):
+        """Add reads served by the gateway (URL -> count) to the reports' access counters"""
+        raise NotImplementedError
+
+    @abstractmethod
+    async def prewarm_candidates(
+        self,
+        expiring_within_hours: float,
+        limit: int,
+        min_access_count: int
+    ) -> List[Dict[str, Any]]:
+        """Most-accessed reports expiring soon ({url, access_count, expires_at, ...})"""
+        raise NotImplementedError
+
+    @abstractmethod
+    async def probe(self, service_name: str, timeout: float):
+        """Raise if the service is unhealthy (ServiceCallError) or unreachable"""
+        raise NotImplementedError
+
+
+class HttpServiceBackend(ServiceBackend):
+    """Separately deployed services, called over the shared HTTP clients"""
+
+    mode = "services"
+
+    async def startup(self):
+        await service_clients.startup()
+
+    async def shutdown(self):
+        await service_clients.shutdown()
+
+    async def check_cache(self, product_url: str) -> Dict[str, Any]:
+        return await self._call('url_cache', "GET", "/check-cache", params={"url": product_url})
+
+    async def check_cache_batch(self, product_urls: List[str]) -> List[Dict[str, Any]]:
+        response = await self._call('url_cache', "POST", "/check-cache/batch", json={"urls": product_urls})
+        return response["results"]
+
+    async def store_cache(self, product_url: str, report: Dict[str, Any], ttl_days: int):
+        await self._call('url_cache', "POST", "/store", json={"url": product_url, "report": report, "ttl_days": ttl_days})
+
+    async def invalidate_cache(self, product_url: str) -> Dict[str, Any]:
+        return await self._call('url_cache', "POST", "/invalidate", json={"url": product_url})
+
+    async def scrape(self, product_url: str) -> Dict[str, Any]:
+        # USING MOCK ENDPOINT FOR TESTING - Change to /scrape for production
+        return await self._call('scraper', "POST", "/scrape/mock", json={"url": product_url})
+
+    async def scrape_stream(self, product_url: str, chunk_size: int) -> AsyncIterator[Dict[str, Any]]:
+        # USING MOCK ENDPOINT FOR TESTING - Change to /scrape/stream for production
+        async with service_clients.stream(
+            'scraper', "POST", "/scrape/mock/stream", json={"url": product_url, "chunk_size": chunk_size}
+        ) as response:
+            if response.status_code != 200:
+                await response.aread()
+                raise ServiceCallError('scraper', response.status_code, response.text)
+
+            async for line in response.aiter_lines():
+                if not line:
+                    continue
+                event = json.loads(line)
+                if event["type"] == "error":
+                    raise ServiceCallError('scraper', 500, event["detail"])
+                yield event
+
+    async def analyze(self, service_name: str, reviews: List[Dict[str, Any]], quick: bool = False) -> Dict[str, Any]:
+        path = "/analyze/quick" if quick else "/analyze"
+        return await self._call(service_name, "POST", path, json={"reviews": reviews})
+
+    async def open_session(self, service_name: str) -> str:
+        session = await self._call(service_name, "POST", "/sessions")
+        return session["session_id"]
+
+    async def add_chunk(self, service_name: str, session_id: str, reviews: List[Dict[str, Any]]):
+        await self._call(
+            service_name, "POST", f"/sessions/{session_id}/chunks",
+            json={"reviews": reviews}, endpoint="/sessions/{session_id}/chunks"
+        )
+
+    async def finish_session(self, service_name: str, session_id: str) -> Dict[str, Any]:
+        return await self._call(
+            service_name, "POST", f"/sessions/{session_id}/finish", endpoint="/sessions/{session_id}/finish"
+        )
+
+    async def discard_session(self, service_name: str, session_id: str):
+        await self._call(service_name, "DELETE", f"/sessions/{session_id}", endpoint="/sessions/{session_id}")
+
+    async def score(self, payload: Dict[str, Any], quick: bool = False) -> Dict[str, Any]:
+        path = "/calculate-score/quick" if quick else "/calculate-score"
+        return await self._call('scoring', "POST", path, json=payload)
+
+    async def store_reports(self, reports: List[Dict[str, Any]]):
+        await self._call('report', "POST", "/reports/store/batch", json={"reports": reports})
+
+    async def record_accesses(self, accesses: Dict[str, int]):
+        await self._call('report', "POST", "/reports/access", json={"accesses": accesses})
+
+    async def prewarm_candidates(
+        self,
+        expiring_within_hours: float,
+        limit: int,
+        min_access_count: int
+    ) -> List[Dict[str, Any]]:
+        data = await self._call('report', "GET", "/reports/prewarm-candidates", params={
+            "expiring_within_hours": expiring_within_hours,
+            "limit": limit,
+            "min_access_count": min_access_count
+        })
+        return data["candidates"]
+
+    async def probe(self, service_name: str, timeout: float):
+        # Probes bypass the circuit breaker so they keep reporting while it is open
+        response = await service_clients.get(service_name).get("/health", timeout=timeout)
+        if response.status_code != 200:
+            raise ServiceCallError(service_name, response.status_code, f"HTTP {response.status_code}")
+
+    async def _call(
+        self,
+        service_name: str,
+        method: str,
+        path: str,
+        json: Optional[Dict[str, Any]] = None,
+        **kwargs
+    ) -> Dict[str, Any]:
+        """Send a request, msgpack-encoded for MSGPACK_SERVICES, and decode the response"""
+        if service_name in settings.MSGPACK_SERVICES:
+            kwargs["headers"] = {"Accept": f"{MSGPACK_MEDIA_TYPE}, application/json;q=0.9"}
+            if json is not None:
+                kwargs["content"] = msgpack.packb(json)
+                kwargs["headers"]["Content-Type"] = MSGPACK_MEDIA_TYPE
+        elif json is not None:
+            kwargs["json"] = json
+
+        response = await service_clients.request(service_name, method, path, **kwargs)
+        if response.status_code != 200:
+            raise ServiceCallError(service_name, response.status_code, response.text)
+
+        # Services answer in JSON when they cannot (or were not asked to) use msgpack
+        if response.headers.get("content-type", "").startswith(MSGPACK_MEDIA_TYPE):
+            return msgpack.unpackb(response.content)
+        return response.json()
+
+
+class InProcessServiceBackend(ServiceBackend):
+    """
+    All services imported into the gateway process ("monolith" mode)
+
+    Each service is loaded from its directory under MONOLITH_SERVICES_ROOT
+    (the modules shared by the services, common/, are imported once for
+    all of them) and its startup hooks run (database connections for the URL Cache and
+    Report services), so the process needs every service's environment
+    variables; variables with the same name (MONGO_DB, PORT, ...) are
+    shared by all services. CPU-bound analysis and scoring run in worker
+    threads to keep the event loop responsive.
+    """
+
+    mode = "monolith"
+
+    def __init__(self):
+        self._services: Dict[str, Dict[str, ModuleType]] = {}
+
+    async def startup(self):
+        root = settings.MONOLITH_SERVICES_ROOT or os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+        # The services import their shared modules (common/) from the root
+        root = os.path.abspath(root)
+        if root not in sys.path:
+            sys.path.append(root)
+
+        for service_name, directory in SERVICE_DIRS.items():
+            modules = load_service(os.path.join(root, directory))
+            await modules["app"].app.router.startup()
+            self._services[service_name] = modules
+
+        logger.info(f"Services running in-process: {', '.join(self._services)}")
+
+    async def shutdown(self):
+        for modules in self._services.values():
+            await modules["app"].app.router.shutdown()
+        self._services.clear()
+
+    async def check_cache(self, product_url: str) -> Dict[str, Any]:
+        routes = self._module('url_cache', "routes.cache")
+        return await self._route('url_cache', routes.check_cache(product_url))
+
+    async def check_cache_batch(self, product_urls: List[str]) -> List[Dict[str, Any]]:
+        models = self._module('url_cache', "models")
+        routes = self._module('url_cache', "routes.cache")
+        request = models.CheckCacheBatchRequest(urls=product_urls)
+        response = await self._route('url_cache', routes.check_cache_batch(request))
+        return response["results"]
+
+    async def store_cache(self, product_url: str, report: Dict[str, Any], ttl_days: int):
+        models = self._module('url_cache', "models")
+        routes = self._module('url_cache', "routes.cache")
+        request = self._validate('url_cache', models.StoreCacheRequest, {
+            "url": product_url, "report": report, "ttl_days": ttl_days
+        })
+        await self._route('url_cache', routes.store_cache(request))
+
+    async def invalidate_cache(self, product_url: str) -> Dict[str, Any]:
+        models = self._module('url_cache', "models")
+        routes = self._module('url_cache', "routes.cache")
+        request = models.InvalidateCacheRequest(url=product_url)
+        return await self._route('url_cache', routes.invalidate_cache(request))
+
+    async def scrape(self, product_url: str) -> Dict[str, Any]:
+        models = self._module('scraper', "models")
+        routes = self._module('scraper', "routes.scraper")
+        request = models.ScrapeRequest(url=product_url)
+        return await self._route('scraper', routes.mock_scrape_reviews(request))
+
+    async def scrape_stream(self, product_url: str, chunk_size: int) -> AsyncIterator[Dict[str, Any]]:
+        scrapers = self._module('scraper', "scrapers")
+        models = self._module('scraper', "models")
+        request = self._validate('scraper', models.ScrapeRequest, {"url": product_url})
+
+        metadata_sent = False
+        total_reviews = 0
+        try:
+            async for metadata, reviews in scrapers.MockScraper().scrape_pages(
+                request.url, request.max_reviews, chunk_size
+            ):
+                if not metadata_sent:
+                    yield {
+                        "type": "metadata",
+                        "platform": metadata.platform,
+                        "scraping_method": "mock",
+                        "product_metadata": self._to_json(metadata)
+                    }
+                    metadata_sent = True
+                total_reviews += len(reviews)
+                yield {"type": "reviews", "reviews": [self._to_json(review) for review in reviews]}
+        except Exception as e:
+            raise ServiceCallError('scraper', 500, f"Mock scraping failed: {str(e)}")
+
+        yield {"type": "done", "total_reviews_scraped": total_reviews}
+
+    async def analyze(self, service_name: str, reviews: List[Dict[str, Any]], quick: bool = False) -> Dict[str, Any]:
+        if not reviews:
+            raise ServiceCallError(service_name, 400, "No reviews provided")
+
+        models = self._module(service_name, "models")
+        pipeline = self._module(service_name, "pipeline")
+        request = self._validate(service_name, models.AnalyzeRequest, {"reviews": reviews})
+        if service_name == 'nlp':
+            pipeline_class = pipeline.QuickNLPPipeline if quick else pipeline.NLPPipeline
+            run = lambda: pipeline_class().analyze_reviews(request.reviews)
+        elif quick:
+            run = lambda: pipeline.BehaviorPipeline().analyze_ratings(request.reviews)
+        else:
+            run = lambda: pipeline.BehaviorPipeline().analyze_reviews(request.reviews)
+
+        return await self._run_in_thread(service_name, run)
+
+    async def open_session(self, service_name: str) -> str:
+        return self._module(service_name, "routes.analysis").session_store.create()
+
+    async def add_chunk(self, service_name: str, session_id: str, reviews: List[Dict[str, Any]]):
+        models = self._module(service_name, "models")
+        request = self._validate(service_name, models.AnalyzeRequest, {"reviews": reviews})
+        session = self._session(service_name, session_id)
+        await self._run_in_thread(service_name, lambda: session.add_reviews(request.reviews))
+
+    async def finish_session(self, service_name: str, session_id: str) -> Dict[str, Any]:
+        session = self._session(service_name, session_id, close=True)
+        if not session.reviews:
+            raise ServiceCallError(service_name, 400, "No reviews provided")
+        return await self._run_in_thread(service_name, session.finish)
+
+    async def discard_session(self, service_name: str, session_id: str):
+        self._module(service_name, "routes.analysis").session_store.pop(session_id)
+
+    async def score(self, payload: Dict[str, Any], quick: bool = False) -> Dict[str, Any]:
+        models = self._module('scoring', "models")
+        pipeline = self._module('scoring', "pipeline")
+        request = self._validate('scoring', models.ScoreRequest, payload)
+        scoring = pipeline.ScoringPipeline()
+        generate = scoring.generate_quick_score if quick else scoring.generate_final_score
+
+        return await self._run_in_thread('scoring', lambda: generate(
+            request.nlp_results,
+            request.behavior_results,
+            request.product_metadata
+        ))
+
+    async def store_reports(self, reports: List[Dict[str, Any]]):
+        models = self._module('report', "models")
+        routes = self._module('report', "routes.reports")
+        request = self._validate('report', models.StoreReportBatchRequest, {"reports": reports})
+        await self._route('report', routes.store_reports_batch(request))
+
+    async def record_accesses(self, accesses: Dict[str, int]):
+        models = self._module('report', "models")
+        routes = self._module('report', "routes.reports")
+        request = self._validate('report', models.RecordAccessRequest, {"accesses": accesses})
+        await self._route('report', routes.record_accesses(request))
+
+    async def prewarm_candidates(
+        self,
+        expiring_within_hours: float,
+        limit: int,
+        min_access_count: int
+    ) -> List[Dict[str, Any]]:
+        routes = self._module('report', "routes.listing")
+        data = await self._route('report', routes.list_prewarm_candidates(
+            expiring_within_hours, limit, min_access_count
+        ))
+        return data["candidates"]
+
+    async def probe(self, service_name: str, timeout: float):
+        routes = self._module(service_name, "routes.health")
+        await asyncio.wait_for(routes.health_check(), timeout=timeout)
+
+    def _module(self, service_name: str, module_name: str) -> ModuleType:
+        modules = self._services.get(service_name)
+        if modules is None:
+            raise RuntimeError(f"Service '{service_name}' not loaded in-process")
+        return modules[module_name]
+
+    def _session(self, service_name: str, session_id: str, close: bool = False):
+        """Look up (or, with close, remove) an open analysis session"""
+        session_store = self._module(service_name, "routes.analysis").session_store
+        session = session_store.pop(session_id) if close else session_store.get(session_id)
+        if session is None:
+            raise ServiceCallError(service_name, 404, f"Session {session_id} not found or expired")
+        return session
+
+    def _validate(self, service_name: str, model, data: Dict[str, Any]):
+        """Parse a request into the service's model, as FastAPI would"""
+        try:
+            return model(**data)
+        except Exception as e:
+            raise ServiceCallError(service_name, 422, str(e))
+
+    async def _route(self, service_name: str, call) -> Dict[str, Any]:
+        """Await a service route function and convert its result to JSON data"""
+        try:
+            return self._to_json(await call)
+        except HTTPException as e:
+            raise ServiceCallError(service_name, e.status_code, e.detail)
+        except DeadlineExceeded as e:
+            # The pipeline's deadline (shared ContextVar) ran out inside the service
+            raise ServiceCallError(service_name, 504, str(e))
+
+    async def _run_in_thread(self, service_name: str, func) -> Dict[str, Any]:
+        try:
+            return self._to_json(await asyncio.to_thread(func))
+        except DeadlineExceeded as e:
+            raise ServiceCallError(service_name, 504, str(e))
+        except Exception as e:
+            logger.error(f"{service_name} pipeline failed: {str(e)}", exc_info=True)
+            raise ServiceCallError(service_name, 500, f"Analysis failed: {str(e)}")
+
+    def _to_json(self, result: Any) -> Dict[str, Any]:
+        if hasattr(result, "model_dump"):
+            return result.model_dump(mode="json")
+        return result
+
+
+def _create_backend() -> ServiceBackend:
+    if settings.DEPLOYMENT_MODE == "monolith":
+        return InProcessServiceBackend()
+    if settings.DEPLOYMENT_MODE != "services":
+        raise ValueError(f"Unknown DEPLOYMENT_MODE: {settings.DEPLOYMENT_MODE}")
+    return HttpServiceBackend()
+
+
+# Global backend used by the pipeline, report writer and health monitor (started on application startup)
+service_backend = _create_backend()
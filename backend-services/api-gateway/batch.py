@@ -0,0 +1,141 @@
+"""
+Batch analysis - de-duplicate URLs, resolve cache hits up front, analyze misses concurrently
+"""
+from typing import Dict, Any, List, Tuple, AsyncIterator
+from fastapi import HTTPException
+from pydantic import ValidationError
+import logging
+import asyncio
+import time
+
+from models import AnalyzeRequest, AnalysisResponse
+from pipeline import analysis_pipeline
+from config import settings
+from utils.url_utils import normalize_url
+
+logger = logging.getLogger(__name__)
+
+
+class BatchAnalyzer:
+    """Runs a list of product URLs through the pipeline with bounded concurrency"""
+
+    def __init__(self):
+        self.batches = 0
+        self.urls_received = 0
+        self.urls_completed = 0
+        self.last_urls_per_second = 0.0
+
+    async def run(self, product_urls: List[str], force_refresh: bool = False) -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
+        """
+        Analyze a batch of URLs, yielding one event per unique URL as it completes
+
+        Yields:
+            ("result", data) for every unique URL (or invalid input), then a
+            final ("summary", data) with counts and URLs/second
+        """
+        started = time.monotonic()
+        self.batches += 1
+        self.urls_received += len(product_urls)
+
+        # Group inputs by normalized URL; the first spelling is the one analyzed
+        groups: Dict[str, List[str]] = {}
+        invalid = 0
+        for url in product_urls:
+            try:
+                AnalyzeRequest(product_url=url)
+            except ValidationError as e:
+                invalid += 1
+                yield "result", self._error(url, [url], f"Invalid product URL: {e.errors()[0]['msg']}")
+                continue
+            groups.setdefault(normalize_url(url), []).append(url)
+
+        pending = {group[0]: group for group in groups.values()}
+        counts = {"cache_hits": 0, "analyzed": 0, "failed": 0}
+
+        # Resolve cache hits before spending pipeline capacity on anything
+        if not force_refresh and pending:
+            cached = await analysis_pipeline.check_cache_many(list(pending))
+            for url, response in cached.items():
+                if response is not None:
+                    counts["cache_hits"] += 1
+                    yield "result", self._success(url, pending.pop(url), response)
+
+        semaphore = asyncio.Semaphore(settings.BATCH_CONCURRENCY)
+
+        async def analyze(url: str):
+            async with semaphore:
+                request = AnalyzeRequest(product_url=url, force_refresh=force_refresh)
+                try:
+                    response = await analysis_pipeline.run(request, check_cache=False)
+                    return url, response, None
+                except HTTPException as e:
+                    return url, None, str(e.detail)
+                except Exception as e:
+                    logger.exception(f"Batch analysis failed for {url}: {str(e)}")
+                    return url, None, f"Analysis failed: {str(e)}"
+
+        tasks = [asyncio.ensure_future(analyze(url)) for url in pending]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                url, response, error = await next_done
+                if error is None:
+                    counts["analyzed"] += 1
+                    yield "result", self._success(url, pending[url], response)
+                else:
+                    counts["failed"] += 1
+                    yield "result", self._error(url, pending[url], error)
+        finally:
+            # Client went away - stop scheduling the rest of the batch (runs nobody else waits for are cancelled)
+            for task in tasks:
+                task.cancel()
+
+        elapsed = time.monotonic() - started
+        completed = len(groups) + invalid
+        urls_per_second = round(completed / elapsed, 2) if elapsed > 0 else 0.0
+        self.urls_completed += completed
+        self.last_urls_per_second = urls_per_second
+
+        logger.info(
+            f"Batch finished: {len(product_urls)} URLs ({len(groups)} unique) "
+            f"in {elapsed:.2f}s, {urls_per_second} URLs/s"
+        )
+
+        yield "summary", {
+            "total_urls": len(product_urls),
+            "unique_urls": len(groups),
+            "duplicates": len(product_urls) - len(groups) - invalid,
+            "invalid": invalid,
+            **counts,
+            "elapsed_seconds": round(elapsed, 3),
+            "urls_per_second": urls_per_second
+        }
+
+    def stats(self) -> Dict[str, Any]:
+        """Batch counters and the throughput of the last batch"""
+        return {
+            "batches": self.batches,
+            "urls_received": self.urls_received,
+            "urls_completed": self.urls_completed,
+            "last_urls_per_second": self.last_urls_per_second,
+            "concurrency": settings.BATCH_CONCURRENCY
+        }
+
+    def _success(self, url: str, input_urls: List[str], response: AnalysisResponse) -> Dict[str, Any]:
+        return {
+            "product_url": url,
+            "input_urls": input_urls,
+            "status": "success",
+            "result": response.model_dump()
+        }
+
+    def _error(self, url: str, input_urls: List[str], error: str) -> Dict[str, Any]:
+        return {
+            "product_url": url,
+            "input_urls": input_urls,
+            "status": "error",
+            "error": error
+        }
+
+
+# Global batch analyzer instance
+batch_analyzer = BatchAnalyzer()
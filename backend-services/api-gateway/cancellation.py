@@ -0,0 +1,112 @@
+"""
+Request deadlines and cancellation - stops downstream work whose result nobody will read
+"""
+from typing import Dict, Any, Awaitable, TypeVar
+from fastapi import HTTPException, Request
+import logging
+import asyncio
+import time
+
+from common.deadline import DEADLINE_HEADER, DEADLINE_EXCEEDED_HEADER, request_deadline
+from metrics import StageTimer, latency_metrics
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Stages whose downstream work is CPU-bound (wall time approximates CPU time)
+CPU_BOUND_STAGES = ["nlp", "behavior", "score"]
+
+# Non-standard status (as used by nginx) for requests the client abandoned
+STATUS_CLIENT_CLOSED_REQUEST = 499
+
+
+def deadline_headers() -> Dict[str, str]:
+    """
+    Headers carrying the current run's remaining time to a downstream service
+
+    request_deadline is the services' own (common.deadline): set by the
+    pipeline for its run, it is also the deadline the in-process services
+    check in monolith mode.
+    """
+    deadline = request_deadline.get()
+    if deadline is None:
+        return {}
+    remaining_ms = max(0, int((deadline - time.monotonic()) * 1000))
+    return {DEADLINE_HEADER: str(remaining_ms)}
+
+
+def deadline_exceeded(status_code: int, headers) -> bool:
+    """Whether a downstream response is an abort on the deadline this gateway sent"""
+    return status_code == 504 and headers.get(DEADLINE_EXCEEDED_HEADER, "").lower() == "true"
+
+
+class CancellationMetrics:
+    """
+    Clients that went away mid-analysis and the downstream work cancelled for them
+
+    Cancelling a run drops its in-flight downstream calls, and the services
+    stop work once the propagated deadline passes. The CPU time saved is
+    estimated from the stages that had not finished yet: the mean duration
+    of each CPU-bound stage on a full run, less the time the stage had
+    already used.
+    """
+
+    def __init__(self):
+        self.clients_disconnected = 0
+        self.runs_cancelled = 0
+        self.cpu_seconds_saved = 0.0
+
+    def record_cancelled_run(self, timer: StageTimer) -> float:
+        """Count a cancelled pipeline run and return the CPU-seconds it saved"""
+        saved = sum(
+            max(0.0, latency_metrics.mean(stage, "miss") - timer.durations.get(stage, 0.0))
+            for stage in CPU_BOUND_STAGES
+        )
+        self.runs_cancelled += 1
+        self.cpu_seconds_saved += saved
+        return saved
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "clients_disconnected": self.clients_disconnected,
+            "runs_cancelled": self.runs_cancelled,
+            "cpu_seconds_saved_estimate": round(self.cpu_seconds_saved, 3)
+        }
+
+
+async def run_until_disconnect(http_request: Request, work: Awaitable[T]) -> T:
+    """
+    Await work, cancelling it if the client disconnects first
+
+    Raises:
+        HTTPException: 499 if the client disconnected (the response is never sent)
+    """
+    work_task = asyncio.ensure_future(work)
+    disconnect_task = asyncio.ensure_future(_wait_for_disconnect(http_request))
+
+    try:
+        await asyncio.wait({work_task, disconnect_task}, return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        disconnect_task.cancel()
+        if not work_task.done():
+            work_task.cancel()
+            await asyncio.gather(work_task, return_exceptions=True)
+
+    if work_task.cancelled() and disconnect_task.done() and not disconnect_task.cancelled():
+        cancellation_metrics.clients_disconnected += 1
+        logger.info(f"Client disconnected from {http_request.url.path}, analysis cancelled")
+        raise HTTPException(status_code=STATUS_CLIENT_CLOSED_REQUEST, detail="Client closed request")
+    return work_task.result()
+
+
+async def _wait_for_disconnect(http_request: Request):
+    # The body has already been read, so the next message is the disconnect
+    while True:
+        message = await http_request.receive()
+        if message["type"] == "http.disconnect":
+            return
+
+
+# Global cancellation counters
+cancellation_metrics = CancellationMetrics()
@@ -0,0 +1,172 @@
+"""
+Circuit breakers and latency-adaptive timeouts for downstream services
+"""
+from typing import Dict, Any, Optional
+from collections import deque
+import logging
+import math
+import time
+
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling a service whose circuit is open"""
+
+    def __init__(self, service_name: str, retry_after: float):
+        self.service_name = service_name
+        self.retry_after = retry_after
+        super().__init__(f"Circuit open for {service_name} service, retry in {retry_after:.0f}s")
+
+
+class CircuitBreaker:
+    """
+    Closed/open/half-open breaker for one service
+
+    BREAKER_FAILURE_THRESHOLD consecutive failures (transport errors,
+    timeouts or 5xx) open the circuit; calls then fail fast for
+    BREAKER_RESET_TIMEOUT seconds. After that a limited number of trial
+    calls are let through (half-open): one success closes the circuit,
+    one failure opens it again.
+
+    Also tracks recent latencies of successful calls to derive the
+    per-call timeout: ADAPTIVE_TIMEOUT_MULTIPLIER x p99, clamped between
+    ADAPTIVE_TIMEOUT_MIN and the service's configured pool timeout. Each
+    endpoint (route template, e.g. "/sessions/{session_id}/chunks") keeps
+    its own latency window, so quick calls to one endpoint do not shrink
+    the timeout of slow calls to another.
+    """
+
+    def __init__(self, service_name: str, max_timeout: float):
+        self.service_name = service_name
+        self.max_timeout = max_timeout
+        self.state = CLOSED
+        self.opened_at = 0.0
+        self.consecutive_failures = 0
+        self.half_open_in_flight = 0
+        self.successes = 0
+        self.failures = 0
+        self.rejected = 0
+        self.times_opened = 0
+        self._latencies: Dict[str, deque] = {}  # Endpoint -> recent latencies
+
+    def before_call(self):
+        """
+        Admit or reject a call
+
+        Raises:
+            CircuitOpenError: If the circuit is open (or half-open and out of trial calls)
+        """
+        if self.state == OPEN:
+            remaining = self.opened_at + settings.BREAKER_RESET_TIMEOUT - time.monotonic()
+            if remaining > 0:
+                self.rejected += 1
+                raise CircuitOpenError(self.service_name, remaining)
+            self._transition(HALF_OPEN)
+
+        if self.state == HALF_OPEN:
+            if self.half_open_in_flight >= settings.BREAKER_HALF_OPEN_MAX_CALLS:
+                self.rejected += 1
+                raise CircuitOpenError(self.service_name, settings.BREAKER_RESET_TIMEOUT)
+            self.half_open_in_flight += 1
+
+    def record_success(self, endpoint: str, latency: float):
+        self._release()
+        self.successes += 1
+        self.consecutive_failures = 0
+        window = self._latencies.get(endpoint)
+        if window is None:
+            window = self._latencies[endpoint] = deque(maxlen=settings.ADAPTIVE_TIMEOUT_WINDOW)
+        window.append(latency)
+        if self.state != CLOSED:
+            self._transition(CLOSED)
+
+    def record_failure(self):
+        self._release()
+        self.failures += 1
+        self.consecutive_failures += 1
+        if self.state == HALF_OPEN or self.consecutive_failures >= settings.BREAKER_FAILURE_THRESHOLD:
+            self._transition(OPEN)
+
+    def record_cancelled(self):
+        """The call was abandoned (client went away) - neither success nor failure"""
+        self._release()
+
+    def timeout(self, endpoint: str) -> float:
+        """Per-call timeout for an endpoint, derived from its recent latency"""
+        p99 = self.latency_p99(endpoint)
+        if p99 is None:
+            return self.max_timeout
+        adaptive = p99 * settings.ADAPTIVE_TIMEOUT_MULTIPLIER
+        return min(self.max_timeout, max(settings.ADAPTIVE_TIMEOUT_MIN, adaptive))
+
+    def latency_p99(self, endpoint: str) -> Optional[float]:
+        """p99 of recent successful calls to an endpoint, once there are enough samples"""
+        window = self._latencies.get(endpoint, ())
+        if len(window) < settings.ADAPTIVE_TIMEOUT_MIN_SAMPLES:
+            return None
+        ordered = sorted(window)
+        return ordered[min(len(ordered) - 1, math.ceil(0.99 * len(ordered)) - 1)]
+
+    def stats(self) -> Dict[str, Any]:
+        endpoints = {}
+        for endpoint in sorted(self._latencies):
+            p99 = self.latency_p99(endpoint)
+            endpoints[endpoint] = {
+                "samples": len(self._latencies[endpoint]),
+                "latency_p99_ms": round(p99 * 1000, 2) if p99 is not None else None,
+                "timeout_seconds": round(self.timeout(endpoint), 3)
+            }
+        return {
+            "state": self.state,
+            "consecutive_failures": self.consecutive_failures,
+            "successes": self.successes,
+            "failures": self.failures,
+            "rejected": self.rejected,
+            "times_opened": self.times_opened,
+            "endpoints": endpoints
+        }
+
+    def _release(self):
+        if self.half_open_in_flight:
+            self.half_open_in_flight -= 1
+
+    def _transition(self, state: str):
+        if state == OPEN:
+            self.opened_at = time.monotonic()
+            self.times_opened += 1
+        if state != HALF_OPEN:
+            self.half_open_in_flight = 0
+        logger.warning(f"Circuit for {self.service_name} service: {self.state} -> {state}")
+        self.state = state
+
+
+class CircuitBreakerRegistry:
+    """One breaker per downstream service"""
+
+    def __init__(self):
+        self._breakers: Dict[str, CircuitBreaker] = {}
+
+    def get(self, service_name: str) -> CircuitBreaker:
+        breaker = self._breakers.get(service_name)
+        if breaker is None:
+            max_timeout = settings.SERVICE_POOLS[service_name]['timeout']
+            breaker = self._breakers[service_name] = CircuitBreaker(service_name, max_timeout)
+        return breaker
+
+    def is_degraded(self, service_name: str) -> bool:
+        """Whether calls to the service are currently failing fast"""
+        return self.get(service_name).state != CLOSED
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        return {name: self.get(name).stats() for name in settings.SERVICES}
+
+
+# Global breaker registry
+circuit_breakers = CircuitBreakerRegistry()
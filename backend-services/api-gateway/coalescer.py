@@ -0,0 +1,141 @@
+"""
+Single-flight request coalescing - concurrent calls for the same key share one run
+"""
+from typing import Dict, Any, List, Tuple, Callable, Awaitable, AsyncIterator, Optional
+import asyncio
+import logging
+
+from metrics import StageTimer
+
+logger = logging.getLogger(__name__)
+
+
+class Flight:
+    """One in-flight run plus the stage events and timings it has recorded so far"""
+
+    def __init__(self):
+        self.task: Optional[asyncio.Task] = None
+        self.timer = StageTimer()
+        self.callers = 0
+        self.pinned = False
+        self.scraped: Optional[Dict[str, Any]] = None  # Scraper response, once the scrape stage is done
+        # Streamed scrape so far (metadata and the reviews received), while it is running
+        self.partial_scrape: Optional[Dict[str, Any]] = None
+        self._events: List[Tuple[str, Dict[str, Any]]] = []
+        self._waiters: List[asyncio.Future] = []
+
+    def publish(self, stage: str, data: Dict[str, Any]):
+        """Record a finished pipeline stage and wake up subscribers"""
+        self._events.append((stage, data))
+        self.notify()
+
+    async def events(self) -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
+        """
+        Yield every stage event, replaying earlier ones for late joiners
+
+        Ends once the run has finished and all its events were yielded.
+        """
+        index = 0
+        while True:
+            while index < len(self._events):
+                yield self._events[index]
+                index += 1
+
+            if self.task.done():
+                return
+
+            waiter = asyncio.get_running_loop().create_future()
+            self._waiters.append(waiter)
+            await waiter
+
+    def attach(self):
+        """Register a client waiting for the run's result"""
+        self.callers += 1
+
+    def pin(self):
+        """Keep the run going even once every attached client has left"""
+        self.pinned = True
+
+    def detach(self) -> bool:
+        """
+        Unregister a client; cancels the run if the last one left before it finished
+
+        Returns:
+            True if the run was cancelled
+        """
+        self.callers -= 1
+        if self.callers > 0 or self.pinned or self.task.done():
+            return False
+
+        self.task.cancel()
+        return True
+
+    def notify(self):
+        """Wake up subscribers waiting for new events"""
+        for waiter in self._waiters:
+            if not waiter.done():
+                waiter.set_result(None)
+        self._waiters.clear()
+
+
+class RequestCoalescer:
+    """Run at most one coroutine per key; later callers await the in-flight result"""
+
+    def __init__(self):
+        self._in_flight: Dict[str, Flight] = {}
+        self.leader_runs = 0
+        self.coalesced_requests = 0
+
+    async def run(self, key: str, factory: Callable[[Flight], Awaitable[Any]]) -> Any:
+        """
+        Await the in-flight run for key, starting one if none exists
+
+        Args:
+            key: Coalescing key (normalized product URL)
+            factory: Creates the coroutine to run when this caller leads
+
+        Returns:
+            Result of the shared run
+        """
+        flight = self.join(key, factory)
+
+        # Shield so one caller disconnecting does not cancel the shared run
+        return await asyncio.shield(flight.task)
+
+    def join(self, key: str, factory: Callable[[Flight], Awaitable[Any]]) -> Flight:
+        """Return the in-flight run for key, starting one if none exists"""
+        flight = self._in_flight.get(key)
+
+        if flight is None:
+            self.leader_runs += 1
+            flight = Flight()
+            flight.task = asyncio.ensure_future(factory(flight))
+            self._in_flight[key] = flight
+            flight.task.add_done_callback(lambda _: self._finish(key, flight))
+        else:
+            self.coalesced_requests += 1
+            logger.info(f"Coalesced request onto in-flight run for {key}")
+
+        return flight
+
+    def is_in_flight(self, key: str) -> bool:
+        """Check whether a run is currently in flight for key"""
+        return key in self._in_flight
+
+    def stats(self) -> Dict[str, Any]:
+        """Coalescing counters and hit rate"""
+        total = self.leader_runs + self.coalesced_requests
+        return {
+            "in_flight": len(self._in_flight),
+            "leader_runs": self.leader_runs,
+            "coalesced_requests": self.coalesced_requests,
+            "hit_rate": round(self.coalesced_requests / total, 4) if total else 0.0
+        }
+
+    def _finish(self, key: str, flight: Flight):
+        """Drop the finished run and retrieve its exception if nobody awaited it"""
+        if self._in_flight.get(key) is flight:
+            del self._in_flight[key]
+        if not flight.task.cancelled():
+            flight.task.exception()
+        flight.notify()
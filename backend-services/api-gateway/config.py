@@ -11,6 +11,20 @@ class Settings(BaseSettings):
     # Rate Limiting
     RATE_LIMIT_REQUESTS: int
     RATE_LIMIT_WINDOW: int
+    RATE_LIMIT_BACKEND: str = "memory"  # memory (per worker) or redis (shared)
+    RATE_LIMIT_EVICTION_INTERVAL: float = 60.0
+    RATE_LIMIT_KEY_PREFIX: str = "ratelimit:"
+    REDIS_URL: str = "redis://localhost:6379/0"
+
+    # Cost-weighted quotas (opt-in): each client gets QUOTA_BUDGET cost units per
+    # QUOTA_WINDOW seconds (on the rate limiter's backend), and each analysis
+    # is charged by the work it causes downstream
+    QUOTA_ENABLED: bool = False
+    QUOTA_BUDGET: float = 200.0
+    QUOTA_WINDOW: int = 3600
+    QUOTA_COST_CACHE_HIT: float = 1.0
+    QUOTA_COST_SCRAPE: float = 10.0  # Pipeline run (the scraper's mock endpoint, then analysis)
+    QUOTA_COST_FORCE_REFRESH: float = 10.0  # Surcharge on top of the scrape it forces
 
     # Service URLs
     URL_CACHE_SERVICE: str
@@ -20,6 +34,113 @@ class Settings(BaseSettings):
     SCORING_SERVICE: str
     REPORT_SERVICE: str
 
+    # Deployment: "services" calls the services above over HTTP, "monolith"
+    # imports them into the gateway process and calls them directly
+    DEPLOYMENT_MODE: str = "services"
+    MONOLITH_SERVICES_ROOT: Optional[str] = None  # Defaults to the gateway's parent directory
+
+    # Downstream HTTP connection pools (defaults, per service overridable)
+    HTTP_TIMEOUT: float = 120.0  # LLM scraping can take 60+ seconds
+    HTTP_MAX_CONNECTIONS: int = 100
+    HTTP_MAX_KEEPALIVE_CONNECTIONS: int = 20
+    HTTP_KEEPALIVE_EXPIRY: float = 30.0
+    HTTP2_ENABLED: bool = False
+
+    # JSON object keyed by service name, e.g. '{"nlp": {"max_connections": 50, "http2": true}}'
+    SERVICE_POOL_OVERRIDES: dict[str, dict] = {}
+
+    # Services sent msgpack request bodies (and asked for msgpack responses);
+    # the others, and everything when empty, use JSON
+    MSGPACK_SERVICES: set[str] = {'nlp', 'behavior', 'scoring', 'report'}
+
+    # Stream reviews from the scraper in chunks and feed each chunk to
+    # incremental NLP/behavior sessions, overlapping scraping and analysis.
+    # Sessions live in one process: only enable with a single instance of the
+    # NLP and behavior services (or sticky routing); a lost session falls back
+    # to /analyze once the scrape is done
+    STREAMING_ANALYSIS: bool = False
+    SCRAPE_CHUNK_SIZE: int = 25
+
+    # Circuit breakers (per downstream service)
+    BREAKER_FAILURE_THRESHOLD: int = 5  # Consecutive failures that open the circuit
+    BREAKER_RESET_TIMEOUT: float = 30.0  # Seconds open before trial calls are allowed
+    BREAKER_HALF_OPEN_MAX_CALLS: int = 1
+
+    # Latency-adaptive timeouts: multiplier x p99 of recent calls, clamped to
+    # [ADAPTIVE_TIMEOUT_MIN, service pool timeout]
+    ADAPTIVE_TIMEOUT_MULTIPLIER: float = 3.0
+    ADAPTIVE_TIMEOUT_MIN: float = 2.0
+    ADAPTIVE_TIMEOUT_MIN_SAMPLES: int = 20
+    ADAPTIVE_TIMEOUT_WINDOW: int = 200
+
+    # Admission control for pipeline runs (cache hits are exempt)
+    ADMISSION_MAX_IN_FLIGHT: int = 16
+    ADMISSION_MAX_QUEUED: int = 64
+    ADMISSION_DEADLINE_SECONDS: float = 90.0  # Queue wait plus pipeline run, per request
+
+    # Asynchronous analysis jobs
+    JOB_WORKERS: int = 4
+    JOB_QUEUE_MAX_DEPTH: int = 100
+    JOB_RESULT_TTL_SECONDS: int = 3600
+
+    # Batch analysis
+    BATCH_MAX_URLS: int = 1000
+    BATCH_CONCURRENCY: int = 4  # Pipeline runs in flight per batch
+    BATCH_CACHE_LOOKUP_CHUNK: int = 1000  # URLs per URL Cache Service batch lookup (at most its BATCH_MAX_URLS)
+
+    # In-process L1 result cache (in front of the URL Cache Service)
+    RESULT_CACHE_MAX_ENTRIES: int = 1000
+    RESULT_CACHE_MAX_BYTES: int = 50 * 1024 * 1024
+    RESULT_CACHE_TTL_SECONDS: float = 300.0  # Cap, bounds staleness across workers
+
+    # Validity of the full reports written to the URL Cache Service (and the L1 cache)
+    CACHE_TTL_DAYS: int = 7
+
+    # Serve expired reports still within the URL Cache Service's grace window
+    # (marked stale) and refresh them in the background
+    STALE_WHILE_REVALIDATE: bool = True
+
+    # Popularity-driven pre-warming: re-run the analysis of the most-accessed
+    # reports shortly before they expire, during off-peak windows only
+    PREWARM_ENABLED: bool = True
+    PREWARM_INTERVAL_SECONDS: float = 300.0
+    PREWARM_WINDOWS: str = "00:00-06:00"  # Comma-separated UTC HH:MM-HH:MM ranges, empty = always
+    PREWARM_EXPIRING_WITHIN_HOURS: float = 24.0
+    PREWARM_MAX_PER_CYCLE: int = 20
+    PREWARM_MAX_PER_MINUTE: float = 6.0
+    PREWARM_MIN_ACCESS_COUNT: int = 2
+
+    # Quick mode (analysis_depth="quick"): a provisional score from cheap signals,
+    # cached in L1 until the full analysis, which keeps running, replaces it.
+    # Quick requests wait at most QUICK_SCRAPE_BUDGET_SECONDS for the scrape, then
+    # score the reviews streamed so far (STREAMING_ANALYSIS); with none yet they
+    # wait for the full analysis (bounded by ADMISSION_DEADLINE_SECONDS)
+    QUICK_RESULT_TTL_SECONDS: float = 120.0
+    QUICK_SCRAPE_BUDGET_SECONDS: float = 10.0
+
+    # Background report writer
+    REPORT_QUEUE_MAX_DEPTH: int = 1000
+    REPORT_BATCH_SIZE: int = 50
+    REPORT_BATCH_MAX_WAIT: float = 0.5  # Seconds to wait for a batch to fill
+    REPORT_WRITE_RETRIES: int = 3
+    REPORT_RETRY_BACKOFF: float = 0.5  # Doubles after every failed attempt
+    REPORT_SPILL_PATH: str = "report_spill.jsonl"
+    REPORT_REPLAY_INTERVAL: float = 30.0
+    REPORT_SHUTDOWN_TIMEOUT: float = 10.0
+
+    # Downstream health polling
+    HEALTH_POLL_INTERVAL: float = 10.0
+    HEALTH_PROBE_TIMEOUT: float = 5.0
+    HEALTH_STALE_AFTER: float = 30.0  # Snapshot age after which a result is flagged stale
+    HEALTH_HISTORY_SIZE: int = 20
+
+    # Tracking parameters to remove during URL normalization
+    TRACKING_PARAMS: set[str] = {
+        'utm_source', 'utm_medium', 'utm_campaign', 'utm_term', 'utm_content',
+        'ref', 'referrer', 'source', 'campaign', 'gclid', 'fbclid',
+        '_encoding', 'psc', 'qid', 'sr', 'keywords', 'ie'
+    }
+
     @property
     def cors_origins_list(self) -> list[str]:
         """Convert comma-separated CORS origins to list"""
@@ -37,6 +158,21 @@ class Settings(BaseSettings):
             'report': self.REPORT_SERVICE
         }
 
+    @property
+    def SERVICE_POOLS(self) -> dict[str, dict]:
+        """Connection pool settings for each downstream service"""
+        defaults = {
+            'timeout': self.HTTP_TIMEOUT,
+            'max_connections': self.HTTP_MAX_CONNECTIONS,
+            'max_keepalive_connections': self.HTTP_MAX_KEEPALIVE_CONNECTIONS,
+            'keepalive_expiry': self.HTTP_KEEPALIVE_EXPIRY,
+            'http2': self.HTTP2_ENABLED
+        }
+        return {
+            name: {**defaults, **self.SERVICE_POOL_OVERRIDES.get(name, {})}
+            for name in self.SERVICES
+        }
+
     model_config = SettingsConfigDict(
         env_file=".env",
         env_file_encoding='utf-8',
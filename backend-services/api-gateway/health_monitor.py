@@ -0,0 +1,127 @@
+"""
+Downstream health monitor - concurrent probes refreshed by a background poller
+"""
+from typing import Dict, Any, Optional
+from collections import deque
+from datetime import datetime
+import logging
+import asyncio
+import time
+
+from config import settings
+from backends import service_backend, ServiceCallError
+from circuit_breaker import circuit_breakers
+
+logger = logging.getLogger(__name__)
+
+
+class ServiceHealth:
+    """Last probe result and recent latency history for one service"""
+
+    def __init__(self):
+        self.status = "unknown"  # healthy, unhealthy, unreachable
+        self.response_time: Optional[float] = None
+        self.error: Optional[str] = None
+        self.checked_at: Optional[datetime] = None
+        self.last_healthy_at: Optional[datetime] = None
+        self.consecutive_failures = 0
+        self.latency_history = deque(maxlen=settings.HEALTH_HISTORY_SIZE)
+
+    def to_dict(self) -> Dict[str, Any]:
+        now = datetime.utcnow()
+        age = (now - self.checked_at).total_seconds() if self.checked_at else None
+        history = list(self.latency_history)
+
+        return {
+            "status": self.status,
+            "response_time": self.response_time,
+            "error": self.error,
+            "checked_at": self.checked_at.isoformat() if self.checked_at else None,
+            "age_seconds": round(age, 3) if age is not None else None,
+            "stale": age is None or age > settings.HEALTH_STALE_AFTER,
+            "last_healthy_at": self.last_healthy_at.isoformat() if self.last_healthy_at else None,
+            "consecutive_failures": self.consecutive_failures,
+            "latency_history": {
+                "samples": history,
+                "avg": round(sum(history) / len(history), 4) if history else None,
+                "max": max(history) if history else None
+            }
+        }
+
+
+class HealthMonitor:
+    """Probes every downstream service in parallel and keeps the latest snapshot"""
+
+    def __init__(self):
+        self._services: Dict[str, ServiceHealth] = {}
+        self._poll_task: Optional[asyncio.Task] = None
+        self.rounds = 0
+
+    async def startup(self):
+        """Start the background poller (called on application startup)"""
+        self._services = {name: ServiceHealth() for name in settings.SERVICES}
+        self._poll_task = asyncio.create_task(self._poll_loop())
+
+    async def shutdown(self):
+        if self._poll_task:
+            self._poll_task.cancel()
+            await asyncio.gather(self._poll_task, return_exceptions=True)
+            self._poll_task = None
+
+    async def probe_all(self):
+        """Probe all services concurrently; one slow service no longer delays the others"""
+        await asyncio.gather(*(self._probe(name) for name in self._services))
+        self.rounds += 1
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """Latest known health of every service, including its circuit breaker"""
+        services = {}
+        for name, health in self._services.items():
+            entry = health.to_dict()
+            entry["circuit"] = circuit_breakers.get(name).stats()
+
+            # Calls fail fast while the circuit is open, whatever /health says
+            if circuit_breakers.is_degraded(name):
+                entry["status"] = "degraded"
+
+            services[name] = entry
+        return services
+
+    async def _probe(self, service_name: str):
+        health = self._services[service_name]
+        started = time.perf_counter()
+
+        try:
+            await service_backend.probe(service_name, timeout=settings.HEALTH_PROBE_TIMEOUT)
+            health.status = "healthy"
+            health.error = None
+        except ServiceCallError as e:
+            health.status = "unhealthy"
+            health.error = str(e)
+        except Exception as e:
+            health.status = "unreachable"
+            health.error = str(e) or type(e).__name__
+
+        elapsed = round(time.perf_counter() - started, 4)
+        health.checked_at = datetime.utcnow()
+
+        if health.status == "healthy":
+            health.response_time = elapsed
+            health.latency_history.append(elapsed)
+            health.last_healthy_at = health.checked_at
+            health.consecutive_failures = 0
+        else:
+            health.response_time = None
+            health.consecutive_failures += 1
+
+    async def _poll_loop(self):
+        while True:
+            try:
+                await self.probe_all()
+            except Exception as e:
+                logger.error(f"Health poll failed: {str(e)}")
+            await asyncio.sleep(settings.HEALTH_POLL_INTERVAL)
+
+
+# Global health monitor (poller started on application startup)
+health_monitor = HealthMonitor()
@@ -0,0 +1,195 @@
+"""
+Shared HTTP clients - one long-lived, pooled client per downstream service
+"""
+from typing import Dict, Any, AsyncIterator, Optional
+from contextlib import asynccontextmanager
+import logging
+import asyncio
+import time
+import httpx
+
+from config import settings
+from circuit_breaker import circuit_breakers
+from cancellation import deadline_headers, deadline_exceeded
+
+logger = logging.getLogger(__name__)
+
+
+class ServiceClientRegistry:
+    """Builds and owns the pooled httpx clients used by every gateway route"""
+
+    def __init__(self):
+        self._clients: Dict[str, httpx.AsyncClient] = {}
+        self._requests_sent: Dict[str, int] = {}
+        self._requests_cancelled: Dict[str, int] = {}
+        self._deadline_aborts: Dict[str, int] = {}
+
+    async def startup(self):
+        """Create one client per service (called on application startup)"""
+        for service_name, service_url in settings.SERVICES.items():
+            pool = settings.SERVICE_POOLS[service_name]
+
+            self._clients[service_name] = httpx.AsyncClient(
+                base_url=service_url,
+                timeout=pool['timeout'],
+                limits=httpx.Limits(
+                    max_connections=pool['max_connections'],
+                    max_keepalive_connections=pool['max_keepalive_connections'],
+                    keepalive_expiry=pool['keepalive_expiry']
+                ),
+                http2=pool['http2'],
+                event_hooks={"request": [self._request_counter(service_name)]}
+            )
+            self._requests_sent[service_name] = 0
+            self._requests_cancelled[service_name] = 0
+            self._deadline_aborts[service_name] = 0
+
+        logger.info(f"HTTP clients initialized for: {', '.join(self._clients)}")
+
+    async def shutdown(self):
+        """Close all clients and their pooled connections"""
+        for client in self._clients.values():
+            await client.aclose()
+        self._clients.clear()
+        logger.info("HTTP clients closed")
+
+    def get(self, service_name: str) -> httpx.AsyncClient:
+        """Return the shared client for a downstream service"""
+        client = self._clients.get(service_name)
+        if client is None:
+            raise RuntimeError(f"HTTP client for '{service_name}' not initialized")
+        return client
+
+    async def request(
+        self,
+        service_name: str,
+        method: str,
+        path: str,
+        endpoint: Optional[str] = None,
+        **kwargs
+    ) -> httpx.Response:
+        """
+        Call a downstream service through its circuit breaker
+
+        Uses the breaker's latency-adaptive timeout for the endpoint (the
+        route template, defaults to path) unless one is given, and
+        sends the pipeline run's remaining time as X-Deadline-Ms so the
+        service can stop working on it. Transport errors, timeouts and 5xx
+        responses count as failures, except the 504s a service answers once
+        that deadline has passed (the run's budget ran out, not the service).
+
+        Raises:
+            CircuitOpenError: If the service's circuit is open (no request is sent)
+        """
+        client = self.get(service_name)
+        breaker = circuit_breakers.get(service_name)
+        endpoint = f"{method} {endpoint or path}"
+        breaker.before_call()
+        kwargs.setdefault("timeout", breaker.timeout(endpoint))
+        kwargs["headers"] = {**kwargs.get("headers", {}), **deadline_headers()}
+
+        started = time.perf_counter()
+        try:
+            response = await client.request(method, path, **kwargs)
+        except asyncio.CancelledError:
+            breaker.record_cancelled()
+            self._requests_cancelled[service_name] += 1
+            raise
+        except Exception:
+            breaker.record_failure()
+            raise
+
+        self._record_response(service_name, endpoint, response, time.perf_counter() - started)
+        return response
+
+    @asynccontextmanager
+    async def stream(
+        self,
+        service_name: str,
+        method: str,
+        path: str,
+        endpoint: Optional[str] = None,
+        **kwargs
+    ) -> AsyncIterator[httpx.Response]:
+        """
+        Like request(), but yields the response as soon as its headers arrive
+
+        The body is read inside the block. The breaker records the call once
+        the block exits; the timeout applies to each read, not the whole body.
+        Errors raised by the block itself are not held against the service.
+
+        Raises:
+            CircuitOpenError: If the service's circuit is open (no request is sent)
+        """
+        client = self.get(service_name)
+        breaker = circuit_breakers.get(service_name)
+        endpoint = f"{method} {endpoint or path}"
+        breaker.before_call()
+        kwargs.setdefault("timeout", breaker.timeout(endpoint))
+        kwargs["headers"] = {**kwargs.get("headers", {}), **deadline_headers()}
+
+        started = time.perf_counter()
+        try:
+            async with client.stream(method, path, **kwargs) as response:
+                yield response
+        except asyncio.CancelledError:
+            breaker.record_cancelled()
+            self._requests_cancelled[service_name] += 1
+            raise
+        except httpx.HTTPError:
+            breaker.record_failure()
+            raise
+        except BaseException:
+            breaker.record_cancelled()
+            raise
+
+        self._record_response(service_name, endpoint, response, time.perf_counter() - started)
+
+    def stats(self) -> Dict[str, Any]:
+        """Connection pool usage for every service client"""
+        pools = {}
+
+        for service_name, client in self._clients.items():
+            pool_settings = settings.SERVICE_POOLS[service_name]
+
+            # httpx does not expose pool state publicly, read it from httpcore
+            pool = getattr(client._transport, "_pool", None)
+            connections = list(getattr(pool, "connections", []))
+            idle = sum(1 for conn in connections if conn.is_idle())
+
+            pools[service_name] = {
+                "base_url": str(client.base_url),
+                "http2": pool_settings['http2'],
+                "max_connections": pool_settings['max_connections'],
+                "max_keepalive_connections": pool_settings['max_keepalive_connections'],
+                "open_connections": len(connections),
+                "active_connections": len(connections) - idle,
+                "idle_connections": idle,
+                "requests_sent": self._requests_sent[service_name],
+                "requests_cancelled": self._requests_cancelled[service_name],
+                "deadline_aborts": self._deadline_aborts[service_name]
+            }
+
+        return pools
+
+    def _record_response(self, service_name: str, endpoint: str, response: httpx.Response, latency: float):
+        """Record the outcome of a call that got a response in the service's breaker"""
+        breaker = circuit_breakers.get(service_name)
+        if deadline_exceeded(response.status_code, response.headers):
+            breaker.record_cancelled()
+            self._deadline_aborts[service_name] += 1
+        elif response.status_code >= 500:
+            breaker.record_failure()
+        else:
+            breaker.record_success(endpoint, latency)
+
+    def _request_counter(self, service_name: str):
+        """Build an httpx request hook counting requests sent to a service"""
+        async def count_request(request: httpx.Request):
+            self._requests_sent[service_name] += 1
+
+        return count_request
+
+
+# Global registry instance (initialized on startup)
+service_clients = ServiceClientRegistry()
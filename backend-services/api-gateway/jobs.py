@@ -0,0 +1,179 @@
+"""
+Asynchronous analysis jobs - bounded priority queue drained by pipeline workers
+"""
+from typing import Dict, Any, List, Optional
+from datetime import datetime, timedelta
+from fastapi import HTTPException
+import itertools
+import logging
+import asyncio
+import uuid
+
+from models import AnalysisJobRequest, AnalysisJobResponse, AnalysisResponse
+from pipeline import analysis_pipeline
+from quotas import quota_manager, QuotaCharge
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+# Lower value is dequeued first
+PRIORITY_ORDER = {"high": 0, "normal": 1, "low": 2}
+
+
+class JobQueueFull(Exception):
+    """Raised when the job queue is at its configured depth"""
+
+
+class AnalysisJob:
+    """State of a single queued analysis"""
+
+    def __init__(self, request: AnalysisJobRequest, quota_charge: Optional[QuotaCharge] = None):
+        self.job_id = uuid.uuid4().hex
+        self.request = request
+        self.quota_charge = quota_charge  # Settled once the job has finished
+        self.status = "queued"
+        self.created_at = datetime.utcnow()
+        self.started_at: Optional[datetime] = None
+        self.finished_at: Optional[datetime] = None
+        self.result: Optional[AnalysisResponse] = None
+        self.error: Optional[str] = None
+
+    def to_response(self) -> AnalysisJobResponse:
+        return AnalysisJobResponse(
+            job_id=self.job_id,
+            status=self.status,
+            priority=self.request.priority,
+            product_url=self.request.product_url,
+            created_at=self.created_at.isoformat(),
+            started_at=self.started_at.isoformat() if self.started_at else None,
+            finished_at=self.finished_at.isoformat() if self.finished_at else None,
+            result=self.result,
+            error=self.error
+        )
+
+
+class AnalysisJobQueue:
+    """FIFO-within-priority job queue with a fixed pool of pipeline workers"""
+
+    def __init__(self):
+        self._queue: Optional[asyncio.PriorityQueue] = None
+        self._workers: List[asyncio.Task] = []
+        self._jobs: Dict[str, AnalysisJob] = {}
+        self._sequence = itertools.count()  # FIFO tie-breaker within a priority
+        self.running = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+
+    async def startup(self):
+        """Create the queue and start workers (called on application startup)"""
+        self._queue = asyncio.PriorityQueue(maxsize=settings.JOB_QUEUE_MAX_DEPTH)
+        self._workers = [
+            asyncio.create_task(self._worker(i)) for i in range(settings.JOB_WORKERS)
+        ]
+        logger.info(
+            f"Job queue started: {settings.JOB_WORKERS} workers, "
+            f"max depth {settings.JOB_QUEUE_MAX_DEPTH}"
+        )
+
+    async def shutdown(self):
+        """Stop workers; queued jobs are dropped"""
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        logger.info("Job queue stopped")
+
+    def submit(self, request: AnalysisJobRequest, quota_charge: Optional[QuotaCharge] = None) -> AnalysisJob:
+        """
+        Enqueue an analysis job
+
+        Raises:
+            JobQueueFull: If the queue is at its configured depth
+        """
+        self._prune_finished()
+
+        job = AnalysisJob(request, quota_charge)
+        entry = (PRIORITY_ORDER[request.priority], next(self._sequence), job.job_id)
+
+        try:
+            self._queue.put_nowait(entry)
+        except asyncio.QueueFull:
+            self.rejected += 1
+            raise JobQueueFull(f"Job queue is full ({settings.JOB_QUEUE_MAX_DEPTH} jobs)")
+
+        self._jobs[job.job_id] = job
+        logger.info(f"Job {job.job_id} queued ({request.priority}) for {request.product_url}")
+        return job
+
+    def get(self, job_id: str) -> Optional[AnalysisJob]:
+        """Look up a job by ID"""
+        return self._jobs.get(job_id)
+
+    def stats(self) -> Dict[str, Any]:
+        """Queue length and job counters"""
+        queued_by_priority = {name: 0 for name in PRIORITY_ORDER}
+        for job in self._jobs.values():
+            if job.status == "queued":
+                queued_by_priority[job.request.priority] += 1
+
+        return {
+            "workers": len(self._workers),
+            "max_depth": settings.JOB_QUEUE_MAX_DEPTH,
+            "queue_length": self._queue.qsize() if self._queue else 0,
+            "queued_by_priority": queued_by_priority,
+            "running": self.running,
+            "completed": self.completed,
+            "failed": self.failed,
+            "rejected": self.rejected,
+            "tracked_jobs": len(self._jobs)
+        }
+
+    async def _worker(self, worker_id: int):
+        """Run queued jobs through the analysis pipeline, one at a time"""
+        while True:
+            _, _, job_id = await self._queue.get()
+            job = self._jobs.get(job_id)
+
+            try:
+                if job is None:
+                    continue
+
+                job.status = "running"
+                job.started_at = datetime.utcnow()
+                self.running += 1
+
+                try:
+                    job.result = await analysis_pipeline.run(job.request)
+                    job.status = "completed"
+                    self.completed += 1
+                except HTTPException as e:
+                    job.status = "failed"
+                    job.error = str(e.detail)
+                    self.failed += 1
+                except Exception as e:
+                    logger.exception(f"Job {job_id} failed: {str(e)}")
+                    job.status = "failed"
+                    job.error = f"Analysis failed: {str(e)}"
+                    self.failed += 1
+                finally:
+                    self.running -= 1
+                    job.finished_at = datetime.utcnow()
+                    if job.quota_charge:
+                        await quota_manager.settle_request(job.quota_charge, job.request, job.result)
+            finally:
+                self._queue.task_done()
+
+    def _prune_finished(self):
+        """Forget finished jobs older than the result TTL"""
+        cutoff = datetime.utcnow() - timedelta(seconds=settings.JOB_RESULT_TTL_SECONDS)
+        expired = [
+            job_id for job_id, job in self._jobs.items()
+            if job.finished_at and job.finished_at < cutoff
+        ]
+        for job_id in expired:
+            del self._jobs[job_id]
+
+
+# Global job queue instance (started on application startup)
+job_queue = AnalysisJobQueue()
@@ -0,0 +1,162 @@
+"""
+Latency instrumentation - per-stage timers, histograms and the Server-Timing header
+"""
+from typing import Dict, Any, List, Optional, Tuple
+from contextlib import contextmanager
+from contextvars import ContextVar
+import bisect
+import math
+import time
+
+# Histogram bucket upper bounds in seconds: 10us (L1 cache hits) .. ~10min, 20% apart
+BUCKET_BOUNDS: List[float] = [0.00001 * 1.2 ** i for i in range(99)]
+
+# Server-Timing entries are emitted in pipeline order
+STAGE_ORDER = ["cache", "scrape", "nlp", "behavior", "analyze", "score", "store"]
+
+
+class LatencyHistogram:
+    """Fixed-bucket latency histogram with interpolated percentiles"""
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKET_BOUNDS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, seconds: float):
+        self.counts[bisect.bisect_left(BUCKET_BOUNDS, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+
+    def percentile(self, q: float) -> float:
+        """Estimate the q-th percentile (0-100) in seconds"""
+        if not self.count:
+            return 0.0
+
+        rank = q / 100 * self.count
+        seen = 0
+        for index, bucket_count in enumerate(self.counts):
+            if bucket_count and seen + bucket_count >= rank:
+                lower = BUCKET_BOUNDS[index - 1] if index > 0 else 0.0
+                upper = BUCKET_BOUNDS[index] if index < len(BUCKET_BOUNDS) else self.max
+                estimate = lower + (upper - lower) * (rank - seen) / bucket_count
+                return min(estimate, self.max)
+            seen += bucket_count
+        return self.max
+
+    def summary(self) -> Dict[str, Any]:
+        """Count, mean, max and p50/p90/p99 in milliseconds"""
+        return {
+            "count": self.count,
+            "mean_ms": round(self.total / self.count * 1000, 2) if self.count else 0.0,
+            "p50_ms": round(self.percentile(50) * 1000, 2),
+            "p90_ms": round(self.percentile(90) * 1000, 2),
+            "p99_ms": round(self.percentile(99) * 1000, 2),
+            "max_ms": round(self.max * 1000, 2)
+        }
+
+
+class StageTimer:
+    """Durations of the pipeline stages of one analysis run"""
+
+    def __init__(self):
+        self.durations: Dict[str, float] = {}
+
+    @contextmanager
+    def stage(self, name: str):
+        """Time the enclosed block (works around awaits) as stage `name`"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.durations[name] = self.durations.get(name, 0.0) + time.perf_counter() - started
+
+    def merge(self, other: "StageTimer"):
+        for name, seconds in other.durations.items():
+            self.durations[name] = self.durations.get(name, 0.0) + seconds
+
+    def header(self, total: Optional[float] = None) -> str:
+        """Format as a Server-Timing header value"""
+        names = [n for n in STAGE_ORDER if n in self.durations]
+        names += [n for n in self.durations if n not in STAGE_ORDER]
+
+        entries = [f"{name};dur={self.durations[name] * 1000:.1f}" for name in names]
+        if total is not None:
+            entries.append(f"total;dur={total * 1000:.1f}")
+        return ", ".join(entries)
+
+
+class LatencyMetrics:
+    """Per-stage histograms, labelled by cache outcome (hit / miss)"""
+
+    def __init__(self):
+        self._histograms: Dict[Tuple[str, str], LatencyHistogram] = {}
+
+    def observe(self, stage: str, label: str, seconds: float):
+        key = (stage, label)
+        histogram = self._histograms.get(key)
+        if histogram is None:
+            histogram = self._histograms[key] = LatencyHistogram()
+        histogram.observe(seconds)
+
+    def record(self, timer: StageTimer, label: str, total: float):
+        """Record every stage of a finished run plus its end-to-end time"""
+        for stage, seconds in timer.durations.items():
+            self.observe(stage, label, seconds)
+        self.observe("total", label, total)
+
+    def mean(self, stage: str, label: str) -> float:
+        """Mean duration of a stage in seconds (0.0 if never observed)"""
+        histogram = self._histograms.get((stage, label))
+        return histogram.total / histogram.count if histogram else 0.0
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """{label: {stage: summary}}"""
+        result: Dict[str, Dict[str, Any]] = {}
+        order = STAGE_ORDER + ["total"]
+        for (stage, label) in sorted(
+            self._histograms,
+            key=lambda k: (k[1], order.index(k[0]) if k[0] in order else math.inf)
+        ):
+            result.setdefault(label, {})[stage] = self._histograms[(stage, label)].summary()
+        return result
+
+
+# Timer of the HTTP request being handled (set by ServerTimingMiddleware)
+request_timer: ContextVar[Optional[StageTimer]] = ContextVar("request_timer", default=None)
+
+
+class ServerTimingMiddleware:
+    """Adds a Server-Timing header with the stages recorded while handling the request"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        timer = StageTimer()
+        token = request_timer.set(timer)
+        started = time.perf_counter()
+
+        async def send_with_timing(message):
+            if message["type"] == "http.response.start" and timer.durations:
+                header = timer.header(total=time.perf_counter() - started)
+                message.setdefault("headers", [])
+                message["headers"] = list(message["headers"]) + [
+                    (b"server-timing", header.encode("latin-1"))
+                ]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            request_timer.reset(token)
+
+
+# Global latency metrics
+latency_metrics = LatencyMetrics()
@@ -2,13 +2,15 @@
 Pydantic models for request/response validation
 """
 from pydantic import BaseModel, validator
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Literal
 from urllib.parse import urlparse
 
 
 class AnalyzeRequest(BaseModel):
     product_url: str
     force_refresh: Optional[bool] = False
+    # quick: provisional score from cheap signals, full analysis continues in the background
+    analysis_depth: Literal["full", "quick"] = "full"
     
     @validator('product_url')
     def validate_url(cls, v):
@@ -70,6 +72,7 @@ class TokenResponse(BaseModel):
 class AnalysisResponse(BaseModel):
     status: str
     cached: bool = False
+    stale: bool = False  # Expired report served while a background refresh runs
     success: bool = True
     trust_score: int
     fake_reviews_percentage: float
@@ -79,4 +82,37 @@ class AnalysisResponse(BaseModel):
     total_reviews_analyzed: int
     recommendation: str
     confidence: float
-    timestamp: str
\ No newline at end of file
+    timestamp: str
+    analysis_depth: str = "full"  # quick: provisional score, replaced once the full analysis finishes
+
+
+class AnalysisJobRequest(AnalyzeRequest):
+    priority: Literal["high", "normal", "low"] = "normal"
+
+
+class AnalysisJobResponse(BaseModel):
+    job_id: str
+    status: str  # queued, running, completed, failed
+    priority: str
+    product_url: str
+    created_at: str
+    started_at: Optional[str] = None
+    finished_at: Optional[str] = None
+    result: Optional[AnalysisResponse] = None
+    error: Optional[str] = None
+
+
+class InvalidateRequest(BaseModel):
+    product_url: str
+
+
+class BatchAnalyzeRequest(BaseModel):
+    product_urls: List[str]
+    force_refresh: Optional[bool] = False
+
+    @validator('product_urls')
+    def validate_urls(cls, v):
+        """Require at least one URL (each URL is validated individually)"""
+        if not v:
+            raise ValueError("product_urls must not be empty")
+        return v
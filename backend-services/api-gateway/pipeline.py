@@ -0,0 +1,798 @@
+"""
+Analysis pipeline orchestrator - cache → scrape → NLP/behavior → scoring → report
+"""
+from typing import Dict, Any, List, Optional, Set, Tuple, Awaitable
+from fastapi import HTTPException, status
+from datetime import datetime, timedelta
+import logging
+import asyncio
+import math
+import time
+
+from models import AnalyzeRequest, AnalysisResponse
+from config import settings
+from backends import service_backend, ServiceCallError
+from circuit_breaker import CircuitOpenError
+from coalescer import RequestCoalescer, Flight
+from admission import admission_controller, AdmissionRejected
+from result_cache import result_cache, parse_expires_at
+from report_writer import report_writer
+from prewarm import prewarm_scheduler
+from cancellation import request_deadline, cancellation_metrics
+from metrics import StageTimer, latency_metrics, request_timer
+from utils.url_utils import normalize_url
+
+logger = logging.getLogger(__name__)
+
+# Validity of stored reports
+REPORT_TTL_DAYS = 7
+
+
+class AnalysisPipeline:
+    """Orchestrates the downstream services for one product analysis"""
+
+    def __init__(self):
+        self.coalescer = RequestCoalescer()
+        # Background refreshes of stale reports, at most one per product
+        self.refreshes = RequestCoalescer()
+        self.stale_served = 0
+        self.refreshes_started = 0
+        self.refreshes_failed = 0
+        self.refreshes_written = 0
+        self.refresh_writes_failed = 0
+        # Full reports written to the URL Cache Service (in the background, except by refreshes)
+        self._cache_writes: Set[asyncio.Task] = set()
+        self.cache_writes = 0
+        self.cache_write_failures = 0
+        self.quick_served = 0
+        self.quick_fallbacks = 0
+        # Streamed analyses redone with /analyze because their session was lost
+        self.session_fallbacks = 0
+
+    async def run(self, request: AnalyzeRequest, check_cache: bool = True) -> AnalysisResponse:
+        """
+        Run the analysis, sharing one in-flight run per normalized URL
+
+        Concurrent requests for the same product (including force_refresh
+        ones) join the run already in flight instead of starting another.
+        The run is cancelled if every caller waiting for it is cancelled.
+
+        Quick requests (analysis_depth="quick") return a provisional score
+        from the reviews scraped within QUICK_SCRAPE_BUDGET_SECONDS; see
+        _run_quick().
+
+        Args:
+            request: Analysis request
+            check_cache: Set to False when the caller already looked the URL
+                up in the cache (batch analysis)
+
+        Returns:
+            AnalysisResponse shared by every coalesced caller
+        """
+        key = normalize_url(request.product_url)
+        caller_timer = request_timer.get()
+
+        # Fast path: hot products are answered from memory without a task or network hop
+        if check_cache and not request.force_refresh:
+            lookup_timer = StageTimer()
+            with lookup_timer.stage("cache"):
+                cached_response = result_cache.get(key)
+            # A provisional score only answers quick requests; full ones wait for the full run
+            if cached_response and (cached_response.analysis_depth == "full" or request.analysis_depth == "quick"):
+                latency_metrics.record(lookup_timer, "hit", lookup_timer.durations["cache"])
+                prewarm_scheduler.record_lookup(request.product_url, "hit")
+                if caller_timer:
+                    caller_timer.merge(lookup_timer)
+                return cached_response
+
+        if request.analysis_depth == "quick":
+            return await self._run_quick(request, check_cache)
+
+        flight = self.coalescer.join(
+            key, lambda flight: self._execute(request, flight, check_cache, check_l1=False)
+        )
+        flight.attach()
+        try:
+            # Shield so one caller disconnecting does not cancel the shared run
+            return await asyncio.shield(flight.task)
+        finally:
+            flight.detach()
+            if caller_timer:
+                caller_timer.merge(flight.timer)
+
+    def stream(self, request: AnalyzeRequest) -> Flight:
+        """
+        Join (or start) the run for a request without waiting for it
+
+        The returned flight yields one event per finished stage; its task
+        resolves to the final AnalysisResponse. The caller is attached to the
+        flight and must detach() once it stops listening.
+        """
+        key = normalize_url(request.product_url)
+        flight = self.coalescer.join(key, lambda flight: self._execute(request, flight))
+        flight.attach()
+        return flight
+
+    async def check_cache_many(self, product_urls: List[str]) -> Dict[str, Optional[AnalysisResponse]]:
+        """
+        Look up several URLs in the cache at once
+
+        URLs not in the L1 cache are looked up in the URL Cache Service with
+        one batch call per BATCH_CACHE_LOOKUP_CHUNK URLs.
+
+        Returns:
+            Dict mapping each URL to its cached response (None on a miss)
+        """
+        results: Dict[str, Optional[AnalysisResponse]] = {}
+        remaining = []
+        for product_url in product_urls:
+            cached_response = result_cache.get(normalize_url(product_url))
+            if cached_response and cached_response.analysis_depth == "full":
+                results[product_url] = cached_response
+            else:
+                remaining.append(product_url)
+
+        chunk_size = settings.BATCH_CACHE_LOOKUP_CHUNK
+        for start in range(0, len(remaining), chunk_size):
+            chunk = remaining[start:start + chunk_size]
+            try:
+                lookups = await service_backend.check_cache_batch(chunk)
+            except Exception as e:
+                logger.warning(f"Batch cache check failed: {str(e)}")
+                lookups = [{} for _ in chunk]
+
+            for product_url, cached_data in zip(chunk, lookups):
+                results[product_url] = self._cached_response(product_url, cached_data)
+
+        return {product_url: results[product_url] for product_url in product_urls}
+
+    async def refresh(self, product_url: str) -> AnalysisResponse:
+        """
+        Re-run the analysis of a product and wait for the fresh report
+
+        Shares the background refresh already in flight for the product, if any.
+        """
+        flight = self._join_refresh(product_url)
+        return await asyncio.shield(flight.task)
+
+    def quick_stats(self) -> Dict[str, Any]:
+        """Quick mode counters"""
+        return {
+            "provisional_served": self.quick_served,
+            "fallbacks_to_full": self.quick_fallbacks
+        }
+
+    def streaming_stats(self) -> Dict[str, Any]:
+        """Streaming analysis counters"""
+        return {
+            "enabled": settings.STREAMING_ANALYSIS,
+            "session_fallbacks": self.session_fallbacks
+        }
+
+    def cache_write_stats(self) -> Dict[str, Any]:
+        """Write-through counters of the URL Cache Service"""
+        return {
+            "written": self.cache_writes,
+            "failed": self.cache_write_failures,
+            "in_flight": len(self._cache_writes)
+        }
+
+    async def shutdown(self):
+        """Wait for the URL Cache Service writes still in flight (called on shutdown)"""
+        if self._cache_writes:
+            await asyncio.gather(*self._cache_writes, return_exceptions=True)
+
+    def stats(self) -> Dict[str, Any]:
+        """Stale-while-revalidate counters"""
+        return {
+            "enabled": settings.STALE_WHILE_REVALIDATE,
+            "stale_served": self.stale_served,
+            "refreshes_started": self.refreshes_started,
+            "refreshes_failed": self.refreshes_failed,
+            "refreshes_written": self.refreshes_written,
+            "refresh_writes_failed": self.refresh_writes_failed,
+            "refreshes_in_flight": self.refreshes.stats()["in_flight"]
+        }
+
+    async def _execute(
+        self,
+        request: AnalyzeRequest,
+        flight: Flight,
+        check_cache: bool = True,
+        check_l1: bool = True,
+        refresh: bool = False
+    ) -> AnalysisResponse:
+        """Run the pipeline for a single request, recording per-stage latency"""
+        started = time.perf_counter()
+        deadline = time.monotonic() + settings.ADMISSION_DEADLINE_SECONDS
+        # Sent downstream with every call of this run (the task has its own context)
+        request_deadline.set(deadline)
+        outcome = "error"
+        try:
+            response = await self._run_stages(request, flight, check_cache, check_l1, deadline, refresh)
+            if refresh:
+                outcome = "refresh"
+            elif response.cached:
+                outcome = "stale" if response.stale else "hit"
+            else:
+                outcome = "miss"
+            if not refresh:
+                prewarm_scheduler.record_lookup(request.product_url, outcome)
+            return response
+        except CircuitOpenError as e:
+            # Fail fast instead of waiting on a service that is known to be down
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail=f"Analysis degraded: {e.service_name} service unavailable (circuit open)",
+                headers={"Retry-After": str(max(1, math.ceil(e.retry_after)))}
+            )
+        except AdmissionRejected as e:
+            # Shed load instead of queueing more work than can finish in time
+            outcome = "shed"
+            logger.warning(f"Shedding analysis of {request.product_url}: {e.reason}")
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail=f"Gateway overloaded ({e.reason}), retry later",
+                headers={"Retry-After": str(max(1, math.ceil(e.retry_after)))}
+            )
+        except asyncio.TimeoutError:
+            raise HTTPException(
+                status_code=status.HTTP_504_GATEWAY_TIMEOUT,
+                detail=f"Analysis exceeded its {settings.ADMISSION_DEADLINE_SECONDS:.0f}s deadline"
+            )
+        except asyncio.CancelledError:
+            # Every client waiting for the run went away
+            outcome = "cancelled"
+            saved = cancellation_metrics.record_cancelled_run(flight.timer)
+            logger.info(f"Analysis of {request.product_url} cancelled (~{saved:.2f} CPU-seconds saved downstream)")
+            raise
+        finally:
+            latency_metrics.record(flight.timer, outcome, time.perf_counter() - started)
+
+    async def _run_quick(self, request: AnalyzeRequest, check_cache: bool) -> AnalysisResponse:
+        """
+        Answer a quick request with a provisional score, leaving the full run going
+
+        Joins (or starts) the full run for the product and waits for its
+        scrape, at most QUICK_SCRAPE_BUDGET_SECONDS. The reviews scraped by
+        then (all of them, or those streamed so far) get the quick NLP and
+        behavior analyses and the quick score, which is cached in L1 until
+        the full run finishes and replaces it; the full run is kept going
+        even once every client has left. If the full run answers first
+        (cache hit, failure), no reviews arrived within the budget or the
+        quick analyses fail, the full run's result is awaited instead.
+        """
+        key = normalize_url(request.product_url)
+        caller_timer = request_timer.get()
+        started = time.perf_counter()
+
+        flight = self.coalescer.join(
+            key, lambda flight: self._execute(request, flight, check_cache, check_l1=False)
+        )
+        flight.attach()
+        try:
+            scraped = await self._scraped_within(flight, settings.QUICK_SCRAPE_BUDGET_SECONDS)
+            if scraped is None:
+                if not flight.task.done():
+                    # No reviews within the budget
+                    self.quick_fallbacks += 1
+                return await asyncio.shield(flight.task)
+
+            timer = StageTimer()
+            try:
+                with timer.stage("quick"):
+                    nlp_data, behavior_data = await asyncio.gather(
+                        service_backend.analyze('nlp', scraped["reviews"], quick=True),
+                        service_backend.analyze('behavior', scraped["reviews"], quick=True)
+                    )
+                    final_score = await self._score(scraped, nlp_data, behavior_data, quick=True)
+            except Exception as e:
+                self.quick_fallbacks += 1
+                logger.warning(f"Quick analysis of {request.product_url} failed, waiting for the full run: {str(e) or type(e).__name__}")
+                return await asyncio.shield(flight.task)
+            finally:
+                latency_metrics.record(timer, "quick", time.perf_counter() - started)
+                if caller_timer:
+                    caller_timer.merge(timer)
+
+            if flight.task.done() and not flight.task.cancelled() and flight.task.exception() is None:
+                # The full analysis won the race
+                return flight.task.result()
+
+            # The full analysis replaces the provisional score, even if every client goes away
+            flight.pin()
+            response = self._build_response(final_score)
+            result_cache.put(key, response, expires_at=datetime.utcnow() + timedelta(seconds=settings.QUICK_RESULT_TTL_SECONDS))
+            self.quick_served += 1
+            return response
+        finally:
+            flight.detach()
+
+    async def _scraped_within(self, flight: Flight, budget: float) -> Optional[Dict[str, Any]]:
+        """
+        Wait for the flight's scrape for at most budget seconds
+
+        Returns:
+            The scraped reviews and metadata (the reviews streamed so far if
+            the scrape is still running), None if there are no reviews yet
+        """
+        async def scrape_done():
+            async for stage, _ in flight.events():
+                if stage == "scrape":
+                    return
+
+        try:
+            await asyncio.wait_for(scrape_done(), timeout=budget)
+        except asyncio.TimeoutError:
+            pass
+
+        if flight.scraped is not None:
+            return flight.scraped if flight.scraped.get("reviews") else None
+        if flight.partial_scrape and flight.partial_scrape["reviews"]:
+            # Snapshot: the streamed scrape keeps appending to its list
+            return {**flight.partial_scrape, "reviews": list(flight.partial_scrape["reviews"])}
+        return None
+
+    async def _run_stages(
+        self,
+        request: AnalyzeRequest,
+        flight: Flight,
+        check_cache: bool,
+        check_l1: bool,
+        deadline: float,
+        refresh: bool = False
+    ) -> AnalysisResponse:
+        """Check the cache, then run the pipeline under admission control"""
+        timer = flight.timer
+
+        # Step 1: Check cache (L1 in memory, then URL Cache Service)
+        if request.force_refresh:
+            result_cache.invalidate(normalize_url(request.product_url))
+            flight.publish("cache", {"checked": False, "reason": "force_refresh"})
+        elif not check_cache:
+            flight.publish("cache", {"checked": False, "reason": "checked_by_caller"})
+        else:
+            with timer.stage("cache"):
+                cached_response = await self._check_cache(request.product_url, check_l1)
+            flight.publish("cache", {"checked": True, "hit": cached_response is not None})
+            if cached_response:
+                return cached_response
+
+        # Cache hits never wait for a slot; full runs are admitted, queued or shed
+        async with admission_controller.slot(deadline):
+            return await asyncio.wait_for(
+                self._run_pipeline(request, flight, write_through=refresh),
+                timeout=max(0.0, deadline - time.monotonic())
+            )
+
+    async def _run_pipeline(self, request: AnalyzeRequest, flight: Flight, write_through: bool = False) -> AnalysisResponse:
+        """
+        Run every pipeline step after the cache, timing each and publishing stage events
+
+        Every full report is written to the URL Cache Service, which is
+        what lets it be served stale once expired. Request-driven runs
+        write in the background; with write_through (background refreshes)
+        the entry is replaced before returning.
+        """
+        timer = flight.timer
+
+        if settings.STREAMING_ANALYSIS:
+            # Steps 2-3 overlapped: reviews are analyzed chunk by chunk while being scraped
+            reviews_data, nlp_data, behavior_data = await self._scrape_and_analyze(request.product_url, flight)
+        else:
+            # Step 2: Scrape reviews (Scraper Service)
+            with timer.stage("scrape"):
+                reviews_data = await self._scrape(request.product_url)
+            flight.scraped = reviews_data
+            flight.publish("scrape", self._scrape_summary(reviews_data))
+
+            # Step 3: Parallel analysis (NLP + Behavior services)
+            with timer.stage("analyze"):
+                nlp_data, behavior_data = await self._analyze(reviews_data, flight)
+
+        # Step 4: Generate final score (Scoring Service)
+        with timer.stage("score"):
+            final_score = await self._score(reviews_data, nlp_data, behavior_data)
+
+        # Step 5: Store report (Report Service, off the critical path)
+        with timer.stage("store"):
+            self._store_report(request.product_url, final_score)
+
+        response = self._build_response(final_score)
+        result_cache.put(
+            normalize_url(request.product_url),
+            response,
+            expires_at=datetime.utcnow() + timedelta(days=settings.CACHE_TTL_DAYS)
+        )
+        if write_through:
+            with timer.stage("store"):
+                await self._write_through(request.product_url, response, refresh=True)
+        else:
+            self._write_through_in_background(request.product_url, response)
+        return response
+
+    async def _check_cache(self, product_url: str, check_l1: bool = True) -> Optional[AnalysisResponse]:
+        """Return the cached full report from the L1 cache or, failing that, the URL Cache Service"""
+        key = normalize_url(product_url)
+        if check_l1:
+            cached_response = result_cache.get(key)
+            if cached_response and cached_response.analysis_depth == "full":
+                logger.info(f"L1 cache HIT for {product_url}")
+                return cached_response
+
+        try:
+            return self._cached_response(product_url, await service_backend.check_cache(product_url))
+        except Exception as e:
+            logger.warning(f"Cache check failed: {str(e)}")
+
+        return None
+
+    def _cached_response(self, product_url: str, cached_data: Dict[str, Any]) -> Optional[AnalysisResponse]:
+        """Turn a URL Cache Service lookup into a cached response (None on a miss)"""
+        if cached_data.get("stale") and cached_data.get("report") and settings.STALE_WHILE_REVALIDATE:
+            logger.info(f"Cache STALE for {product_url}, serving it and refreshing in the background")
+            self.stale_served += 1
+            self._revalidate(product_url)
+            return AnalysisResponse(
+                status="success",
+                cached=True,
+                stale=True,
+                **cached_data["report"]
+            )
+
+        if cached_data.get("cached") and cached_data.get("valid"):
+            logger.info(f"Cache HIT for {product_url}")
+            cached_response = AnalysisResponse(
+                status="success",
+                cached=True,
+                **cached_data.get("report", {})
+            )
+            result_cache.put(
+                normalize_url(product_url),
+                cached_response,
+                expires_at=parse_expires_at(cached_data.get("expires_at"))
+            )
+            return cached_response
+
+        logger.info(f"Cache MISS for {product_url}")
+        return None
+
+    def _revalidate(self, product_url: str):
+        """Start a background refresh of an expired report, unless one is already running"""
+        key = normalize_url(product_url)
+        if self.refreshes.is_in_flight(key):
+            return
+
+        self.refreshes_started += 1
+        self._join_refresh(product_url).task.add_done_callback(self._refresh_done)
+
+    def _join_refresh(self, product_url: str) -> Flight:
+        """Return the background refresh of a product, starting one if none is in flight"""
+        refresh_request = AnalyzeRequest(product_url=product_url, force_refresh=True)
+        return self.refreshes.join(
+            normalize_url(product_url),
+            lambda flight: self._execute(refresh_request, flight, refresh=True)
+        )
+
+    def _write_through_in_background(self, product_url: str, response: AnalysisResponse):
+        """Write a fresh report to the URL Cache Service off the critical path"""
+        task = asyncio.create_task(self._write_through(product_url, response))
+        self._cache_writes.add(task)
+        task.add_done_callback(self._cache_writes.discard)
+
+    async def _write_through(self, product_url: str, response: AnalysisResponse, refresh: bool = False):
+        """
+        Replace the product's URL Cache Service entry with a fresh report
+
+        The L1 cache only serves this worker; the URL Cache Service entry is
+        what every worker reads, so writing it ends the stale period (or the
+        pre-warmed product's expiry) for all of them.
+        """
+        try:
+            await service_backend.store_cache(
+                product_url,
+                response.model_dump(exclude={"status", "cached", "stale"}),
+                ttl_days=settings.CACHE_TTL_DAYS
+            )
+            self.cache_writes += 1
+            if refresh:
+                self.refreshes_written += 1
+        except Exception as e:
+            self.cache_write_failures += 1
+            if refresh:
+                self.refresh_writes_failed += 1
+            logger.warning(f"Writing the report of {product_url} to the URL cache failed: {str(e) or type(e).__name__}")
+
+    def _refresh_done(self, task: asyncio.Task):
+        if not task.cancelled() and task.exception() is not None:
+            self.refreshes_failed += 1
+            logger.warning(f"Background refresh failed: {str(task.exception()) or type(task.exception()).__name__}")
+
+    async def _scrape(self, product_url: str) -> Dict[str, Any]:
+        """Scrape product reviews"""
+        logger.info("Initiating MOCK scraping for testing...")
+        try:
+            reviews_data = await service_backend.scrape(product_url)
+        except ServiceCallError as e:
+            raise HTTPException(
+                status_code=status.HTTP_502_BAD_GATEWAY,
+                detail=f"Failed to scrape product reviews: {e.detail}"
+            )
+
+        logger.info(f"Successfully scraped {len(reviews_data.get('reviews', []))} reviews (MOCK DATA)")
+        return reviews_data
+
+    async def _scrape_and_analyze(
+        self,
+        product_url: str,
+        flight: Flight
+    ) -> Tuple[Dict[str, Any], Dict[str, Any], Dict[str, Any]]:
+        """
+        Stream the reviews from the scraper into NLP and behavior sessions
+
+        Each chunk is sent to both sessions while the scraper produces the
+        next one. The sessions are finished (similarity clusters, aggregates,
+        behavioral patterns) once the last chunk has arrived.
+
+        Returns:
+            Scraper data (as from _scrape), NLP data and behavior data
+        """
+        timer = flight.timer
+        chunk_queues = {service_name: asyncio.Queue() for service_name in ('nlp', 'behavior')}
+        feeders = {
+            service_name: asyncio.create_task(self._feed_session(service_name, chunks, flight))
+            for service_name, chunks in chunk_queues.items()
+        }
+
+        try:
+            with timer.stage("scrape"):
+                reviews_data = await self._scrape_stream(product_url, list(chunk_queues.values()), flight)
+            flight.scraped = reviews_data
+            flight.publish("scrape", self._scrape_summary(reviews_data))
+
+            # Only the finalization is left once the scrape is done
+            with timer.stage("analyze"):
+                nlp_data, behavior_data = await self._gather_analyses(feeders['nlp'], feeders['behavior'])
+        except BaseException:
+            for feeder in feeders.values():
+                feeder.cancel()
+            await asyncio.gather(*feeders.values(), return_exceptions=True)
+            raise
+
+        return reviews_data, nlp_data, behavior_data
+
+    async def _scrape_stream(self, product_url: str, chunk_queues: List[asyncio.Queue], flight: Flight) -> Dict[str, Any]:
+        """Read the streamed scrape, handing every chunk of reviews to the analysis sessions"""
+        logger.info("Initiating MOCK streaming scrape for testing...")
+        reviews_data: Dict[str, Any] = {"reviews": []}
+        flight.partial_scrape = reviews_data
+
+        try:
+            async for event in service_backend.scrape_stream(product_url, settings.SCRAPE_CHUNK_SIZE):
+                if event["type"] == "metadata":
+                    reviews_data["platform"] = event.get("platform")
+                    reviews_data["scraping_method"] = event.get("scraping_method")
+                    reviews_data["product_metadata"] = event.get("product_metadata", {})
+                elif event["type"] == "reviews":
+                    reviews_data["reviews"].extend(event["reviews"])
+                    for chunks in chunk_queues:
+                        chunks.put_nowait(event["reviews"])
+        except ServiceCallError as e:
+            raise HTTPException(
+                status_code=status.HTTP_502_BAD_GATEWAY,
+                detail=f"Failed to scrape product reviews: {e.detail}"
+            )
+
+        # End of reviews: the sessions can be finished
+        for chunks in chunk_queues:
+            chunks.put_nowait(None)
+
+        logger.info(f"Successfully scraped {len(reviews_data['reviews'])} reviews (MOCK DATA, streamed)")
+        return reviews_data
+
+    async def _feed_session(self, service_name: str, chunks: asyncio.Queue, flight: Flight) -> Dict[str, Any]:
+        """
+        Send each chunk to an analysis session as it arrives, then finish it and publish its aggregates
+
+        Sessions live in the service instance that opened them; if the
+        session is not found (another replica answered, or it expired), the
+        reviews are analyzed in one /analyze call once the scrape is done.
+        """
+        with flight.timer.stage(service_name):
+            session_id = None
+            reviews: List[Dict[str, Any]] = []
+            scraped_all = False
+            try:
+                session_id = await service_backend.open_session(service_name)
+                while not scraped_all:
+                    chunk = await chunks.get()
+                    if chunk is None:
+                        scraped_all = True
+                    else:
+                        reviews.extend(chunk)
+                        await service_backend.add_chunk(service_name, session_id, chunk)
+                data = await service_backend.finish_session(service_name, session_id)
+            except ServiceCallError as e:
+                if e.status_code == status.HTTP_404_NOT_FOUND:
+                    logger.warning(f"{service_name} session lost ({e.detail}), analyzing the reviews in one call")
+                    if not scraped_all:
+                        while (chunk := await chunks.get()) is not None:
+                            reviews.extend(chunk)
+                    data = await self._analyze_unstreamed(service_name, reviews)
+                else:
+                    logger.warning(f"{service_name} analysis returned {e.status_code}: {e.detail}")
+                    if session_id:
+                        await self._discard_session(service_name, session_id)
+                    data = {}
+
+        self._publish_analysis(service_name, data, flight)
+        return data
+
+    async def _analyze_unstreamed(self, service_name: str, reviews: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Analyze every scraped review with /analyze (a streamed analysis lost its session)"""
+        self.session_fallbacks += 1
+        try:
+            return await service_backend.analyze(service_name, reviews)
+        except ServiceCallError as e:
+            logger.warning(f"{service_name} analysis returned {e.status_code}: {e.detail}")
+            return {}
+
+    async def _discard_session(self, service_name: str, session_id: str):
+        """Best-effort close of a failed session (it would otherwise expire on its own)"""
+        try:
+            await service_backend.discard_session(service_name, session_id)
+        except Exception as e:
+            logger.debug(f"Could not discard {service_name} session {session_id}: {str(e)}")
+
+    async def _analyze(
+        self,
+        reviews_data: Dict[str, Any],
+        flight: Flight
+    ) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        """Run NLP and behavior analysis in parallel, publishing each as it finishes"""
+        logger.info("Running parallel analysis...")
+
+        nlp_task = self._call_analyzer('nlp', reviews_data, flight)
+        behavior_task = self._call_analyzer('behavior', reviews_data, flight)
+
+        return await self._gather_analyses(nlp_task, behavior_task)
+
+    async def _gather_analyses(
+        self,
+        nlp_task: Awaitable[Dict[str, Any]],
+        behavior_task: Awaitable[Dict[str, Any]]
+    ) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        """Wait for the NLP and behavior analyses, failing the run if either raised"""
+        # Wait for both analyses
+        nlp_data, behavior_data = await asyncio.gather(
+            nlp_task, behavior_task, return_exceptions=True
+        )
+
+        # Handle potential errors
+        for result in (nlp_data, behavior_data):
+            if isinstance(result, CircuitOpenError):
+                raise result
+
+        if isinstance(nlp_data, Exception):
+            logger.error(f"NLP service failed: {str(nlp_data) or type(nlp_data).__name__}")
+            raise HTTPException(
+                status_code=status.HTTP_502_BAD_GATEWAY,
+                detail=f"NLP analysis failed: {str(nlp_data) or type(nlp_data).__name__}"
+            )
+
+        if isinstance(behavior_data, Exception):
+            logger.error(f"Behavior service failed: {str(behavior_data) or type(behavior_data).__name__}")
+            raise HTTPException(
+                status_code=status.HTTP_502_BAD_GATEWAY,
+                detail=f"Behavior analysis failed: {str(behavior_data) or type(behavior_data).__name__}"
+            )
+
+        logger.info(f"NLP Data: {nlp_data}")
+        logger.info(f"Behavior Data: {behavior_data}")
+
+        return nlp_data, behavior_data
+
+    async def _call_analyzer(
+        self,
+        service_name: str,
+        reviews_data: Dict[str, Any],
+        flight: Flight
+    ) -> Dict[str, Any]:
+        """Send the reviews to one analysis service and publish its aggregates"""
+        with flight.timer.stage(service_name):
+            try:
+                data = await service_backend.analyze(service_name, reviews_data.get("reviews", []))
+            except ServiceCallError as e:
+                logger.warning(f"{service_name} analysis returned {e.status_code}: {e.detail}")
+                data = {}
+
+        self._publish_analysis(service_name, data, flight)
+        return data
+
+    def _publish_analysis(self, service_name: str, data: Dict[str, Any], flight: Flight):
+        """Publish the aggregates of a finished NLP or behavior analysis"""
+        summary = {
+            "total_reviews": data.get("total_reviews", 0),
+            "aggregate_metrics": data.get("aggregate_metrics", {})
+        }
+        if service_name == 'nlp':
+            summary["similarity_clusters_count"] = len(data.get("similarity_clusters", []))
+        else:
+            summary["rating_distribution"] = data.get("rating_distribution", {})
+
+        flight.publish(service_name, summary)
+
+    async def _score(
+        self,
+        reviews_data: Dict[str, Any],
+        nlp_data: Dict[str, Any],
+        behavior_data: Dict[str, Any],
+        quick: bool = False
+    ) -> Dict[str, Any]:
+        """Generate the final trust score (quick=True: provisional score from the quick analyses)"""
+        logger.info("Generating trust score...")
+
+        product_metadata = reviews_data.get("product_metadata", {})
+        scoring_payload = {
+            # Scoring only reads the aggregates, not the per-review analyses or clusters
+            "nlp_results": {
+                key: value for key, value in nlp_data.items()
+                if key not in ("analyses", "similarity_clusters")
+            },
+            "behavior_results": behavior_data,  # Send the entire Behavior response
+            "product_metadata": {
+                "product_name": product_metadata.get("product_name", "Unknown Product"),
+                "platform": product_metadata.get("platform", "unknown"),
+                "total_ratings": product_metadata.get("total_ratings"),
+                "average_rating": product_metadata.get("average_rating"),
+                "rating_distribution": behavior_data.get("rating_distribution", {})
+            }
+        }
+
+        logger.info(f"Scoring payload keys: {scoring_payload.keys()}")
+
+        try:
+            return await service_backend.score(scoring_payload, quick=quick)
+        except ServiceCallError as e:
+            logger.error(f"Scoring error: {e.detail}")
+            raise HTTPException(
+                status_code=status.HTTP_502_BAD_GATEWAY,
+                detail=f"Scoring service failed: {e.detail}"
+            )
+
+    def _store_report(self, product_url: str, final_score: Dict[str, Any]):
+        """Queue the final report for persistence (written in the background)"""
+        report_writer.enqueue(product_url, final_score, ttl_days=REPORT_TTL_DAYS)
+
+    def _scrape_summary(self, reviews_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Condense the scraper response for the scrape stage event"""
+        product_metadata = reviews_data.get("product_metadata", {})
+        return {
+            "total_reviews": len(reviews_data.get("reviews", [])),
+            "product_name": product_metadata.get("product_name", "Unknown Product"),
+            "platform": product_metadata.get("platform", "unknown"),
+            "average_rating": product_metadata.get("average_rating"),
+            "scraping_method": reviews_data.get("scraping_method")
+        }
+
+    def _build_response(self, final_score: Dict[str, Any]) -> AnalysisResponse:
+        """Convert the scoring result into the gateway response"""
+        return AnalysisResponse(
+            status="success",
+            cached=False,
+            timestamp=final_score.get('timestamp') or datetime.utcnow().isoformat(),
+            success=final_score.get('success', True),
+            trust_score=final_score['trust_score'],
+            fake_reviews_percentage=final_score['fake_reviews_percentage'],
+            risk_level=final_score['risk_level'],
+            score_breakdown=final_score['score_breakdown'],
+            key_insights=final_score['key_insights'],
+            total_reviews_analyzed=final_score['total_reviews_analyzed'],
+            recommendation=final_score['recommendation'],
+            confidence=final_score['confidence'],
+            analysis_depth=final_score.get('analysis_depth', "full")
+        )
+
+
+# Global pipeline instance shared by all analysis routes
+analysis_pipeline = AnalysisPipeline()
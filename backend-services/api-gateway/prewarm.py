@@ -0,0 +1,205 @@
+"""
+Cache pre-warming - refreshes popular reports before they expire, during off-peak windows
+"""
+from typing import Dict, Any, List, Optional, Tuple
+from collections import OrderedDict
+from datetime import datetime, time as dt_time
+import logging
+import asyncio
+
+from config import settings
+from backends import service_backend
+from admission import admission_controller
+from result_cache import parse_expires_at
+from utils.url_utils import normalize_url
+
+logger = logging.getLogger(__name__)
+
+# Cap on the URLs tracked for access counts and for hit attribution
+MAX_TRACKED_URLS = 10000
+
+
+def parse_windows(windows: str) -> List[Tuple[dt_time, dt_time]]:
+    """Parse "HH:MM-HH:MM,..." into (start, end) pairs; a window may wrap past midnight"""
+    parsed = []
+    for window in filter(None, (w.strip() for w in windows.split(","))):
+        start, end = (dt_time.fromisoformat(part.strip()) for part in window.split("-"))
+        parsed.append((start, end))
+    return parsed
+
+
+class PrewarmScheduler:
+    """
+    Re-runs the analysis of the most-accessed reports that are about to expire
+
+    Every PREWARM_INTERVAL_SECONDS, inside an off-peak window, the Report
+    Service is asked for reports expiring within PREWARM_EXPIRING_WITHIN_HOURS,
+    most accessed first. Their analyses are re-run one at a time, at most
+    PREWARM_MAX_PER_MINUTE, and the cycle stops as soon as live requests queue
+    for a pipeline slot. Each refreshed report replaces the product's URL
+    Cache Service entry, so every worker serves it, not only this one.
+
+    Reads served from the gateway's caches never reach the Report Service, so
+    the scheduler also counts them and adds them to the reports' access
+    counters. A later cache hit on a pre-warmed product, after the time its
+    old report would have expired, is counted as a hit gained by pre-warming
+    (by the worker that pre-warmed it; hits on other workers are not attributed).
+    """
+
+    def __init__(self):
+        self._task: Optional[asyncio.Task] = None
+        self._windows = parse_windows(settings.PREWARM_WINDOWS)
+        self._accesses: Dict[str, int] = {}  # URL -> reads since the last flush
+        # Normalized URL -> expiry of the report that was replaced by pre-warming
+        self._prewarmed: "OrderedDict[str, datetime]" = OrderedDict()
+        self.cycles = 0
+        self.cycles_off_window = 0
+        self.cycles_yielded = 0
+        self.refreshes = 0
+        self.refresh_failures = 0
+        self.lookups = 0
+        self.hits = 0
+        self.prewarmed_hits = 0
+
+    async def startup(self):
+        """Start the scheduler loop (called on application startup)"""
+        if settings.PREWARM_ENABLED:
+            self._task = asyncio.create_task(self._loop())
+
+    async def shutdown(self):
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        await self._flush_accesses()
+
+    def record_lookup(self, product_url: str, outcome: str):
+        """
+        Count a request answered by the pipeline
+
+        Args:
+            product_url: Requested product URL
+            outcome: "hit", "stale" or "miss"
+        """
+        self.lookups += 1
+        if outcome == "miss":
+            return
+
+        if product_url in self._accesses or len(self._accesses) < MAX_TRACKED_URLS:
+            self._accesses[product_url] = self._accesses.get(product_url, 0) + 1
+        if outcome != "hit":
+            return
+
+        self.hits += 1
+        replaced_expiry = self._prewarmed.get(normalize_url(product_url))
+        if replaced_expiry and datetime.utcnow() > replaced_expiry:
+            self.prewarmed_hits += 1
+
+    def in_window(self, now: Optional[datetime] = None) -> bool:
+        """Whether pre-warming may run now (always, when no windows are configured)"""
+        if not self._windows:
+            return True
+
+        current = (now or datetime.utcnow()).time()
+        for start, end in self._windows:
+            if start <= end and start <= current < end:
+                return True
+            if start > end and (current >= start or current < end):
+                return True
+        return False
+
+    async def run_cycle(self):
+        """Flush the access counts, then pre-warm the current candidates"""
+        self.cycles += 1
+        await self._flush_accesses()
+
+        if not self.in_window():
+            self.cycles_off_window += 1
+            return
+
+        candidates = await service_backend.prewarm_candidates(
+            settings.PREWARM_EXPIRING_WITHIN_HOURS,
+            settings.PREWARM_MAX_PER_CYCLE,
+            settings.PREWARM_MIN_ACCESS_COUNT
+        )
+
+        for index, candidate in enumerate(candidates):
+            if admission_controller.stats()["queued"] > 0:
+                # Live traffic is waiting for pipeline slots; try again next cycle
+                self.cycles_yielded += 1
+                logger.info(f"Pre-warming paused with {len(candidates) - index} candidates left")
+                return
+
+            if index:
+                await asyncio.sleep(60.0 / settings.PREWARM_MAX_PER_MINUTE)
+            await self._refresh(candidate)
+
+    def stats(self) -> Dict[str, Any]:
+        """Refresh counters and the hit rate gained by pre-warming"""
+        hit_rate = self.hits / self.lookups if self.lookups else 0.0
+        uplift = self.prewarmed_hits / self.lookups if self.lookups else 0.0
+        return {
+            "enabled": settings.PREWARM_ENABLED,
+            "windows": settings.PREWARM_WINDOWS or "always",
+            "in_window": self.in_window(),
+            "cycles": self.cycles,
+            "cycles_off_window": self.cycles_off_window,
+            "cycles_yielded": self.cycles_yielded,
+            "refreshes": self.refreshes,
+            "refresh_failures": self.refresh_failures,
+            "pending_accesses": sum(self._accesses.values()),
+            "lookups": self.lookups,
+            "hits": self.hits,
+            "prewarmed_hits": self.prewarmed_hits,
+            "hit_rate": round(hit_rate, 4),
+            "hit_rate_without_prewarm": round(hit_rate - uplift, 4),
+            "hit_rate_uplift": round(uplift, 4)
+        }
+
+    async def _loop(self):
+        while True:
+            await asyncio.sleep(settings.PREWARM_INTERVAL_SECONDS)
+            try:
+                await self.run_cycle()
+            except Exception as e:
+                logger.warning(f"Pre-warming cycle failed: {str(e) or type(e).__name__}")
+
+    async def _refresh(self, candidate: Dict[str, Any]):
+        # Imported here: the pipeline reports its lookups to this module
+        from pipeline import analysis_pipeline
+
+        product_url = candidate["url"]
+        try:
+            await analysis_pipeline.refresh(product_url)
+        except Exception as e:
+            self.refresh_failures += 1
+            logger.warning(f"Pre-warming {product_url} failed: {getattr(e, 'detail', None) or str(e)}")
+            return
+
+        self.refreshes += 1
+        replaced_expiry = parse_expires_at(candidate.get("expires_at"))
+        if replaced_expiry:
+            key = normalize_url(product_url)
+            self._prewarmed[key] = replaced_expiry
+            self._prewarmed.move_to_end(key)
+            while len(self._prewarmed) > MAX_TRACKED_URLS:
+                self._prewarmed.popitem(last=False)
+        logger.info(f"Pre-warmed {product_url} ({candidate.get('access_count', 0)} accesses)")
+
+    async def _flush_accesses(self):
+        """Send the reads counted since the last flush to the Report Service"""
+        if not self._accesses:
+            return
+
+        accesses, self._accesses = self._accesses, {}
+        try:
+            await service_backend.record_accesses(accesses)
+        except Exception as e:
+            # Put them back so they are sent with the next flush
+            for url, count in accesses.items():
+                self._accesses[url] = self._accesses.get(url, 0) + count
+            logger.warning(f"Recording report accesses failed: {str(e) or type(e).__name__}")
+
+
+# Global pre-warming scheduler (started on application startup)
+prewarm_scheduler = PrewarmScheduler()
@@ -0,0 +1,253 @@
+"""
+Cost-weighted quotas - per-client budgets charged by what each analysis costs downstream
+"""
+from typing import Dict, Any, List, Optional
+from fastapi import HTTPException, status
+import logging
+import math
+
+from config import settings
+from models import AnalyzeRequest, AnalysisResponse
+from rate_limiter import rate_limiter, RateLimitResult, retry_after_header
+from result_cache import result_cache
+from utils.url_utils import normalize_url
+
+logger = logging.getLogger(__name__)
+
+# Request paths, cheapest first
+COST_PATHS = ["cache_hit", "scrape", "force_refresh"]
+
+QUOTA_LIMIT_HEADER = "X-Quota-Limit"
+QUOTA_REMAINING_HEADER = "X-Quota-Remaining"
+QUOTA_COST_HEADER = "X-Quota-Cost"
+
+
+class QuotaCharge:
+    """Cost units taken from a client's budget for one request, until settled"""
+
+    def __init__(self, identifier: str, path: str, cost: float, result: RateLimitResult):
+        self.identifier = identifier
+        self.path = path
+        self.cost = cost
+        self.result = result
+        # Set when the client could only afford a cache hit and one was found
+        self.cached_response: Optional[AnalysisResponse] = None
+        self.settled = False
+
+    def headers(self) -> Dict[str, str]:
+        """Budget, what is left of it and what this request cost"""
+        return {
+            QUOTA_LIMIT_HEADER: _format_units(settings.QUOTA_BUDGET),
+            QUOTA_REMAINING_HEADER: _format_units(math.floor(self.result.remaining)),
+            QUOTA_COST_HEADER: _format_units(self.cost)
+        }
+
+
+class QuotaManager:
+    """
+    Charges each client's budget by request path instead of by request count
+
+    A cache hit costs QUOTA_COST_CACHE_HIT, a miss the scrape it triggers
+    (QUOTA_COST_SCRAPE: the pipeline calls the scraper's mock endpoint for
+    every URL, so all scrapes cost the same), and force_refresh adds
+    QUOTA_COST_FORCE_REFRESH on top of its scrape. The
+    path is only known once the pipeline has run, so the likely cost is
+    charged up front (a cache hit only if the L1 cache already holds the
+    report) and the difference is refunded when the request turns out
+    cheaper, or fails.
+
+    A client without budget for a miss is not locked out of cheap requests:
+    its request is still answered if the report is cached and it can afford
+    a cache hit.
+    """
+
+    def __init__(self):
+        self.charged = 0.0
+        self.refunded = 0.0
+        self.rejected = 0
+        self.served_from_cache_only = 0
+        self.requests_by_path = {path: 0 for path in COST_PATHS}
+
+    def path_cost(self, path: str) -> float:
+        if path == "cache_hit":
+            return settings.QUOTA_COST_CACHE_HIT
+        if path == "scrape":
+            return settings.QUOTA_COST_SCRAPE
+        return settings.QUOTA_COST_FORCE_REFRESH + self.path_cost("scrape")
+
+    def predict_path(self, product_url: str, force_refresh: bool) -> str:
+        """Path charged up front: a miss unless the report is in this worker's L1 cache"""
+        if force_refresh:
+            return "force_refresh"
+        cached = result_cache.peek(normalize_url(product_url))
+        if cached and cached.analysis_depth == "full":
+            return "cache_hit"
+        return "scrape"
+
+    def finished(self, force_refresh: bool, cached: Optional[bool]) -> float:
+        """
+        Count a finished analysis by the path it took and return what it costs
+
+        Args:
+            cached: Whether the report came from a cache (None if the analysis
+                failed, which costs nothing)
+        """
+        if cached is None:
+            return 0.0
+        if cached:
+            path = "cache_hit"
+        else:
+            path = "force_refresh" if force_refresh else "scrape"
+        self.requests_by_path[path] += 1
+        return self.path_cost(path)
+
+    async def charge(
+        self,
+        identifier: str,
+        request: AnalyzeRequest,
+        allow_cache_only: bool = True
+    ) -> Optional[QuotaCharge]:
+        """
+        Charge the likely cost of an analysis to a client's budget (None when quotas are disabled)
+
+        Args:
+            identifier: Client identifier (as used for rate limiting)
+            request: Analysis request being charged
+            allow_cache_only: When the client cannot afford a miss, look the
+                report up and charge a cache hit if it is cached
+
+        Raises:
+            HTTPException: 429 with Retry-After and quota headers if the budget
+                does not cover the request
+        """
+        if not settings.QUOTA_ENABLED:
+            return None
+
+        path = self.predict_path(request.product_url, request.force_refresh)
+        cost = self.path_cost(path)
+        result = await self._consume(identifier, cost)
+
+        if result.allowed:
+            return self._charged(identifier, path, cost, result)
+
+        if allow_cache_only and path != "cache_hit" and not request.force_refresh:
+            # Imported here: the pipeline is not needed until a client runs out of budget
+            from pipeline import analysis_pipeline
+
+            cached = (await analysis_pipeline.check_cache_many([request.product_url]))[request.product_url]
+            if cached is not None:
+                cache_hit_cost = self.path_cost("cache_hit")
+                cache_hit_result = await self._consume(identifier, cache_hit_cost)
+                if cache_hit_result.allowed:
+                    self.served_from_cache_only += 1
+                    self.requests_by_path["cache_hit"] += 1
+                    charge = self._charged(identifier, "cache_hit", cache_hit_cost, cache_hit_result)
+                    charge.cached_response = cached
+                    charge.settled = True
+                    return charge
+
+        self._reject(identifier, path, cost, result)
+
+    async def charge_batch(self, identifier: str, product_urls: List[str], force_refresh: bool) -> Optional[QuotaCharge]:
+        """
+        Charge the likely cost of every unique URL in a batch at once (None when quotas are disabled)
+
+        Raises:
+            HTTPException: 429 if the budget does not cover the batch
+        """
+        if not settings.QUOTA_ENABLED:
+            return None
+
+        unique_urls = {normalize_url(url): url for url in product_urls}
+        cost = sum(
+            self.path_cost(self.predict_path(url, force_refresh))
+            for url in unique_urls.values()
+        )
+        path = "force_refresh" if force_refresh else "batch"
+        result = await self._consume(identifier, cost)
+
+        if not result.allowed:
+            self._reject(identifier, path, cost, result)
+        return self._charged(identifier, path, cost, result)
+
+    async def settle(self, charge: QuotaCharge, actual_cost: float):
+        """
+        Bring a charge in line with what the request actually cost
+
+        Overcharges are refunded. An undercharge (the L1 entry a cache hit
+        was predicted from expired before the run) is taken only if the
+        budget still covers it; the request has already been served.
+        """
+        if charge.settled:
+            return
+        charge.settled = True
+
+        difference = actual_cost - charge.cost
+        if difference == 0:
+            return
+
+        result = await self._consume(charge.identifier, difference)
+        if difference < 0:
+            self.refunded -= difference
+        elif not result.allowed:
+            return
+        else:
+            self.charged += difference
+        charge.result = result
+        charge.cost = actual_cost
+
+    async def settle_request(self, charge: QuotaCharge, request: AnalyzeRequest, response: Optional[AnalysisResponse]):
+        """Settle the charge for one analysis (response None if it failed)"""
+        cached = None if response is None else response.cached
+        await self.settle(charge, self.finished(request.force_refresh, cached))
+
+    def stats(self) -> Dict[str, Any]:
+        """Units charged and refunded, rejections, and finished requests by path"""
+        return {
+            "enabled": settings.QUOTA_ENABLED,
+            "budget": settings.QUOTA_BUDGET,
+            "window_seconds": settings.QUOTA_WINDOW,
+            "costs": {path: self.path_cost(path) for path in COST_PATHS[:-1]},
+            "force_refresh_surcharge": settings.QUOTA_COST_FORCE_REFRESH,
+            "units_charged": round(self.charged, 3),
+            "units_refunded": round(self.refunded, 3),
+            "rejected": self.rejected,
+            "served_from_cache_only": self.served_from_cache_only,
+            "requests_by_path": dict(self.requests_by_path)
+        }
+
+    async def _consume(self, identifier: str, cost: float) -> RateLimitResult:
+        return await rate_limiter.consume(
+            f"quota:{identifier}",
+            cost,
+            capacity=settings.QUOTA_BUDGET,
+            window=settings.QUOTA_WINDOW
+        )
+
+    def _charged(self, identifier: str, path: str, cost: float, result: RateLimitResult) -> QuotaCharge:
+        self.charged += cost
+        return QuotaCharge(identifier, path, cost, result)
+
+    def _reject(self, identifier: str, path: str, cost: float, result: RateLimitResult):
+        self.rejected += 1
+        logger.info(f"Quota exceeded for {identifier}: {path} costs {cost:g}, {result.remaining:.1f} left")
+        headers = QuotaCharge(identifier, path, cost, result).headers()
+        headers["Retry-After"] = (
+            str(settings.QUOTA_WINDOW) if math.isinf(result.retry_after) else retry_after_header(result)
+        )
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail=(
+                f"Quota exceeded. This request costs {cost:g} units, "
+                f"{math.floor(result.remaining)} of {settings.QUOTA_BUDGET:g} left per {settings.QUOTA_WINDOW} seconds"
+            ),
+            headers=headers
+        )
+
+
+def _format_units(units: float) -> str:
+    return f"{units:g}"
+
+
+# Global quota manager
+quota_manager = QuotaManager()
@@ -1,49 +1,301 @@
 """
-Rate limiting middleware
+Rate limiting middleware - token bucket with in-memory or Redis-backed state
 """
-from datetime import datetime, timedelta
+from typing import Dict, Any, List, Optional, NamedTuple
+from abc import ABC, abstractmethod
 from fastapi import Request, HTTPException, status
-from collections import defaultdict
+import logging
+import asyncio
+import math
+import time
 
 from config import settings
 # from utils.auth import verify_token  # Commented out for now
 
-# Rate limiting storage (in-memory for now, use Redis in production)
-rate_limit_storage = defaultdict(list)
+logger = logging.getLogger(__name__)
+
+
+class RateLimitResult(NamedTuple):
+    allowed: bool
+    remaining: float  # Tokens left in the bucket after this call
+    retry_after: float  # Seconds until the call would be allowed (0 if allowed)
+
+
+class RateLimitBackend(ABC):
+    """
+    Storage for token buckets
+
+    A bucket holds up to `capacity` tokens and refills at `refill_rate`
+    tokens per second. Each call takes `cost` tokens or is rejected; a
+    negative cost gives tokens back, up to capacity.
+    """
+
+    name = "base"
+
+    async def startup(self):
+        pass
+
+    async def shutdown(self):
+        pass
+
+    @abstractmethod
+    async def consume(self, key: str, cost: float, capacity: float, refill_rate: float) -> RateLimitResult:
+        """Refill the bucket of `key`, then take `cost` tokens from it if it holds enough"""
+        raise NotImplementedError
+
+    def stats(self) -> Dict[str, Any]:
+        return {"backend": self.name}
+
+
+def _take_tokens(tokens: float, cost: float, capacity: float, refill_rate: float) -> RateLimitResult:
+    """Apply one consume to an already refilled bucket"""
+    if tokens >= cost:
+        return RateLimitResult(True, min(capacity, tokens - cost), 0.0)
+    if cost > capacity:
+        return RateLimitResult(False, tokens, math.inf)
+    return RateLimitResult(False, tokens, (cost - tokens) / refill_rate)
+
+
+class InMemoryBackend(RateLimitBackend):
+    """
+    Per-process buckets: three floats per key, idle keys evicted on a timer
+
+    A bucket left alone long enough to refill completely is identical to a
+    new one, so the eviction loop can drop it without changing behaviour.
+    """
+
+    name = "memory"
+
+    def __init__(self):
+        self._buckets: Dict[str, List[float]] = {}  # key -> [tokens, updated_at, full_at]
+        self._eviction_task: Optional[asyncio.Task] = None
+        self.evicted = 0
+
+    async def startup(self):
+        self._eviction_task = asyncio.create_task(self._eviction_loop())
+
+    async def shutdown(self):
+        if self._eviction_task:
+            self._eviction_task.cancel()
+            await asyncio.gather(self._eviction_task, return_exceptions=True)
+            self._eviction_task = None
+
+    async def consume(self, key: str, cost: float, capacity: float, refill_rate: float) -> RateLimitResult:
+        now = time.monotonic()
+        bucket = self._buckets.get(key)
+
+        if bucket is None:
+            tokens = capacity
+        else:
+            tokens = min(capacity, bucket[0] + (now - bucket[1]) * refill_rate)
+
+        result = _take_tokens(tokens, cost, capacity, refill_rate)
+        full_at = now + (capacity - result.remaining) / refill_rate
+
+        if bucket is None:
+            self._buckets[key] = [result.remaining, now, full_at]
+        else:
+            bucket[0] = result.remaining
+            bucket[1] = now
+            bucket[2] = full_at
+
+        return result
+
+    def evict_idle(self) -> int:
+        """Drop buckets that have been idle long enough to be full again"""
+        now = time.monotonic()
+        idle = [key for key, bucket in self._buckets.items() if bucket[2] <= now]
+        for key in idle:
+            del self._buckets[key]
+
+        self.evicted += len(idle)
+        return len(idle)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "backend": self.name,
+            "tracked_keys": len(self._buckets),
+            "evicted_keys": self.evicted
+        }
+
+    async def _eviction_loop(self):
+        while True:
+            await asyncio.sleep(settings.RATE_LIMIT_EVICTION_INTERVAL)
+            evicted = self.evict_idle()
+            if evicted:
+                logger.info(f"Evicted {evicted} idle rate limit keys")
+
+
+# KEYS[1] = bucket key
+# ARGV = cost, capacity, refill_rate (tokens/s), now (seconds)
+# Returns {allowed (0/1), remaining tokens, retry_after seconds} as strings
+# (Redis truncates Lua numbers to integers)
+TOKEN_BUCKET_SCRIPT = """
+local cost = tonumber(ARGV[1])
+local capacity = tonumber(ARGV[2])
+local refill_rate = tonumber(ARGV[3])
+local now = tonumber(ARGV[4])
+
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1])
+local ts = tonumber(state[2])
+
+if tokens == nil then
+    tokens = capacity
+else
+    tokens = math.min(capacity, tokens + math.max(0, now - ts) * refill_rate)
+end
+
+local allowed = 0
+local retry_after = 0
+if tokens >= cost then
+    allowed = 1
+    tokens = math.min(capacity, tokens - cost)
+elseif cost > capacity then
+    retry_after = -1
+else
+    retry_after = (cost - tokens) / refill_rate
+end
+
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', tostring(now))
+-- Expire once the bucket would be full again (idle-key eviction)
+redis.call('PEXPIRE', KEYS[1], math.ceil((capacity - tokens) / refill_rate * 1000) + 1000)
+
+return {allowed, tostring(tokens), tostring(retry_after)}
+"""
+
+
+class RedisBackend(RateLimitBackend):
+    """
+    Buckets shared by every gateway worker, updated atomically by a Lua script
+
+    Keys expire on their own once refilled, so Redis does the idle eviction.
+    """
+
+    name = "redis"
+
+    def __init__(self, url: str):
+        self.url = url
+        self._redis = None
+        self._script = None
+
+    async def startup(self):
+        import redis.asyncio as redis
+
+        self._redis = redis.from_url(self.url)
+        self._script = self._redis.register_script(TOKEN_BUCKET_SCRIPT)
+        try:
+            await self._redis.ping()
+            logger.info(f"Rate limiter using Redis at {self.url}")
+        except Exception as e:
+            logger.warning(f"Redis at {self.url} unreachable, requests will not be limited until it is: {str(e)}")
+
+    async def shutdown(self):
+        if self._redis is not None:
+            await self._redis.aclose()
+            self._redis = None
+
+    async def consume(self, key: str, cost: float, capacity: float, refill_rate: float) -> RateLimitResult:
+        allowed, remaining, retry_after = await self._script(
+            keys=[f"{settings.RATE_LIMIT_KEY_PREFIX}{key}"],
+            args=[cost, capacity, refill_rate, time.time()]
+        )
+        retry_after = float(retry_after)
+        return RateLimitResult(
+            bool(int(allowed)),
+            float(remaining),
+            math.inf if retry_after < 0 else retry_after
+        )
+
+
+class RateLimiter:
+    """Token-bucket rate limiter over a configurable backend"""
+
+    def __init__(self):
+        self.backend: RateLimitBackend = InMemoryBackend()
+        self.backend_errors = 0
+
+    async def startup(self):
+        """Select and start the configured backend (called on application startup)"""
+        if settings.RATE_LIMIT_BACKEND == "redis":
+            self.backend = RedisBackend(settings.REDIS_URL)
+        else:
+            self.backend = InMemoryBackend()
+        await self.backend.startup()
+
+    async def shutdown(self):
+        await self.backend.shutdown()
+
+    async def consume(
+        self,
+        key: str,
+        cost: float = 1,
+        capacity: Optional[float] = None,
+        window: Optional[float] = None
+    ) -> RateLimitResult:
+        """
+        Take `cost` tokens from the bucket for key (a negative cost refunds)
+
+        Bucket size and refill default to RATE_LIMIT_REQUESTS per
+        RATE_LIMIT_WINDOW seconds. If the shared backend is unreachable the
+        request is allowed rather than failing the whole gateway.
+        """
+        capacity = settings.RATE_LIMIT_REQUESTS if capacity is None else capacity
+        refill_rate = capacity / (settings.RATE_LIMIT_WINDOW if window is None else window)
+
+        try:
+            return await self.backend.consume(key, cost, capacity, refill_rate)
+        except Exception as e:
+            self.backend_errors += 1
+            logger.warning(f"Rate limit backend error, allowing request: {str(e)}")
+            return RateLimitResult(True, capacity, 0.0)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            **self.backend.stats(),
+            "capacity": settings.RATE_LIMIT_REQUESTS,
+            "window_seconds": settings.RATE_LIMIT_WINDOW,
+            "backend_errors": self.backend_errors
+        }
+
+
+# Global rate limiter instance (backend selected on application startup)
+rate_limiter = RateLimiter()
+
+
+def retry_after_header(result: RateLimitResult) -> str:
+    """Whole seconds for the Retry-After header"""
+    if math.isinf(result.retry_after):
+        return str(settings.RATE_LIMIT_WINDOW)
+    return str(max(1, math.ceil(result.retry_after)))
+
+
+def get_client_identifier(request: Request) -> str:
+    """Client IP, preferring the first X-Forwarded-For hop (proxy/load balancer)"""
+    forwarded_for = request.headers.get("X-Forwarded-For")
+    return forwarded_for.split(",")[0].strip() if forwarded_for else request.client.host
 
 
 async def check_rate_limit(request: Request):
     """
     Rate limiting middleware - IP-based (no authentication required)
-    
+
     When authentication is re-enabled, you can switch back to user-based rate limiting
     by uncommenting the check_rate_limit_with_auth function below
     """
     # Use client IP as identifier instead of user_id
-    client_ip = request.client.host
-    
-    # For development: also check X-Forwarded-For header (proxy/load balancer)
-    forwarded_for = request.headers.get("X-Forwarded-For")
-    identifier = forwarded_for.split(",")[0].strip() if forwarded_for else client_ip
-    
-    current_time = datetime.utcnow()
-    
-    # Clean old requests outside the window
-    rate_limit_storage[identifier] = [
-        req_time for req_time in rate_limit_storage[identifier]
-        if current_time - req_time < timedelta(seconds=settings.RATE_LIMIT_WINDOW)
-    ]
-    
+    identifier = get_client_identifier(request)
+
+    result = await rate_limiter.consume(identifier)
+
     # Check if limit exceeded
-    if len(rate_limit_storage[identifier]) >= settings.RATE_LIMIT_REQUESTS:
+    if not result.allowed:
         raise HTTPException(
             status_code=status.HTTP_429_TOO_MANY_REQUESTS,
-            detail=f"Rate limit exceeded. Max {settings.RATE_LIMIT_REQUESTS} requests per {settings.RATE_LIMIT_WINDOW} seconds"
+            detail=f"Rate limit exceeded. Max {settings.RATE_LIMIT_REQUESTS} requests per {settings.RATE_LIMIT_WINDOW} seconds",
+            headers={"Retry-After": retry_after_header(result)}
         )
-    
-    # Add current request
-    rate_limit_storage[identifier].append(current_time)
-    
+
     return None  # Return None since we don't need user_id anymore
 
 
@@ -51,25 +303,19 @@ async def check_rate_limit(request: Request):
 # USER-BASED RATE LIMITING (for when auth is re-enabled)
 # ============================================================================
 # from utils.auth import verify_token
-# 
+#
 # async def check_rate_limit_with_auth(request: Request, user_data: dict = Depends(verify_token)):
 #     """Rate limiting middleware with user authentication"""
 #     user_id = user_data.get("sub")
-#     current_time = datetime.utcnow()
-#     
-#     # Clean old requests outside the window
-#     rate_limit_storage[user_id] = [
-#         req_time for req_time in rate_limit_storage[user_id]
-#         if current_time - req_time < timedelta(seconds=settings.RATE_LIMIT_WINDOW)
-#     ]
-#     
+#
+#     result = await rate_limiter.consume(f"user:{user_id}")
+#
 #     # Check if limit exceeded
-#     if len(rate_limit_storage[user_id]) >= settings.RATE_LIMIT_REQUESTS:
+#     if not result.allowed:
 #         raise HTTPException(
 #             status_code=status.HTTP_429_TOO_MANY_REQUESTS,
-#             detail=f"Rate limit exceeded. Max {settings.RATE_LIMIT_REQUESTS} requests per {settings.RATE_LIMIT_WINDOW} seconds"
+#             detail=f"Rate limit exceeded. Max {settings.RATE_LIMIT_REQUESTS} requests per {settings.RATE_LIMIT_WINDOW} seconds",
+#             headers={"Retry-After": retry_after_header(result)}
 #         )
-#     
-#     # Add current request
-#     rate_limit_storage[user_id].append(current_time)
-#     return user_id
\ No newline at end of file
+#
+#     return user_id
@@ -0,0 +1,232 @@
+"""
+Background report writer - persists reports off the request path with batching, retries and spill-to-disk
+"""
+from typing import Dict, Any, List, Optional
+import logging
+import asyncio
+import json
+import os
+import time
+
+from backends import service_backend
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class ReportWriter:
+    """
+    Bounded in-memory queue of reports drained by a single writer task
+
+    Reports are sent to the Report Service in batches. A batch that still
+    fails after REPORT_WRITE_RETRIES attempts (or a report that arrives
+    while the queue is full) is appended to a JSONL spill file, which is
+    replayed once the Report Service accepts writes again.
+    """
+
+    def __init__(self):
+        self._queue: Optional[asyncio.Queue] = None
+        self._writer_task: Optional[asyncio.Task] = None
+        self._replay_task: Optional[asyncio.Task] = None
+        self._spill_lock = asyncio.Lock()
+        self._pending_spills: set = set()
+        self.enqueued = 0
+        self.written = 0
+        self.batches_written = 0
+        self.retries = 0
+        self.failed_batches = 0
+        self.spilled = 0
+        self.replayed = 0
+        self.last_write_lag = 0.0
+        self.max_write_lag = 0.0
+
+    async def startup(self):
+        """Create the queue and start the writer and replay tasks (called on application startup)"""
+        self._queue = asyncio.Queue(maxsize=settings.REPORT_QUEUE_MAX_DEPTH)
+        self._writer_task = asyncio.create_task(self._writer_loop())
+        self._replay_task = asyncio.create_task(self._replay_loop())
+
+    async def shutdown(self):
+        """Flush queued reports, spilling whatever cannot be written in time"""
+        self._replay_task.cancel()
+        await asyncio.gather(self._replay_task, return_exceptions=True)
+
+        try:
+            await asyncio.wait_for(self._queue.join(), timeout=settings.REPORT_SHUTDOWN_TIMEOUT)
+        except asyncio.TimeoutError:
+            logger.warning("Report queue not drained before shutdown, spilling the rest")
+
+        self._writer_task.cancel()
+        await asyncio.gather(self._writer_task, return_exceptions=True)
+
+        remaining = []
+        while not self._queue.empty():
+            remaining.append(self._queue.get_nowait())
+        if remaining:
+            await self._spill(remaining)
+
+    def enqueue(self, product_url: str, report: Dict[str, Any], ttl_days: int):
+        """Queue a report for persistence without waiting for the write"""
+        item = {
+            "url": product_url,
+            "report": report,
+            "ttl_days": ttl_days,
+            "enqueued_at": time.time()
+        }
+        self.enqueued += 1
+
+        try:
+            self._queue.put_nowait(item)
+        except asyncio.QueueFull:
+            logger.warning("Report queue full, spilling report to disk")
+            task = asyncio.create_task(self._spill([item]))
+            self._pending_spills.add(task)
+            task.add_done_callback(self._pending_spills.discard)
+
+    def stats(self) -> Dict[str, Any]:
+        """Queue depth, write lag and delivery counters"""
+        oldest_age = 0.0
+        if self._queue is not None and not self._queue.empty():
+            oldest_age = time.time() - self._queue._queue[0]["enqueued_at"]
+
+        return {
+            "queue_depth": self._queue.qsize() if self._queue else 0,
+            "max_depth": settings.REPORT_QUEUE_MAX_DEPTH,
+            "oldest_queued_age_seconds": round(oldest_age, 3),
+            "last_write_lag_seconds": round(self.last_write_lag, 3),
+            "max_write_lag_seconds": round(self.max_write_lag, 3),
+            "enqueued": self.enqueued,
+            "written": self.written,
+            "batches_written": self.batches_written,
+            "retries": self.retries,
+            "failed_batches": self.failed_batches,
+            "spilled": self.spilled,
+            "replayed": self.replayed,
+            "spill_file_bytes": self._spill_file_size()
+        }
+
+    async def _writer_loop(self):
+        """Collect up to REPORT_BATCH_SIZE reports (or wait REPORT_BATCH_MAX_WAIT) and write them"""
+        while True:
+            batch = [await self._queue.get()]
+            deadline = time.monotonic() + settings.REPORT_BATCH_MAX_WAIT
+
+            while len(batch) < settings.REPORT_BATCH_SIZE:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout=timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            try:
+                if not await self._write_with_retries(batch):
+                    await self._spill(batch)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    async def _write_with_retries(self, batch: List[Dict[str, Any]]) -> bool:
+        """Write a batch, retrying with exponential backoff; returns whether it succeeded"""
+        for attempt in range(settings.REPORT_WRITE_RETRIES):
+            if attempt:
+                self.retries += 1
+                await asyncio.sleep(settings.REPORT_RETRY_BACKOFF * (2 ** (attempt - 1)))
+
+            try:
+                await self._write(batch)
+                return True
+            except Exception as e:
+                logger.warning(
+                    f"Report batch write failed (attempt {attempt + 1}/"
+                    f"{settings.REPORT_WRITE_RETRIES}): {str(e)}"
+                )
+
+        self.failed_batches += 1
+        return False
+
+    async def _write(self, batch: List[Dict[str, Any]]):
+        """Send one batch to the Report Service"""
+        await service_backend.store_reports([
+            {"url": item["url"], "report": item["report"], "ttl_days": item["ttl_days"]}
+            for item in batch
+        ])
+
+        now = time.time()
+        self.last_write_lag = now - min(item["enqueued_at"] for item in batch)
+        self.max_write_lag = max(self.max_write_lag, self.last_write_lag)
+        self.written += len(batch)
+        self.batches_written += 1
+        logger.info(f"Stored {len(batch)} reports (lag {self.last_write_lag:.2f}s)")
+
+    async def _spill(self, items: List[Dict[str, Any]]):
+        """Append reports to the spill file"""
+        lines = "".join(json.dumps(item, default=str) + "\n" for item in items)
+
+        async with self._spill_lock:
+            await asyncio.to_thread(self._append_spill_file, lines)
+
+        self.spilled += len(items)
+        logger.warning(f"Spilled {len(items)} reports to {settings.REPORT_SPILL_PATH}")
+
+    async def _replay_loop(self):
+        """Periodically re-send spilled reports"""
+        while True:
+            await asyncio.sleep(settings.REPORT_REPLAY_INTERVAL)
+            try:
+                await self._replay()
+            except Exception as e:
+                logger.warning(f"Spill replay failed: {str(e)}")
+
+    async def _replay(self):
+        """Send spilled reports in batches; whatever still fails stays spilled"""
+        async with self._spill_lock:
+            items = await asyncio.to_thread(self._take_spill_file)
+        if not items:
+            return
+
+        logger.info(f"Replaying {len(items)} spilled reports")
+        size = settings.REPORT_BATCH_SIZE
+        for start in range(0, len(items), size):
+            batch = items[start:start + size]
+            try:
+                await self._write(batch)
+                self.replayed += len(batch)
+            except Exception as e:
+                logger.warning(f"Report service still unavailable, keeping spilled reports: {str(e)}")
+                self.spilled -= len(items) - start
+                await self._spill(items[start:])
+                return
+
+    def _append_spill_file(self, lines: str):
+        with open(settings.REPORT_SPILL_PATH, "a", encoding="utf-8") as f:
+            f.write(lines)
+
+    def _take_spill_file(self) -> List[Dict[str, Any]]:
+        """Read and remove the spill file"""
+        path = settings.REPORT_SPILL_PATH
+        if not os.path.exists(path):
+            return []
+
+        with open(path, encoding="utf-8") as f:
+            lines = f.readlines()
+        os.remove(path)
+
+        items = []
+        for line in lines:
+            try:
+                items.append(json.loads(line))
+            except json.JSONDecodeError:
+                logger.error(f"Dropping corrupt spilled report: {line[:200]}")
+        return items
+
+    def _spill_file_size(self) -> int:
+        try:
+            return os.path.getsize(settings.REPORT_SPILL_PATH)
+        except OSError:
+            return 0
+
+
+# Global report writer (started on application startup)
+report_writer = ReportWriter()
@@ -0,0 +1,150 @@
+"""
+In-process L1 result cache - LRU/TTL cache of finished analyses in front of the URL Cache Service
+"""
+from typing import Dict, Any, Optional
+from collections import OrderedDict
+from datetime import datetime, timezone
+import logging
+import time
+
+from models import AnalysisResponse
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class CacheEntry:
+    __slots__ = ("response", "expires_at", "size")
+
+    def __init__(self, response: AnalysisResponse, expires_at: float, size: int):
+        self.response = response
+        self.expires_at = expires_at  # time.monotonic() deadline
+        self.size = size
+
+
+class ResultCache:
+    """
+    LRU cache of AnalysisResponse objects keyed by normalized URL
+
+    Bounded by entry count and by (approximate, serialized) bytes. An entry
+    never outlives the upstream expires_at, and is additionally capped at
+    RESULT_CACHE_TTL_SECONDS so invalidations made through another gateway
+    worker are picked up within that window.
+    """
+
+    def __init__(self):
+        self._entries: "OrderedDict[str, CacheEntry]" = OrderedDict()
+        self.bytes_used = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key: str) -> Optional[AnalysisResponse]:
+        """Return the cached response for key, or None if absent/expired"""
+        entry = self._entries.get(key)
+
+        if entry is None:
+            self.misses += 1
+            return None
+
+        if entry.expires_at <= time.monotonic():
+            self._remove(key)
+            self.expirations += 1
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry.response
+
+    def peek(self, key: str) -> Optional[AnalysisResponse]:
+        """Return the live entry for key without counting a lookup or refreshing its recency"""
+        entry = self._entries.get(key)
+        if entry is None or entry.expires_at <= time.monotonic():
+            return None
+        return entry.response
+
+    def put(self, key: str, response: AnalysisResponse, expires_at: Optional[datetime] = None):
+        """
+        Cache a finished analysis
+
+        Args:
+            key: Normalized product URL
+            response: Analysis to cache (served back with cached=True)
+            expires_at: Upstream expiry (naive UTC); the entry never outlives it
+        """
+        ttl = settings.RESULT_CACHE_TTL_SECONDS
+        if expires_at is not None:
+            ttl = min(ttl, (expires_at - datetime.utcnow()).total_seconds())
+        if ttl <= 0:
+            return
+
+        response = response.model_copy(update={"cached": True})
+        size = len(response.model_dump_json())
+        if size > settings.RESULT_CACHE_MAX_BYTES:
+            return
+
+        if key in self._entries:
+            self._remove(key)
+
+        self._entries[key] = CacheEntry(response, time.monotonic() + ttl, size)
+        self.bytes_used += size
+
+        # Evict least recently used entries until back within both bounds
+        while (
+            len(self._entries) > settings.RESULT_CACHE_MAX_ENTRIES
+            or self.bytes_used > settings.RESULT_CACHE_MAX_BYTES
+        ):
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+            self.evictions += 1
+
+    def invalidate(self, key: str) -> bool:
+        """Drop the entry for key; returns whether one existed"""
+        if key in self._entries:
+            self._remove(key)
+            return True
+        return False
+
+    def clear(self):
+        self._entries.clear()
+        self.bytes_used = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit ratio and memory use"""
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": settings.RESULT_CACHE_MAX_ENTRIES,
+            "bytes": self.bytes_used,
+            "max_bytes": settings.RESULT_CACHE_MAX_BYTES,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations
+        }
+
+    def _remove(self, key: str):
+        entry = self._entries.pop(key)
+        self.bytes_used -= entry.size
+
+
+def parse_expires_at(value: Optional[str]) -> Optional[datetime]:
+    """Parse an upstream expires_at timestamp (ISO format, naive UTC)"""
+    if not value:
+        return None
+    try:
+        parsed = datetime.fromisoformat(value)
+    except ValueError:
+        logger.warning(f"Ignoring unparseable expires_at: {value}")
+        return None
+
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
+
+# Global L1 result cache
+result_cache = ResultCache()
@@ -1,6 +1,6 @@
 """
 Routes package initialization
 """
-from . import auth, analysis, health
+from . import auth, analysis, jobs, health, metrics
 
-__all__ = ["auth", "analysis", "health"]
\ No newline at end of file
+__all__ = ["auth", "analysis", "jobs", "health", "metrics"]
\ No newline at end of file
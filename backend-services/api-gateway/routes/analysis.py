@@ -1,15 +1,24 @@
 """
 Analysis routes - Product review analysis endpoints
 """
-from fastapi import APIRouter, HTTPException, status, Depends, Request
-from datetime import datetime
+from fastapi import APIRouter, HTTPException, status, Depends, Request, Response
+from fastapi.responses import StreamingResponse
+from typing import Dict, Any, AsyncIterator, Optional
 import logging
-import httpx
 import asyncio
+import json
 
-from models import AnalyzeRequest, AnalysisResponse
-from rate_limiter import check_rate_limit
+from models import AnalyzeRequest, AnalysisResponse, BatchAnalyzeRequest, InvalidateRequest
+from rate_limiter import check_rate_limit, get_client_identifier
+from quotas import quota_manager, QuotaCharge
+from pipeline import analysis_pipeline
+from coalescer import Flight
+from batch import batch_analyzer
 from config import settings
+from backends import service_backend, ServiceCallError
+from result_cache import result_cache
+from cancellation import run_until_disconnect
+from utils.url_utils import normalize_url
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
@@ -19,163 +28,208 @@ router = APIRouter()
 async def analyze_product(
     request: AnalyzeRequest,
     http_request: Request,
+    response: Response,
     _: None = Depends(check_rate_limit)
 ):
     """
     Main analysis endpoint - orchestrates the entire review analysis pipeline
     NOTE: Currently using MOCK scraping for testing. Switch to /scrape for production.
     Authentication disabled for testing, but rate limiting still active.
+    Concurrent requests for the same product share a single pipeline run,
+    which is cancelled when every client waiting for it has disconnected.
+    Each request is charged to the client's quota by what it costs (cache
+    hit, scrape, forced refresh); the X-Quota-* headers show what is left.
     """
     client_ip = http_request.client.host
     logger.info(f"Analysis request from {client_ip} for URL: {request.product_url}")
     
+    charge = await quota_manager.charge(get_client_identifier(http_request), request)
+    if charge and charge.cached_response:
+        response.headers.update(charge.headers())
+        return charge.cached_response
+    
+    result = None
     try:
-        # FIXED: Increased timeout to 120s (LLM scraping can take 60+ seconds)
-        async with httpx.AsyncClient(timeout=120.0) as client:
-            
-            # Step 1: Check cache (URL Cache Service)
-            if not request.force_refresh:
-                try:
-                    cache_response = await client.get(
-                        f"{settings.SERVICES['url_cache']}/check-cache",
-                        params={"url": request.product_url}
-                    )
-                    
-                    if cache_response.status_code == 200:
-                        cached_data = cache_response.json()
-                        if cached_data.get("cached") and cached_data.get("valid"):
-                            logger.info(f"Cache HIT for {request.product_url}")
-                            return AnalysisResponse(
-                                status="success",
-                                cached=True,
-                                **cached_data.get("report", {})
-                            )
-                    
-                    logger.info(f"Cache MISS for {request.product_url}")
-                except Exception as e:
-                    logger.warning(f"Cache check failed: {str(e)}")
-            
-            # Step 2: Scrape reviews (Scraper Service)
-            # USING MOCK ENDPOINT FOR TESTING - Change to /scrape for production
-            logger.info("Initiating MOCK scraping for testing...")
-            scrape_response = await client.post(
-                f"{settings.SERVICES['scraper']}/scrape/mock",  # ← Using mock endpoint
-                json={"url": request.product_url}
-            )
-            
-            if scrape_response.status_code != 200:
-                raise HTTPException(
-                    status_code=status.HTTP_502_BAD_GATEWAY,
-                    detail=f"Failed to scrape product reviews: {scrape_response.text}"
-                )
-            
-            reviews_data = scrape_response.json()
-            logger.info(f"Successfully scraped {len(reviews_data.get('reviews', []))} reviews (MOCK DATA)")
-            
-            # Step 3: Parallel analysis (NLP + Behavior services)
-            logger.info("Running parallel analysis...")
-            
-            nlp_task = client.post(
-                f"{settings.SERVICES['nlp']}/analyze",
-                json={"reviews": reviews_data.get("reviews", [])}
-            )
-            
-            behavior_task = client.post(
-                f"{settings.SERVICES['behavior']}/analyze",
-                json={"reviews": reviews_data.get("reviews", [])}
-            )
-            
-            # Wait for both analyses
-            nlp_response, behavior_response = await asyncio.gather(
-                nlp_task, behavior_task, return_exceptions=True
-            )
-            
-            # Handle potential errors
-            if isinstance(nlp_response, Exception):
-                logger.error(f"NLP service failed: {str(nlp_response)}")
-                raise HTTPException(
-                    status_code=status.HTTP_502_BAD_GATEWAY,
-                    detail=f"NLP analysis failed: {str(nlp_response)}"
-                )
-            
-            if isinstance(behavior_response, Exception):
-                logger.error(f"Behavior service failed: {str(behavior_response)}")
-                raise HTTPException(
-                    status_code=status.HTTP_502_BAD_GATEWAY,
-                    detail=f"Behavior analysis failed: {str(behavior_response)}"
-                )
-            
-            nlp_data = nlp_response.json() if nlp_response.status_code == 200 else {}
-            behavior_data = behavior_response.json() if behavior_response.status_code == 200 else {}
-            
-            logger.info(f"NLP Data: {nlp_data}")
-            logger.info(f"Behavior Data: {behavior_data}")
-            
-            # Step 4: Generate final score (Scoring Service)
-            logger.info("Generating trust score...")
-            
-            scoring_payload = {
-                "nlp_results": nlp_data,  # Send the entire NLP response
-    			"behavior_results": behavior_data,  # Send the entire Behavior response
-    			"product_metadata": {
-        			"product_name": reviews_data.get("product_metadata", {}).get("product_name", "Unknown Product"),
-        			"platform": reviews_data.get("product_metadata", {}).get("platform", "unknown"),
-        			"total_ratings": reviews_data.get("product_metadata", {}).get("total_ratings"),
-        			"average_rating": reviews_data.get("product_metadata", {}).get("average_rating"),
-        			"rating_distribution": behavior_data.get("rating_distribution", {})
-    			}
-            }
-            
-            logger.info(f"Scoring payload keys: {scoring_payload.keys()}")
-            
-            scoring_response = await client.post(
-                f"{settings.SERVICES['scoring']}/calculate-score",
-                json=scoring_payload
-            )
-            
-            if scoring_response.status_code != 200:
-                logger.error(f"Scoring error: {scoring_response.text}")
-                raise HTTPException(
-                    status_code=status.HTTP_502_BAD_GATEWAY,
-                    detail=f"Scoring service failed: {scoring_response.text}"
-                )
-            
-            final_score = scoring_response.json()
-            
-            # Step 5: Store report (Report Service)
-            logger.info("Storing report...")
-            await client.post(
-                f"{settings.SERVICES['report']}/reports/store",
-                json={
-                    "url": request.product_url,
-                    "report": final_score,
-                    "ttl_days": 7
-                }
-            )
-            
-            timestamp = final_score.pop('timestamp', None) or datetime.utcnow().isoformat()
-            
-            # Return final response
-            return AnalysisResponse(
-                status="success",
-    			cached=False,
-    			timestamp=final_score.get('timestamp', datetime.utcnow().isoformat()),
-    			success=final_score.get('success', True),
-    			trust_score=final_score['trust_score'],
-    			fake_reviews_percentage=final_score['fake_reviews_percentage'],
-    			risk_level=final_score['risk_level'],
-    			score_breakdown=final_score['score_breakdown'],
-    			key_insights=final_score['key_insights'],
-    			total_reviews_analyzed=final_score['total_reviews_analyzed'],
-    			recommendation=final_score['recommendation'],
-    			confidence=final_score['confidence']
-            )
+        result = await run_until_disconnect(http_request, analysis_pipeline.run(request))
+        return result
     
-    except HTTPException:
-        raise
+    except HTTPException as e:
+        raise await _with_quota_headers(e, charge, request)
     except Exception as e:
         logger.exception(f"Analysis failed: {str(e)}")
-        raise HTTPException(
+        raise await _with_quota_headers(HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Analysis failed: {str(e)}"
-        )
\ No newline at end of file
+        ), charge, request)
+    finally:
+        if charge:
+            await quota_manager.settle_request(charge, request, result)
+            response.headers.update(charge.headers())
+
+
+@router.post("/analyze/stream")
+async def analyze_product_stream(
+    request: AnalyzeRequest,
+    http_request: Request,
+    _: None = Depends(check_rate_limit)
+):
+    """
+    Streaming variant of /analyze - emits one event per finished stage
+
+    Events, in order: cache, scrape, nlp / behavior (whichever finishes
+    first), then a final "result" event shaped like AnalysisResponse (or an
+    "error" event). Sent as Server-Sent Events when the client accepts
+    text/event-stream, otherwise as newline-delimited JSON.
+    """
+    client_ip = http_request.client.host
+    logger.info(f"Streaming analysis request from {client_ip} for URL: {request.product_url}")
+    
+    use_sse = "text/event-stream" in http_request.headers.get("accept", "")
+    charge = await quota_manager.charge(get_client_identifier(http_request), request)
+    headers = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no", **(charge.headers() if charge else {})}
+    
+    if charge and charge.cached_response:
+        events = _cached_events(charge.cached_response, use_sse)
+    else:
+        events = _stream_events(analysis_pipeline.stream(request), use_sse, request, charge)
+    
+    return StreamingResponse(
+        events,
+        media_type="text/event-stream" if use_sse else "application/x-ndjson",
+        headers=headers
+    )
+
+
+
+@router.post("/analyze/batch")
+async def analyze_batch(
+    request: BatchAnalyzeRequest,
+    http_request: Request,
+    _: None = Depends(check_rate_limit)
+):
+    """
+    Analyze many product URLs in one call, streaming results as NDJSON
+
+    URLs are de-duplicated by normalized form, cache hits are resolved up
+    front, and misses run through the pipeline with bounded concurrency.
+    Emits one "result" line per unique URL in completion order, then a
+    "summary" line with counts and throughput (URLs/second).
+    """
+    if len(request.product_urls) > settings.BATCH_MAX_URLS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Batch too large. Max {settings.BATCH_MAX_URLS} URLs per request"
+        )
+    
+    client_ip = http_request.client.host
+    logger.info(f"Batch analysis request from {client_ip} for {len(request.product_urls)} URLs")
+    
+    # Every unique URL is charged as a likely miss, then settled by what it cost
+    charge = await quota_manager.charge_batch(
+        get_client_identifier(http_request), request.product_urls, request.force_refresh
+    )
+    
+    async def batch_events() -> AsyncIterator[str]:
+        actual_cost = 0.0
+        try:
+            async for event, data in batch_analyzer.run(request.product_urls, request.force_refresh):
+                if event == "result":
+                    cached = data["result"]["cached"] if data["status"] == "success" else None
+                    actual_cost += quota_manager.finished(request.force_refresh, cached)
+                yield _format_event(event, data, use_sse=False)
+        finally:
+            if charge:
+                await quota_manager.settle(charge, actual_cost)
+    
+    return StreamingResponse(
+        batch_events(),
+        media_type="application/x-ndjson",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no", **(charge.headers() if charge else {})}
+    )
+
+
+@router.post("/invalidate")
+async def invalidate_analysis(
+    request: InvalidateRequest,
+    _: None = Depends(check_rate_limit)
+):
+    """
+    Drop the cached analysis for a product from this gateway's L1 cache and
+    the URL Cache Service, so the next /analyze runs the full pipeline
+    """
+    l1_invalidated = result_cache.invalidate(normalize_url(request.product_url))
+    
+    try:
+        url_cache_result = await service_backend.invalidate_cache(request.product_url)
+    except ServiceCallError as e:
+        raise HTTPException(
+            status_code=status.HTTP_502_BAD_GATEWAY,
+            detail=f"Cache invalidation failed: {e.detail}"
+        )
+    except Exception as e:
+        logger.error(f"Cache invalidation failed: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_502_BAD_GATEWAY,
+            detail=f"URL cache service unavailable: {str(e)}"
+        )
+    
+    return {
+        "success": True,
+        "l1_invalidated": l1_invalidated,
+        "url_cache": url_cache_result
+    }
+
+async def _with_quota_headers(
+    error: HTTPException,
+    charge: Optional[QuotaCharge],
+    request: AnalyzeRequest
+) -> HTTPException:
+    """Settle a failed analysis's charge and show what is left of the budget on its error response"""
+    if charge:
+        await quota_manager.settle_request(charge, request, None)
+        error.headers = {**(error.headers or {}), **charge.headers()}
+    return error
+
+
+async def _stream_events(
+    flight: Flight,
+    use_sse: bool,
+    request: AnalyzeRequest,
+    charge: Optional[QuotaCharge]
+) -> AsyncIterator[str]:
+    """Relay stage events from the pipeline run, then its final result"""
+    result = None
+    try:
+        async for stage, data in flight.events():
+            yield _format_event(stage, data, use_sse)
+        
+        # Shield so this client disconnecting does not cancel the run for the others
+        result = await asyncio.shield(flight.task)
+        yield _format_event("result", result.model_dump(), use_sse)
+    except HTTPException as e:
+        yield _format_event("error", {"status_code": e.status_code, "detail": e.detail}, use_sse)
+    except Exception as e:
+        logger.exception(f"Analysis failed: {str(e)}")
+        yield _format_event(
+            "error",
+            {"status_code": status.HTTP_500_INTERNAL_SERVER_ERROR, "detail": f"Analysis failed: {str(e)}"},
+            use_sse
+        )
+    finally:
+        # A client that stops listening early no longer keeps the run alive
+        flight.detach()
+        if charge:
+            await quota_manager.settle_request(charge, request, result)
+
+
+async def _cached_events(result: AnalysisResponse, use_sse: bool) -> AsyncIterator[str]:
+    """Events for a report answered from the cache without a pipeline run"""
+    yield _format_event("cache", {"checked": True, "hit": True}, use_sse)
+    yield _format_event("result", result.model_dump(), use_sse)
+
+
+def _format_event(event: str, data: Dict[str, Any], use_sse: bool) -> str:
+    """Serialize one event as an SSE frame or an NDJSON line"""
+    if use_sse:
+        return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+    return json.dumps({"event": event, "data": data}, default=str) + "\n"
\ No newline at end of file
@@ -3,34 +3,34 @@ Health check routes - Monitor service health
 """
 from fastapi import APIRouter
 from datetime import datetime
-import httpx
 
 from config import settings
+from health_monitor import health_monitor
 
 router = APIRouter()
 
 
 @router.get("/health")
-async def health_check():
-    """Check health of all services"""
-    service_health = {}
+async def health_check(refresh: bool = False):
+    """
+    Check health of all services
     
-    async with httpx.AsyncClient(timeout=5.0) as client:
-        for service_name, service_url in settings.SERVICES.items():
-            try:
-                response = await client.get(f"{service_url}/health")
-                service_health[service_name] = {
-                    "status": "healthy" if response.status_code == 200 else "unhealthy",
-                    "response_time": response.elapsed.total_seconds()
-                }
-            except Exception as e:
-                service_health[service_name] = {
-                    "status": "unreachable",
-                    "error": str(e)
-                }
+    Returns the snapshot kept fresh by the background poller, so the call
+    never waits on a slow or dead service. Pass refresh=true to probe all
+    services (concurrently) before answering. Services whose circuit
+    breaker is open are reported as degraded.
+    """
+    if refresh:
+        await health_monitor.probe_all()
+    
+    services = health_monitor.snapshot()
     
     return {
         "gateway": "healthy",
-        "services": service_health,
+        "services": services,
+        "degraded_services": [
+            name for name, entry in services.items() if entry["status"] == "degraded"
+        ],
+        "poll_interval_seconds": settings.HEALTH_POLL_INTERVAL,
         "timestamp": datetime.utcnow().isoformat()
-    }
\ No newline at end of file
+    }
@@ -0,0 +1,66 @@
+"""
+Analysis job routes - Submit long-running analyses and poll for results
+"""
+from fastapi import APIRouter, HTTPException, status, Depends, Request, Response
+import logging
+
+from models import AnalysisJobRequest, AnalysisJobResponse
+from rate_limiter import check_rate_limit, get_client_identifier
+from quotas import quota_manager
+from jobs import job_queue, JobQueueFull
+
+logger = logging.getLogger(__name__)
+router = APIRouter()
+
+
+@router.post(
+    "/analyze/jobs",
+    response_model=AnalysisJobResponse,
+    status_code=status.HTTP_202_ACCEPTED
+)
+async def submit_analysis_job(
+    request: AnalysisJobRequest,
+    http_request: Request,
+    response: Response,
+    _: None = Depends(check_rate_limit)
+):
+    """
+    Queue a product analysis and return its job ID immediately
+
+    Jobs run on a bounded pool of pipeline workers, highest priority first
+    and in submission order within a priority. Poll GET /analyze/jobs/{job_id}
+    for status and results. The job's likely cost is charged to the
+    client's quota on submission and settled when the job finishes.
+    """
+    charge = await quota_manager.charge(
+        get_client_identifier(http_request), request, allow_cache_only=False
+    )
+
+    try:
+        job = job_queue.submit(request, charge)
+    except JobQueueFull as e:
+        if charge:
+            await quota_manager.settle_request(charge, request, None)
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=str(e),
+            headers={"Retry-After": "30"}
+        )
+
+    if charge:
+        response.headers.update(charge.headers())
+    return job.to_response()
+
+
+@router.get("/analyze/jobs/{job_id}", response_model=AnalysisJobResponse)
+async def get_analysis_job(job_id: str):
+    """Get job status, plus the analysis result once completed"""
+    job = job_queue.get(job_id)
+
+    if not job:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Job not found or expired"
+        )
+
+    return job.to_response()
@@ -0,0 +1,48 @@
+"""
+Metrics routes - Gateway runtime statistics
+"""
+from fastapi import APIRouter
+from datetime import datetime
+
+from config import settings
+from http_clients import service_clients
+from pipeline import analysis_pipeline
+from jobs import job_queue
+from batch import batch_analyzer
+from rate_limiter import rate_limiter
+from quotas import quota_manager
+from result_cache import result_cache
+from report_writer import report_writer
+from metrics import latency_metrics
+from circuit_breaker import circuit_breakers
+from admission import admission_controller
+from prewarm import prewarm_scheduler
+from cancellation import cancellation_metrics
+
+router = APIRouter()
+
+
+@router.get("/metrics")
+async def gateway_metrics():
+    """Runtime statistics for gateway components"""
+    return {
+        "deployment_mode": settings.DEPLOYMENT_MODE,
+        "latency": latency_metrics.stats(),
+        "http_pools": service_clients.stats(),
+        "circuit_breakers": circuit_breakers.stats(),
+        "admission": admission_controller.stats(),
+        "coalescing": analysis_pipeline.coalescer.stats(),
+        "stale_while_revalidate": analysis_pipeline.stats(),
+        "url_cache_writes": analysis_pipeline.cache_write_stats(),
+        "quick_mode": analysis_pipeline.quick_stats(),
+        "streaming_analysis": analysis_pipeline.streaming_stats(),
+        "prewarm": prewarm_scheduler.stats(),
+        "cancellation": cancellation_metrics.stats(),
+        "result_cache": result_cache.stats(),
+        "jobs": job_queue.stats(),
+        "batch": batch_analyzer.stats(),
+        "report_writer": report_writer.stats(),
+        "rate_limit": rate_limiter.stats(),
+        "quotas": quota_manager.stats(),
+        "timestamp": datetime.utcnow().isoformat()
+    }
\ No newline at end of file
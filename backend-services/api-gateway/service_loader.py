@@ -0,0 +1,64 @@
+"""
+In-process service loader - imports a sibling service without clashing with the gateway's modules
+
+Every service uses the same flat top-level module names (app, config,
+models, pipeline, routes, utils, ...). A service is imported with its own
+directory first on sys.path and with every clashing entry temporarily
+removed from sys.modules; afterwards the gateway's modules are put back.
+The service's modules keep working because they hold direct references to
+each other from import time.
+"""
+from types import ModuleType
+from typing import Dict, Set
+import importlib
+import logging
+import os
+import sys
+
+logger = logging.getLogger(__name__)
+
+
+def local_module_names(service_dir: str) -> Set[str]:
+    """Top-level module and package names defined by a service directory"""
+    names = set()
+    for entry in os.listdir(service_dir):
+        if entry.startswith(("_", ".")):
+            continue
+        path = os.path.join(service_dir, entry)
+        if entry.endswith(".py"):
+            names.add(entry[:-3])
+        elif os.path.isdir(path):
+            names.add(entry)
+    return names
+
+
+def load_service(service_dir: str, entry_module: str = "app") -> Dict[str, ModuleType]:
+    """
+    Import a service's entry module in isolation
+
+    Args:
+        service_dir: Directory of the service (e.g. backend-services/nlp-service)
+        entry_module: Module to import; its imports pull in the rest
+
+    Returns:
+        The service's own modules keyed by module name ("app", "routes.cache", ...)
+    """
+    service_dir = os.path.abspath(service_dir)
+    names = local_module_names(service_dir)
+
+    def is_local(module_name: str) -> bool:
+        return module_name.split(".")[0] in names
+
+    saved = {name: sys.modules.pop(name) for name in list(sys.modules) if is_local(name)}
+    sys.path.insert(0, service_dir)
+    importlib.invalidate_caches()
+
+    try:
+        importlib.import_module(entry_module)
+        return {name: module for name, module in sys.modules.items() if is_local(name)}
+    finally:
+        for name in [name for name in sys.modules if is_local(name)]:
+            del sys.modules[name]
+        sys.modules.update(saved)
+        sys.path.remove(service_dir)
+        logger.info(f"Loaded service in-process: {os.path.basename(service_dir)}")
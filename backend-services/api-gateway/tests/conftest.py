@@ -0,0 +1,43 @@
+"""
+Test setup - the gateway's modules are imported by their top-level names, as in the service
+"""
+import os
+import sys
+
+import pytest
+
+GATEWAY_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# backend-services/, for the modules shared with the services (common.<module>)
+sys.path[0:0] = [GATEWAY_DIR, os.path.dirname(GATEWAY_DIR)]
+
+# Required settings (config.py has no defaults for these); downstream services are never called
+for name, value in {
+    "ENVIRONMENT": "test",
+    "CORS_ORIGINS": "*",
+    "RATE_LIMIT_REQUESTS": "10",
+    "RATE_LIMIT_WINDOW": "60",
+    "URL_CACHE_SERVICE": "http://url-cache.test",
+    "SCRAPER_SERVICE": "http://scraper.test",
+    "NLP_SERVICE": "http://nlp.test",
+    "BEHAVIOR_SERVICE": "http://behavior.test",
+    "SCORING_SERVICE": "http://scoring.test",
+    "REPORT_SERVICE": "http://report.test",
+}.items():
+    os.environ.setdefault(name, value)
+
+
+@pytest.fixture
+def fake_backend(monkeypatch):
+    """Route the pipeline's downstream calls to an in-memory fake, with empty gateway caches"""
+    from fake_backend import FakeServiceBackend
+    import pipeline
+    from result_cache import result_cache
+    from report_writer import report_writer
+
+    backend = FakeServiceBackend()
+    monkeypatch.setattr(pipeline, "service_backend", backend)
+    monkeypatch.setattr(pipeline.settings, "STREAMING_ANALYSIS", False)
+    monkeypatch.setattr(report_writer, "enqueue", lambda *args, **kwargs: None)
+    result_cache.clear()
+    yield backend
+    result_cache.clear()
@@ -0,0 +1,138 @@
+"""
+In-memory stand-in for the downstream services, shared by the pipeline tests
+
+The URL cache behaves like the URL Cache Service (valid until expires_at,
+then stale for the grace window); a store replaces the entry. Analysis
+sessions are kept like the services keep them, in this instance only.
+Stored report batches are kept (or refused while report_service_down).
+Every call is counted by method name.
+"""
+from typing import Dict, Any, List
+from collections import Counter
+from datetime import datetime, timedelta
+
+from backends import ServiceBackend, ServiceCallError
+from utils.url_utils import normalize_url
+
+STALE_GRACE = timedelta(hours=24)
+
+REVIEWS = [
+    {"review_id": str(i), "text": f"Review {i}", "rating": 5 - i % 3, "verified_purchase": True}
+    for i in range(6)
+]
+
+REPORT = {
+    "success": True,
+    "trust_score": 82,
+    "fake_reviews_percentage": 4.0,
+    "risk_level": "low",
+    "score_breakdown": {"nlp_score": 80.0},
+    "key_insights": [{"type": "positive", "message": "Mostly verified purchases"}],
+    "total_reviews_analyzed": len(REVIEWS),
+    "recommendation": "Reviews look trustworthy",
+    "confidence": 0.9,
+    "timestamp": "2026-01-01T00:00:00"
+}
+
+
+class FakeServiceBackend(ServiceBackend):
+    mode = "fake"
+
+    def __init__(self):
+        self.url_cache: Dict[str, Dict[str, Any]] = {}
+        self.prewarm: List[Dict[str, Any]] = []  # Returned by prewarm_candidates()
+        self.sessions: Dict[str, List[Dict[str, Any]]] = {}
+        self.accesses = Counter()
+        self.calls = Counter()
+        self.analyzed: Dict[str, int] = {}  # Service (or "<service>_quick") -> reviews in its last analysis
+        self.report_batches: List[List[Dict[str, Any]]] = []  # Accepted store_reports() batches
+        self.report_service_down = False
+
+    def put_cached(self, product_url: str, report: Dict[str, Any], expires_at: datetime):
+        self.url_cache[normalize_url(product_url)] = {"report": report, "expires_at": expires_at}
+
+    async def check_cache(self, product_url: str) -> Dict[str, Any]:
+        self.calls["check_cache"] += 1
+        entry = self.url_cache.get(normalize_url(product_url))
+        if entry is None:
+            return {"cached": False, "valid": False}
+
+        now = datetime.utcnow()
+        valid = entry["expires_at"] > now
+        stale = not valid and entry["expires_at"] + STALE_GRACE > now
+        return {
+            "cached": True,
+            "valid": valid,
+            "stale": stale,
+            "report": entry["report"] if valid or stale else None,
+            "expires_at": entry["expires_at"].isoformat()
+        }
+
+    async def check_cache_batch(self, product_urls: List[str]) -> List[Dict[str, Any]]:
+        self.calls["check_cache_batch"] += 1
+        return [await self.check_cache(product_url) for product_url in product_urls]
+
+    async def store_cache(self, product_url: str, report: Dict[str, Any], ttl_days: int):
+        self.calls["store_cache"] += 1
+        self.put_cached(product_url, report, datetime.utcnow() + timedelta(days=ttl_days))
+
+    async def invalidate_cache(self, product_url: str) -> Dict[str, Any]:
+        return {"deleted": self.url_cache.pop(normalize_url(product_url), None) is not None}
+
+    async def scrape(self, product_url: str) -> Dict[str, Any]:
+        self.calls["scrape"] += 1
+        return {"reviews": REVIEWS, "platform": "test", "product_metadata": {"product_name": "Test product"}}
+
+    async def scrape_stream(self, product_url: str, chunk_size: int):
+        self.calls["scrape"] += 1
+        yield {"type": "metadata", "platform": "test", "product_metadata": {"product_name": "Test product"}}
+        for start in range(0, len(REVIEWS), chunk_size):
+            yield {"type": "reviews", "reviews": REVIEWS[start:start + chunk_size]}
+        yield {"type": "done", "total_reviews_scraped": len(REVIEWS)}
+
+    async def analyze(self, service_name: str, reviews: List[Dict[str, Any]], quick: bool = False) -> Dict[str, Any]:
+        self.calls[f"analyze_{service_name}"] += 1
+        self.analyzed[f"{service_name}_quick" if quick else service_name] = len(reviews)
+        return {"total_reviews": len(reviews), "aggregate_metrics": {}}
+
+    async def open_session(self, service_name: str) -> str:
+        self.calls[f"session_{service_name}"] += 1
+        session_id = f"{service_name}-{len(self.sessions)}"
+        self.sessions[session_id] = []
+        return session_id
+
+    async def add_chunk(self, service_name: str, session_id: str, reviews: List[Dict[str, Any]]):
+        self._session(service_name, session_id).extend(reviews)
+
+    async def finish_session(self, service_name: str, session_id: str) -> Dict[str, Any]:
+        reviews = self._session(service_name, session_id)
+        del self.sessions[session_id]
+        self.analyzed[service_name] = len(reviews)
+        return {"total_reviews": len(reviews), "aggregate_metrics": {}}
+
+    async def discard_session(self, service_name: str, session_id: str):
+        self.sessions.pop(session_id, None)
+
+    async def score(self, payload: Dict[str, Any], quick: bool = False) -> Dict[str, Any]:
+        self.calls["score"] += 1
+        return dict(REPORT, analysis_depth="quick" if quick else "full")
+
+    async def store_reports(self, reports: List[Dict[str, Any]]):
+        self.calls["store_reports"] += 1
+        if self.report_service_down:
+            raise ServiceCallError("report", 503, "Report service unavailable")
+        self.report_batches.append(reports)
+
+    async def record_accesses(self, accesses: Dict[str, int]):
+        self.accesses.update(accesses)
+
+    async def prewarm_candidates(self, expiring_within_hours: float, limit: int, min_access_count: int) -> List[Dict[str, Any]]:
+        return self.prewarm[:limit]
+
+    async def probe(self, service_name: str, timeout: float):
+        pass
+
+    def _session(self, service_name: str, session_id: str) -> List[Dict[str, Any]]:
+        if session_id not in self.sessions:
+            raise ServiceCallError(service_name, 404, f"Session {session_id} not found or expired")
+        return self.sessions[session_id]
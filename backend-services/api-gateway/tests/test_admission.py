@@ -0,0 +1,133 @@
+"""
+Admission control: concurrency limit, bounded FIFO queue, per-request deadline, cache hits bypass it
+"""
+import asyncio
+import time
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi import HTTPException
+
+import admission as admission_module
+import pipeline as pipeline_module
+from admission import AdmissionController, AdmissionRejected
+from fake_backend import REPORT
+from models import AnalyzeRequest
+from pipeline import AnalysisPipeline
+
+
+@pytest.fixture
+def controller(monkeypatch):
+    """A fresh controller with 2 slots and room for 1 queued run, used by the pipeline"""
+    monkeypatch.setattr(admission_module.settings, "ADMISSION_MAX_IN_FLIGHT", 2)
+    monkeypatch.setattr(admission_module.settings, "ADMISSION_MAX_QUEUED", 1)
+    controller = AdmissionController()
+    monkeypatch.setattr(pipeline_module, "admission_controller", controller)
+    return controller
+
+
+async def _hold(controller: AdmissionController, release: asyncio.Event, admitted: list, name: str, deadline: float = None):
+    async with controller.slot(deadline or time.monotonic() + 10):
+        admitted.append(name)
+        await release.wait()
+
+
+def test_runs_beyond_the_limit_queue_in_order_and_a_full_queue_is_rejected(controller):
+    async def scenario():
+        release = asyncio.Event()
+        admitted = []
+        holders = [asyncio.create_task(_hold(controller, release, admitted, name)) for name in ("a", "b", "c")]
+        await asyncio.sleep(0)
+        stats_while_full = controller.stats()
+
+        with pytest.raises(AdmissionRejected) as rejected:
+            await _hold(controller, release, admitted, "d")
+
+        release.set()
+        await asyncio.gather(*holders)
+        return stats_while_full, rejected.value, admitted
+
+    stats, rejected, admitted = asyncio.run(scenario())
+
+    assert stats["in_flight"] == 2 and stats["queued"] == 1
+    assert rejected.reason == "queue full" and rejected.retry_after >= 1
+    assert admitted == ["a", "b", "c"]
+    assert controller.stats()["in_flight"] == 0
+    assert controller.admitted == 3 and controller.rejected_queue_full == 1
+
+
+def test_queued_run_is_rejected_once_its_deadline_passes(controller):
+    async def scenario():
+        release = asyncio.Event()
+        admitted = []
+        holders = [asyncio.create_task(_hold(controller, release, admitted, name)) for name in ("a", "b")]
+        await asyncio.sleep(0)
+
+        with pytest.raises(AdmissionRejected) as rejected:
+            await _hold(controller, release, admitted, "late", deadline=time.monotonic() + 0.05)
+
+        release.set()
+        await asyncio.gather(*holders)
+        return rejected.value
+
+    rejected = asyncio.run(scenario())
+
+    assert rejected.reason == "deadline exceeded while queued"
+    assert controller.rejected_deadline == 1
+    assert controller.stats()["queued"] == 0 and controller.stats()["in_flight"] == 0
+
+
+def _slow_scrape(fake_backend, monkeypatch, release: asyncio.Event):
+    scrape = fake_backend.scrape
+
+    async def slow_scrape(product_url):
+        await release.wait()
+        return await scrape(product_url)
+
+    monkeypatch.setattr(fake_backend, "scrape", slow_scrape)
+
+
+def test_shed_analysis_is_a_503_with_retry_after_but_cache_hits_are_served(fake_backend, controller, monkeypatch):
+    cached_url = "https://www.amazon.in/dp/B0CACHED01"
+    fake_backend.put_cached(cached_url, REPORT, datetime.utcnow() + timedelta(days=1))
+
+    async def scenario():
+        release = asyncio.Event()
+        _slow_scrape(fake_backend, monkeypatch, release)
+        pipeline = AnalysisPipeline()
+        runs = [
+            asyncio.create_task(pipeline.run(AnalyzeRequest(product_url=f"https://www.amazon.in/dp/B0BUSY000{i}")))
+            for i in range(3)
+        ]
+        await asyncio.sleep(0.01)
+
+        with pytest.raises(HTTPException) as shed:
+            await pipeline.run(AnalyzeRequest(product_url="https://www.amazon.in/dp/B0SHED0001"))
+        hit = await pipeline.run(AnalyzeRequest(product_url=cached_url))
+
+        release.set()
+        finished = await asyncio.gather(*runs)
+        return shed.value, hit, finished
+
+    shed, hit, finished = asyncio.run(scenario())
+
+    assert shed.status_code == 503
+    assert int(shed.headers["Retry-After"]) >= 1
+    assert hit.cached and hit.trust_score == REPORT["trust_score"]
+    assert all(not response.cached for response in finished)
+    assert controller.rejected_queue_full == 1 and controller.admitted == 3
+
+
+def test_run_past_its_deadline_is_a_504(fake_backend, controller, monkeypatch):
+    monkeypatch.setattr(pipeline_module.settings, "ADMISSION_DEADLINE_SECONDS", 0.05)
+
+    async def scenario():
+        _slow_scrape(fake_backend, monkeypatch, asyncio.Event())  # Never released
+        with pytest.raises(HTTPException) as timed_out:
+            await AnalysisPipeline().run(AnalyzeRequest(product_url="https://www.amazon.in/dp/B0SLOW0001"))
+        return timed_out.value
+
+    timed_out = asyncio.run(scenario())
+
+    assert timed_out.status_code == 504
+    assert controller.stats()["in_flight"] == 0
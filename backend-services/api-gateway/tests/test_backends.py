@@ -0,0 +1,20 @@
+"""
+Service backends: the interface is enforced when a backend is created
+"""
+import pytest
+
+from backends import ServiceBackend, HttpServiceBackend, InProcessServiceBackend
+
+
+def test_backend_missing_a_method_fails_on_creation():
+    class IncompleteBackend(ServiceBackend):
+        async def check_cache(self, product_url):
+            return {}
+
+    with pytest.raises(TypeError, match="abstract"):
+        IncompleteBackend()
+
+
+def test_shipped_backends_implement_every_method():
+    assert not HttpServiceBackend.__abstractmethods__
+    assert not InProcessServiceBackend.__abstractmethods__
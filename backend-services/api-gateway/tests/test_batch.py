@@ -0,0 +1,107 @@
+"""
+Batch analysis: de-duplication by normalized URL, invalid URLs, cache hits up front, the concurrency bound, summary counts
+"""
+import asyncio
+from datetime import datetime, timedelta
+
+import batch as batch_module
+from backends import ServiceCallError
+from batch import BatchAnalyzer
+from fake_backend import REPORT
+
+
+def _run(product_urls, force_refresh=False):
+    async def collect():
+        return [event async for event in BatchAnalyzer().run(product_urls, force_refresh)]
+
+    events = asyncio.run(collect())
+    assert events[-1][0] == "summary"
+    return [data for _, data in events[:-1]], events[-1][1]
+
+
+def test_duplicates_invalid_urls_and_cache_hits_are_counted_once(fake_backend):
+    cached_url = "https://www.amazon.in/dp/B0CACHED01"
+    fake_backend.put_cached(cached_url, REPORT, datetime.utcnow() + timedelta(days=1))
+    urls = [
+        "https://www.amazon.in/dp/B0MISS0001?utm_source=mail",
+        cached_url,
+        "not a url",
+        "https://www.amazon.in/dp/B0MISS0001",
+        f"{cached_url}?ref=abc",
+        "ftp://www.amazon.in/dp/B0MISS0002",
+        "https://www.amazon.in/dp/B0MISS0002",
+    ]
+
+    results, summary = _run(urls)
+
+    by_url = {result["product_url"]: result for result in results}
+    # The first spelling of a product is the one analyzed; every spelling is reported against it
+    assert by_url["https://www.amazon.in/dp/B0MISS0001?utm_source=mail"]["input_urls"] == [
+        "https://www.amazon.in/dp/B0MISS0001?utm_source=mail", "https://www.amazon.in/dp/B0MISS0001"
+    ]
+    assert by_url[cached_url]["input_urls"] == [cached_url, f"{cached_url}?ref=abc"]
+    assert by_url[cached_url]["result"]["cached"] is True
+    assert by_url["https://www.amazon.in/dp/B0MISS0002"]["result"]["cached"] is False
+    invalid = [result for result in results if result["status"] == "error"]
+    assert [result["product_url"] for result in invalid] == ["not a url", "ftp://www.amazon.in/dp/B0MISS0002"]
+    assert all(result["error"].startswith("Invalid product URL") for result in invalid)
+
+    assert {key: summary[key] for key in (
+        "total_urls", "unique_urls", "duplicates", "invalid", "cache_hits", "analyzed", "failed"
+    )} == {
+        "total_urls": 7, "unique_urls": 3, "duplicates": 2, "invalid": 2,
+        "cache_hits": 1, "analyzed": 2, "failed": 0
+    }
+    # Each unique miss is scraped once, after a single batch lookup of the unique valid URLs
+    assert fake_backend.calls["scrape"] == 2
+    assert fake_backend.calls["check_cache_batch"] == 1 and fake_backend.calls["check_cache"] == 3
+
+
+def test_force_refresh_analyzes_cached_urls(fake_backend):
+    cached_url = "https://www.amazon.in/dp/B0CACHED01"
+    fake_backend.put_cached(cached_url, REPORT, datetime.utcnow() + timedelta(days=1))
+
+    results, summary = _run([cached_url], force_refresh=True)
+
+    assert results[0]["status"] == "success" and results[0]["result"]["cached"] is False
+    assert summary["cache_hits"] == 0 and summary["analyzed"] == 1
+    assert fake_backend.calls["scrape"] == 1
+
+
+def test_failed_analyses_are_reported_and_counted(fake_backend, monkeypatch):
+    scrape = fake_backend.scrape
+
+    async def failing_scrape(product_url):
+        if "B0BROKEN01" in product_url:
+            raise ServiceCallError("scraper", 502, "Scraper service error")
+        return await scrape(product_url)
+
+    monkeypatch.setattr(fake_backend, "scrape", failing_scrape)
+
+    results, summary = _run(["https://www.amazon.in/dp/B0BROKEN01", "https://www.amazon.in/dp/B0WORKS001"])
+
+    statuses = {result["product_url"].rsplit("/", 1)[1]: result["status"] for result in results}
+    assert statuses == {"B0BROKEN01": "error", "B0WORKS001": "success"}
+    assert summary["failed"] == 1 and summary["analyzed"] == 1
+
+
+def test_pipeline_runs_are_bounded_by_the_batch_concurrency(fake_backend, monkeypatch):
+    monkeypatch.setattr(batch_module.settings, "BATCH_CONCURRENCY", 3)
+    scrape = fake_backend.scrape
+    in_flight = []
+    peak = []
+
+    async def slow_scrape(product_url):
+        in_flight.append(product_url)
+        peak.append(len(in_flight))
+        await asyncio.sleep(0.01)
+        in_flight.remove(product_url)
+        return await scrape(product_url)
+
+    monkeypatch.setattr(fake_backend, "scrape", slow_scrape)
+
+    results, summary = _run([f"https://www.amazon.in/dp/B0BOUND00{i}" for i in range(10)])
+
+    assert max(peak) == 3
+    assert len(results) == 10 and summary["analyzed"] == 10
+    assert summary["urls_per_second"] > 0
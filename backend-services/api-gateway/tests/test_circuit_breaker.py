@@ -0,0 +1,42 @@
+"""
+Circuit breaker states and per-endpoint adaptive timeouts
+"""
+import pytest
+
+from circuit_breaker import CircuitBreaker, CircuitOpenError, OPEN, CLOSED
+from config import settings
+
+
+def test_fast_endpoint_does_not_shrink_the_timeout_of_a_slow_one():
+    breaker = CircuitBreaker("nlp", max_timeout=120.0)
+    for _ in range(settings.ADAPTIVE_TIMEOUT_MIN_SAMPLES * 5):
+        breaker.record_success("POST /analyze/quick", 0.05)
+    for _ in range(settings.ADAPTIVE_TIMEOUT_MIN_SAMPLES):
+        breaker.record_success("POST /analyze", 8.0)
+
+    assert breaker.timeout("POST /analyze/quick") == settings.ADAPTIVE_TIMEOUT_MIN
+    assert breaker.timeout("POST /analyze") == pytest.approx(8.0 * settings.ADAPTIVE_TIMEOUT_MULTIPLIER)
+
+
+def test_endpoint_without_enough_samples_uses_the_pool_timeout():
+    breaker = CircuitBreaker("nlp", max_timeout=120.0)
+    for _ in range(settings.ADAPTIVE_TIMEOUT_MIN_SAMPLES * 5):
+        breaker.record_success("POST /analyze/quick", 0.05)
+
+    assert breaker.timeout("POST /sessions/{session_id}/finish") == 120.0
+
+
+def test_consecutive_failures_open_the_circuit_and_a_trial_success_closes_it(monkeypatch):
+    monkeypatch.setattr(settings, "BREAKER_RESET_TIMEOUT", 0.0)
+    breaker = CircuitBreaker("scoring", max_timeout=120.0)
+    for _ in range(settings.BREAKER_FAILURE_THRESHOLD):
+        breaker.before_call()
+        breaker.record_failure()
+    assert breaker.state == OPEN
+
+    breaker.before_call()  # Reset timeout elapsed: trial call admitted
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+    breaker.record_success("POST /calculate-score", 0.1)
+
+    assert breaker.state == CLOSED
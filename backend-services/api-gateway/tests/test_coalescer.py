@@ -0,0 +1,91 @@
+"""
+Single-flight coalescing: one run per key, shared by every concurrent caller
+"""
+import asyncio
+
+from coalescer import RequestCoalescer
+
+
+def test_concurrent_callers_share_one_run():
+    async def scenario():
+        coalescer = RequestCoalescer()
+        runs = 0
+        release = asyncio.Event()
+
+        async def work(flight):
+            nonlocal runs
+            runs += 1
+            await release.wait()
+            return "report"
+
+        callers = [asyncio.ensure_future(coalescer.run("https://shop.test/p/1", work)) for _ in range(5)]
+        await asyncio.sleep(0)
+        assert coalescer.is_in_flight("https://shop.test/p/1")
+
+        release.set()
+        results = await asyncio.gather(*callers)
+        return runs, results, coalescer.stats()
+
+    runs, results, stats = asyncio.run(scenario())
+
+    assert runs == 1
+    assert results == ["report"] * 5
+    assert stats["leader_runs"] == 1
+    assert stats["coalesced_requests"] == 4
+    assert stats["in_flight"] == 0
+
+
+def test_run_is_cancelled_only_when_the_last_caller_detaches():
+    async def scenario():
+        coalescer = RequestCoalescer()
+
+        async def work(flight):
+            await asyncio.sleep(60)
+
+        first = coalescer.join("key", work)
+        first.attach()
+        second = coalescer.join("key", work)
+        second.attach()
+        assert first is second
+
+        cancelled_early = first.detach()
+        await asyncio.sleep(0)
+        still_running = not first.task.done()
+
+        cancelled_last = second.detach()
+        await asyncio.gather(first.task, return_exceptions=True)
+        return cancelled_early, still_running, cancelled_last, first.task.cancelled(), coalescer.is_in_flight("key")
+
+    cancelled_early, still_running, cancelled_last, task_cancelled, in_flight = asyncio.run(scenario())
+
+    assert not cancelled_early
+    assert still_running
+    assert cancelled_last
+    assert task_cancelled
+    assert not in_flight
+
+
+def test_late_joiner_replays_earlier_stage_events():
+    async def scenario():
+        coalescer = RequestCoalescer()
+        release = asyncio.Event()
+
+        async def work(flight):
+            flight.publish("cache", {"hit": False})
+            await release.wait()
+            flight.publish("scrape", {"total_reviews": 3})
+            return "report"
+
+        coalescer.join("key", work)
+        await asyncio.sleep(0)
+        late = coalescer.join("key", work)
+
+        async def collect():
+            return [stage async for stage, _ in late.events()]
+
+        collector = asyncio.ensure_future(collect())
+        await asyncio.sleep(0)
+        release.set()
+        return await collector
+
+    assert asyncio.run(scenario()) == ["cache", "scrape"]
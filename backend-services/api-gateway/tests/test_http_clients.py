@@ -0,0 +1,58 @@
+"""
+Circuit breaker accounting of downstream responses
+"""
+import asyncio
+
+import httpx
+import pytest
+
+import http_clients as http_clients_module
+from cancellation import DEADLINE_EXCEEDED_HEADER
+from circuit_breaker import CircuitBreakerRegistry, CLOSED, OPEN
+from config import settings
+
+
+def _registry(monkeypatch, handler) -> http_clients_module.ServiceClientRegistry:
+    monkeypatch.setattr(http_clients_module, "circuit_breakers", CircuitBreakerRegistry())
+    registry = http_clients_module.ServiceClientRegistry()
+    asyncio.run(registry.startup())
+    registry._clients["nlp"] = httpx.AsyncClient(base_url="http://nlp.test", transport=httpx.MockTransport(handler))
+    return registry
+
+
+def _call_many(registry, count: int, stream: bool = False):
+    async def call():
+        if stream:
+            async with registry.stream("nlp", "POST", "/analyze") as response:
+                await response.aread()
+        else:
+            await registry.request("nlp", "POST", "/analyze")
+
+    async def calls():
+        for _ in range(count):
+            await call()
+
+    asyncio.run(calls())
+
+
+@pytest.mark.parametrize("stream", [False, True])
+def test_deadline_aborts_do_not_open_the_circuit(monkeypatch, stream):
+    registry = _registry(monkeypatch, lambda request: httpx.Response(
+        504, json={"detail": "Deadline exceeded"}, headers={DEADLINE_EXCEEDED_HEADER: "true"}
+    ))
+
+    _call_many(registry, settings.BREAKER_FAILURE_THRESHOLD * 2, stream)
+
+    breaker = http_clients_module.circuit_breakers.get("nlp")
+    assert breaker.state == CLOSED
+    assert breaker.failures == 0
+    assert registry.stats()["nlp"]["deadline_aborts"] == settings.BREAKER_FAILURE_THRESHOLD * 2
+
+
+def test_unmarked_gateway_timeouts_still_open_the_circuit(monkeypatch):
+    registry = _registry(monkeypatch, lambda request: httpx.Response(504, json={"detail": "upstream timeout"}))
+
+    _call_many(registry, settings.BREAKER_FAILURE_THRESHOLD)
+
+    assert http_clients_module.circuit_breakers.get("nlp").state == OPEN
+    assert registry.stats()["nlp"]["deadline_aborts"] == 0
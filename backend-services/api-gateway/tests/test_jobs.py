@@ -0,0 +1,139 @@
+"""
+Analysis job queue: priority then FIFO ordering, queue-full rejection, failed jobs, pruning of finished jobs
+"""
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi import HTTPException
+
+import jobs as jobs_module
+from jobs import AnalysisJobQueue, JobQueueFull
+from models import AnalysisJobRequest
+
+
+@pytest.fixture
+def pipeline_runs(monkeypatch):
+    """One worker, room for 4 queued jobs; the pipeline records each run and waits for `release`"""
+    monkeypatch.setattr(jobs_module.settings, "JOB_WORKERS", 1)
+    monkeypatch.setattr(jobs_module.settings, "JOB_QUEUE_MAX_DEPTH", 4)
+    runs = []
+    release = asyncio.Event()
+
+    async def run(request):
+        runs.append(request.product_url)
+        await release.wait()
+        if "fails" in request.product_url:
+            raise HTTPException(status_code=502, detail="Scraper service error")
+        return f"report for {request.product_url}"
+
+    monkeypatch.setattr(jobs_module.analysis_pipeline, "run", run)
+    return runs, release
+
+
+def _job(name: str, priority: str = "normal") -> AnalysisJobRequest:
+    return AnalysisJobRequest(product_url=f"https://www.amazon.in/dp/{name}", priority=priority)
+
+
+async def _drain(queue: AnalysisJobQueue):
+    await queue._queue.join()
+    await queue.shutdown()
+
+
+def test_jobs_run_by_priority_then_in_submission_order(pipeline_runs):
+    runs, release = pipeline_runs
+
+    async def scenario():
+        queue = AnalysisJobQueue()
+        await queue.startup()
+        # Picked up at once: occupies the only worker while the rest queue up
+        first = queue.submit(_job("FIRST"))
+        await asyncio.sleep(0)
+        submitted = [
+            queue.submit(_job("LOW1", "low")),
+            queue.submit(_job("NORMAL1")),
+            queue.submit(_job("HIGH1", "high")),
+            queue.submit(_job("NORMAL2")),
+        ]
+        stats_while_busy = queue.stats()
+        release.set()
+        await _drain(queue)
+        return queue, [first, *submitted], stats_while_busy
+
+    queue, submitted, stats = asyncio.run(scenario())
+
+    assert [url.rsplit("/", 1)[1] for url in runs] == ["FIRST", "HIGH1", "NORMAL1", "NORMAL2", "LOW1"]
+    assert stats["running"] == 1 and stats["queue_length"] == 4
+    assert stats["queued_by_priority"] == {"high": 1, "normal": 2, "low": 1}
+    assert all(job.status == "completed" for job in submitted)
+    assert submitted[3].result == "report for https://www.amazon.in/dp/HIGH1"
+    assert queue.completed == 5 and queue.stats()["running"] == 0
+
+
+def test_a_full_queue_rejects_new_jobs(pipeline_runs):
+    runs, release = pipeline_runs
+
+    async def scenario():
+        queue = AnalysisJobQueue()
+        await queue.startup()
+        queue.submit(_job("RUNNING"))
+        await asyncio.sleep(0)
+        queued = [queue.submit(_job(f"QUEUED{i}")) for i in range(4)]
+
+        with pytest.raises(JobQueueFull):
+            queue.submit(_job("REJECTED", "high"))
+
+        release.set()
+        await _drain(queue)
+        return queue, queued
+
+    queue, queued = asyncio.run(scenario())
+
+    assert queue.rejected == 1
+    assert not any(url.endswith("REJECTED") for url in runs)
+    # Rejected jobs are not tracked; the accepted ones all ran
+    assert queue.stats()["tracked_jobs"] == 5
+    assert all(queue.get(job.job_id).status == "completed" for job in queued)
+
+
+def test_failed_jobs_record_the_error(pipeline_runs):
+    _, release = pipeline_runs
+    release.set()
+
+    async def scenario():
+        queue = AnalysisJobQueue()
+        await queue.startup()
+        job = queue.submit(_job("fails"))
+        await _drain(queue)
+        return queue, job
+
+    queue, job = asyncio.run(scenario())
+
+    assert job.status == "failed" and job.error == "Scraper service error"
+    assert job.result is None and job.finished_at is not None
+    assert queue.failed == 1 and queue.completed == 0
+
+
+def test_finished_jobs_are_pruned_after_the_result_ttl(pipeline_runs, monkeypatch):
+    monkeypatch.setattr(jobs_module.settings, "JOB_RESULT_TTL_SECONDS", 60)
+    _, release = pipeline_runs
+    release.set()
+
+    async def scenario():
+        queue = AnalysisJobQueue()
+        await queue.startup()
+        old, recent = queue.submit(_job("OLD")), queue.submit(_job("RECENT"))
+        await queue._queue.join()
+        old.finished_at = datetime.utcnow() - timedelta(seconds=61)
+        recent.finished_at = datetime.utcnow() - timedelta(seconds=59)
+
+        # Pruning happens on the next submission
+        queued = queue.submit(_job("NEXT"))
+        await _drain(queue)
+        return queue, old, recent, queued
+
+    queue, old, recent, queued = asyncio.run(scenario())
+
+    assert queue.get(old.job_id) is None
+    assert queue.get(recent.job_id) is recent
+    assert queue.get(queued.job_id) is queued
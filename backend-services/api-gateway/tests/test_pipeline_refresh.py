@@ -0,0 +1,99 @@
+import asyncio
+from datetime import datetime, timedelta
+
+from fake_backend import REPORT
+from models import AnalyzeRequest
+from pipeline import AnalysisPipeline
+from result_cache import result_cache
+from utils.url_utils import normalize_url
+
+PRODUCT_URL = "https://www.amazon.in/dp/B0TEST0001"
+
+
+def test_stale_serve_refreshes_the_url_cache_entry(fake_backend):
+    fake_backend.put_cached(PRODUCT_URL, dict(REPORT, trust_score=40), datetime.utcnow() - timedelta(hours=1))
+
+    async def scenario():
+        pipeline = AnalysisPipeline()
+        stale = await pipeline.run(AnalyzeRequest(product_url=PRODUCT_URL))
+        await pipeline.refresh(PRODUCT_URL)
+        return pipeline, stale
+
+    pipeline, stale = asyncio.run(scenario())
+
+    assert stale.cached and stale.stale and stale.trust_score == 40
+    assert pipeline.stats()["refreshes_started"] == 1
+    assert pipeline.stats()["refreshes_written"] == 1
+
+    # Another worker (no L1 entry) now reads the refreshed entry, with no further refresh
+    result_cache.clear()
+    other_worker = AnalysisPipeline()
+    fresh = asyncio.run(other_worker.run(AnalyzeRequest(product_url=PRODUCT_URL)))
+
+    assert fresh.cached and not fresh.stale and fresh.trust_score == REPORT["trust_score"]
+    assert other_worker.stats()["refreshes_started"] == 0
+    assert fake_backend.calls["scrape"] == 1
+
+
+def test_failed_write_through_still_returns_the_refreshed_report(fake_backend, monkeypatch):
+    async def store_cache_down(*args, **kwargs):
+        raise ConnectionError("URL cache down")
+
+    monkeypatch.setattr(fake_backend, "store_cache", store_cache_down)
+
+    pipeline = AnalysisPipeline()
+    refreshed = asyncio.run(pipeline.refresh(PRODUCT_URL))
+
+    assert not refreshed.cached and refreshed.trust_score == REPORT["trust_score"]
+    assert pipeline.stats()["refresh_writes_failed"] == 1
+
+
+def test_miss_is_written_through_and_served_stale_after_expiry(fake_backend):
+    async def first_analysis():
+        pipeline = AnalysisPipeline()
+        response = await pipeline.run(AnalyzeRequest(product_url=PRODUCT_URL))
+        await pipeline.shutdown()
+        return pipeline, response
+
+    pipeline, response = asyncio.run(first_analysis())
+
+    assert not response.cached
+    assert fake_backend.calls["store_cache"] == 1
+    assert pipeline.cache_write_stats() == {"written": 1, "failed": 0, "in_flight": 0}
+
+    # The entry expires; another worker (no L1 entry) is served it stale and refreshes it once
+    entry = fake_backend.url_cache[normalize_url(PRODUCT_URL)]
+    entry["expires_at"] = datetime.utcnow() - timedelta(hours=1)
+    result_cache.clear()
+
+    async def after_expiry():
+        other_worker = AnalysisPipeline()
+        stale = await other_worker.run(AnalyzeRequest(product_url=PRODUCT_URL))
+        await other_worker.refresh(PRODUCT_URL)
+        return other_worker, stale
+
+    other_worker, stale = asyncio.run(after_expiry())
+
+    assert stale.cached and stale.stale and stale.trust_score == REPORT["trust_score"]
+    assert other_worker.stats()["stale_served"] == 1
+    assert other_worker.stats()["refreshes_written"] == 1
+    assert fake_backend.calls["scrape"] == 2
+    assert fake_backend.url_cache[normalize_url(PRODUCT_URL)]["expires_at"] > datetime.utcnow()
+
+
+def test_failed_write_does_not_fail_the_analysis(fake_backend, monkeypatch):
+    async def store_cache_down(*args, **kwargs):
+        raise ConnectionError("URL cache down")
+
+    monkeypatch.setattr(fake_backend, "store_cache", store_cache_down)
+
+    async def scenario():
+        pipeline = AnalysisPipeline()
+        response = await pipeline.run(AnalyzeRequest(product_url=PRODUCT_URL))
+        await pipeline.shutdown()
+        return pipeline, response
+
+    pipeline, response = asyncio.run(scenario())
+
+    assert not response.cached and response.trust_score == REPORT["trust_score"]
+    assert pipeline.cache_write_stats()["failed"] == 1
@@ -0,0 +1,57 @@
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+
+from fake_backend import REPORT
+from models import AnalyzeRequest
+from pipeline import AnalysisPipeline
+from result_cache import result_cache
+import pipeline as pipeline_module
+import prewarm as prewarm_module
+
+PRODUCT_URL = "https://www.amazon.in/dp/B0TEST0002"
+
+
+@pytest.fixture
+def scheduler(fake_backend, monkeypatch):
+    monkeypatch.setattr(prewarm_module.settings, "PREWARM_WINDOWS", "")
+    monkeypatch.setattr(prewarm_module, "service_backend", fake_backend)
+    scheduler = prewarm_module.PrewarmScheduler()
+    monkeypatch.setattr(pipeline_module, "prewarm_scheduler", scheduler)
+    monkeypatch.setattr(pipeline_module, "analysis_pipeline", AnalysisPipeline())
+    return scheduler
+
+
+def test_prewarmed_product_is_a_hit_from_a_fresh_worker(fake_backend, scheduler):
+    # About to expire: the next read after its expiry would have gone stale
+    expires_at = datetime.utcnow() + timedelta(milliseconds=50)
+    fake_backend.put_cached(PRODUCT_URL, dict(REPORT, trust_score=40), expires_at)
+    fake_backend.prewarm.append({"url": PRODUCT_URL, "expires_at": expires_at.isoformat(), "access_count": 5})
+
+    asyncio.run(scheduler.run_cycle())
+    assert scheduler.refreshes == 1
+    assert fake_backend.calls["scrape"] == 1
+
+    # A worker that did not run the refresh has nothing in L1: it must be served by the URL cache
+    result_cache.clear()
+    asyncio.run(asyncio.sleep(0.1))
+    response = asyncio.run(AnalysisPipeline().run(AnalyzeRequest(product_url=PRODUCT_URL)))
+
+    assert response.cached and not response.stale
+    assert response.trust_score == REPORT["trust_score"]
+    assert fake_backend.calls["scrape"] == 1
+    assert scheduler.stats()["prewarmed_hits"] == 1
+
+
+def test_failed_prewarm_is_not_counted_as_a_refresh(fake_backend, scheduler, monkeypatch):
+    async def scrape_down(product_url):
+        raise ConnectionError("scraper down")
+
+    monkeypatch.setattr(fake_backend, "scrape", scrape_down)
+    fake_backend.prewarm.append({"url": PRODUCT_URL, "expires_at": datetime.utcnow().isoformat()})
+
+    asyncio.run(scheduler.run_cycle())
+
+    assert scheduler.refreshes == 0
+    assert scheduler.refresh_failures == 1
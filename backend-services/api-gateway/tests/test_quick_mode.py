@@ -0,0 +1,98 @@
+import asyncio
+import time
+
+import pytest
+
+from fake_backend import REVIEWS
+from models import AnalyzeRequest
+from pipeline import AnalysisPipeline
+from result_cache import result_cache
+from utils.url_utils import normalize_url
+import pipeline as pipeline_module
+
+PRODUCT_URL = "https://www.amazon.in/dp/B0TEST0004"
+BUDGET = 0.2
+
+
+@pytest.fixture
+def slow_scraper(fake_backend, monkeypatch):
+    """The scraper sends its first chunk of reviews, then hangs until released"""
+    monkeypatch.setattr(pipeline_module.settings, "QUICK_SCRAPE_BUDGET_SECONDS", BUDGET)
+    monkeypatch.setattr(pipeline_module.settings, "SCRAPE_CHUNK_SIZE", 2)
+    released = asyncio.Event()
+    scrape_stream = fake_backend.scrape_stream
+    scrape = fake_backend.scrape
+
+    async def slow_scrape_stream(product_url, chunk_size):
+        async for event in scrape_stream(product_url, chunk_size):
+            yield event
+            if event["type"] == "reviews":
+                await released.wait()
+
+    async def slow_scrape(product_url):
+        await released.wait()
+        return await scrape(product_url)
+
+    fake_backend.scrape_stream = slow_scrape_stream
+    fake_backend.scrape = slow_scrape
+    fake_backend.released = released
+    return fake_backend
+
+
+def quick_request() -> AnalyzeRequest:
+    return AnalyzeRequest(product_url=PRODUCT_URL, analysis_depth="quick")
+
+
+def test_quick_result_is_scored_from_the_reviews_streamed_within_the_budget(slow_scraper, monkeypatch):
+    monkeypatch.setattr(pipeline_module.settings, "STREAMING_ANALYSIS", True)
+    pipeline = AnalysisPipeline()
+
+    async def scenario():
+        started = time.perf_counter()
+        response = await pipeline.run(quick_request())
+        elapsed = time.perf_counter() - started
+
+        # The client has its answer and left: the full run still finishes
+        slow_scraper.released.set()
+        await pipeline.coalescer._in_flight[normalize_url(PRODUCT_URL)].task
+        return response, elapsed
+
+    response, elapsed = asyncio.run(scenario())
+
+    assert response.analysis_depth == "quick"
+    assert BUDGET <= elapsed < BUDGET + 1.0
+    assert slow_scraper.analyzed["nlp_quick"] == 2
+    assert slow_scraper.analyzed["nlp"] == len(REVIEWS)
+    assert result_cache.get(normalize_url(PRODUCT_URL)).analysis_depth == "full"
+
+
+def test_quick_request_without_reviews_within_the_budget_waits_for_the_full_run(slow_scraper):
+    pipeline = AnalysisPipeline()
+
+    async def scenario():
+        asyncio.get_running_loop().call_later(BUDGET * 2, slow_scraper.released.set)
+        return await pipeline.run(quick_request())
+
+    response = asyncio.run(scenario())
+
+    assert response.analysis_depth == "full"
+    assert "nlp_quick" not in slow_scraper.analyzed
+    assert pipeline.quick_stats() == {"provisional_served": 0, "fallbacks_to_full": 1}
+
+
+def test_quick_request_is_scored_from_every_review_of_a_fast_scrape(fake_backend, monkeypatch):
+    analyze = fake_backend.analyze
+
+    async def slow_full_analysis(service_name, reviews, quick=False):
+        if not quick:
+            await asyncio.sleep(BUDGET)
+        return await analyze(service_name, reviews, quick)
+
+    monkeypatch.setattr(fake_backend, "analyze", slow_full_analysis)
+    pipeline = AnalysisPipeline()
+
+    response = asyncio.run(pipeline.run(quick_request()))
+
+    assert response.analysis_depth == "quick"
+    assert fake_backend.analyzed["nlp_quick"] == len(REVIEWS)
+    assert pipeline.quick_stats()["provisional_served"] == 1
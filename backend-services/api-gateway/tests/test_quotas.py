@@ -0,0 +1,62 @@
+"""
+Quota charges on /analyze: settled by the path taken, shown on every response
+"""
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from backends import ServiceCallError
+from config import settings
+from fake_backend import REPORT
+from quotas import QUOTA_COST_HEADER, QUOTA_REMAINING_HEADER
+from routes import analysis
+
+PRODUCT_URL = "https://www.amazon.in/dp/B0TEST0005"
+
+
+@pytest.fixture
+def client(fake_backend, monkeypatch):
+    monkeypatch.setattr(settings, "QUOTA_ENABLED", True)
+    app = FastAPI()
+    app.include_router(analysis.router)
+    return TestClient(app)
+
+
+def analyze(client, product_url: str, identifier: str):
+    return client.post("/analyze", json={"product_url": product_url}, headers={"X-Forwarded-For": identifier})
+
+
+def test_quotas_are_off_by_default():
+    assert type(settings).model_fields["QUOTA_ENABLED"].default is False
+
+
+def test_miss_is_charged_one_scrape_whatever_the_site(client):
+    for index, product_url in enumerate([PRODUCT_URL, "https://shop.example.com/products/42"]):
+        response = analyze(client, product_url, f"10.0.0.{index + 1}")
+
+        assert response.status_code == 200
+        assert response.headers[QUOTA_COST_HEADER] == f"{settings.QUOTA_COST_SCRAPE:g}"
+
+
+def test_cache_hit_is_charged_a_cache_hit(client, fake_backend):
+    fake_backend.put_cached(PRODUCT_URL, REPORT, datetime.utcnow() + timedelta(days=1))
+
+    response = analyze(client, PRODUCT_URL, "10.0.1.1")
+
+    assert response.status_code == 200 and response.json()["cached"]
+    assert response.headers[QUOTA_COST_HEADER] == f"{settings.QUOTA_COST_CACHE_HIT:g}"
+
+
+def test_failed_analysis_is_refunded_and_the_error_shows_the_quota(client, fake_backend):
+    async def scraper_down(product_url):
+        raise ServiceCallError("scraper", 503, "Scraper unavailable")
+
+    fake_backend.scrape = scraper_down
+
+    response = analyze(client, PRODUCT_URL, "10.0.2.1")
+
+    assert response.status_code == 502
+    assert response.headers[QUOTA_COST_HEADER] == "0"
+    assert response.headers[QUOTA_REMAINING_HEADER] == f"{settings.QUOTA_BUDGET:g}"
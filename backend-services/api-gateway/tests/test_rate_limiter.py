@@ -0,0 +1,97 @@
+"""
+Token buckets: capacity, refill, refunds and idle eviction
+"""
+import asyncio
+import math
+
+import pytest
+
+import rate_limiter as rate_limiter_module
+from rate_limiter import InMemoryBackend, RateLimitBackend, RateLimiter, RedisBackend
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def _backend(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(rate_limiter_module.time, "monotonic", clock)
+    return InMemoryBackend(), clock
+
+
+def test_bucket_allows_a_burst_up_to_capacity_then_rejects(monkeypatch):
+    backend, _ = _backend(monkeypatch)
+
+    results = [asyncio.run(backend.consume("client", 1, capacity=3, refill_rate=1.0)) for _ in range(4)]
+
+    assert [result.allowed for result in results] == [True, True, True, False]
+    assert results[2].remaining == 0
+    assert results[3].retry_after == 1.0
+
+
+def test_bucket_refills_at_the_configured_rate(monkeypatch):
+    backend, clock = _backend(monkeypatch)
+    for _ in range(3):
+        asyncio.run(backend.consume("client", 1, capacity=3, refill_rate=0.5))
+
+    clock.now += 2.0  # One token back
+    assert asyncio.run(backend.consume("client", 1, capacity=3, refill_rate=0.5)).allowed
+    assert not asyncio.run(backend.consume("client", 1, capacity=3, refill_rate=0.5)).allowed
+
+
+def test_cost_above_capacity_is_never_allowed(monkeypatch):
+    backend, _ = _backend(monkeypatch)
+
+    result = asyncio.run(backend.consume("client", 5, capacity=3, refill_rate=1.0))
+
+    assert not result.allowed
+    assert math.isinf(result.retry_after)
+
+
+def test_negative_cost_refunds_up_to_capacity(monkeypatch):
+    backend, _ = _backend(monkeypatch)
+    asyncio.run(backend.consume("client", 3, capacity=3, refill_rate=1.0))
+
+    assert asyncio.run(backend.consume("client", -2, capacity=3, refill_rate=1.0)).remaining == 2
+    assert asyncio.run(backend.consume("client", -5, capacity=3, refill_rate=1.0)).remaining == 3
+
+
+def test_idle_buckets_are_evicted_once_full_again(monkeypatch):
+    backend, clock = _backend(monkeypatch)
+    asyncio.run(backend.consume("idle", 2, capacity=2, refill_rate=1.0))
+    asyncio.run(backend.consume("busy", 2, capacity=2, refill_rate=0.1))
+
+    clock.now += 2.0
+
+    assert backend.evict_idle() == 1
+    assert backend.stats()["tracked_keys"] == 1
+
+
+def test_limiter_allows_requests_when_the_backend_fails():
+    class BrokenBackend(InMemoryBackend):
+        async def consume(self, key, cost, capacity, refill_rate):
+            raise ConnectionError("redis down")
+
+    limiter = RateLimiter()
+    limiter.backend = BrokenBackend()
+
+    assert asyncio.run(limiter.consume("client")).allowed
+    assert limiter.backend_errors == 1
+
+
+def test_backend_without_consume_fails_on_creation():
+    class IncompleteBackend(RateLimitBackend):
+        name = "incomplete"
+
+    with pytest.raises(TypeError, match="abstract"):
+        IncompleteBackend()
+
+
+def test_shipped_backends_implement_consume():
+    assert not InMemoryBackend.__abstractmethods__
+    assert not RedisBackend.__abstractmethods__
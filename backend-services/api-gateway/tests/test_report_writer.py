@@ -0,0 +1,127 @@
+"""
+Background report writer: batching, retries, spill-to-disk and replay, full queue
+"""
+import asyncio
+import json
+
+import pytest
+
+import report_writer as report_writer_module
+from report_writer import ReportWriter
+
+
+@pytest.fixture
+def writer_settings(fake_backend, monkeypatch, tmp_path):
+    """Report writer settings for fast tests, writing to the fake backend and a temporary spill file"""
+    settings = report_writer_module.settings
+    monkeypatch.setattr(report_writer_module, "service_backend", fake_backend)
+    monkeypatch.setattr(settings, "REPORT_SPILL_PATH", str(tmp_path / "report_spill.jsonl"))
+    monkeypatch.setattr(settings, "REPORT_BATCH_SIZE", 3)
+    monkeypatch.setattr(settings, "REPORT_BATCH_MAX_WAIT", 0.05)
+    monkeypatch.setattr(settings, "REPORT_WRITE_RETRIES", 3)
+    monkeypatch.setattr(settings, "REPORT_RETRY_BACKOFF", 0.0)
+    monkeypatch.setattr(settings, "REPORT_REPLAY_INTERVAL", 0.02)
+    return settings
+
+
+def _enqueue(writer: ReportWriter, count: int, start: int = 0):
+    for i in range(start, start + count):
+        writer.enqueue(f"https://www.amazon.in/dp/B0REPORT{i:02d}", {"trust_score": i}, ttl_days=7)
+
+
+async def _wait_until(condition, timeout: float = 2.0):
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not condition():
+        assert asyncio.get_running_loop().time() < deadline, "condition not reached in time"
+        await asyncio.sleep(0.01)
+
+
+def _stored_urls(fake_backend):
+    return sorted(report["url"] for batch in fake_backend.report_batches for report in batch)
+
+
+def _spilled_lines(settings):
+    with open(settings.REPORT_SPILL_PATH, encoding="utf-8") as f:
+        return [json.loads(line) for line in f]
+
+
+def test_reports_are_written_in_batches(fake_backend, writer_settings):
+    writer = ReportWriter()
+
+    async def scenario():
+        await writer.startup()
+        _enqueue(writer, 7)
+        await writer.shutdown()
+
+    asyncio.run(scenario())
+
+    assert [len(batch) for batch in fake_backend.report_batches] == [3, 3, 1]
+    stats = writer.stats()
+    assert stats["written"] == 7 and stats["batches_written"] == 3
+    assert stats["retries"] == 0 and stats["spilled"] == 0
+
+
+def test_failed_batch_is_spilled_then_replayed_once_the_service_recovers(fake_backend, writer_settings):
+    writer = ReportWriter()
+    fake_backend.report_service_down = True
+
+    async def scenario():
+        await writer.startup()
+        _enqueue(writer, 2)
+
+        await _wait_until(lambda: writer.spilled == 2)
+        spilled = _spilled_lines(writer_settings)
+        # Every attempt failed: the first plus REPORT_WRITE_RETRIES - 1 retries
+        calls_while_down = fake_backend.calls["store_reports"]
+
+        fake_backend.report_service_down = False
+        await _wait_until(lambda: writer.replayed == 2)
+        await writer.shutdown()
+        return spilled, calls_while_down
+
+    spilled, calls_while_down = asyncio.run(scenario())
+
+    assert [item["report"]["trust_score"] for item in spilled] == [0, 1]
+    assert writer.retries == 2 and writer.failed_batches == 1
+    assert calls_while_down >= 3
+    assert _stored_urls(fake_backend) == ["https://www.amazon.in/dp/B0REPORT00", "https://www.amazon.in/dp/B0REPORT01"]
+    assert writer.stats()["spill_file_bytes"] == 0
+
+
+def test_replay_keeps_reports_spilled_while_the_service_is_still_down(fake_backend, writer_settings):
+    writer = ReportWriter()
+    fake_backend.report_service_down = True
+
+    async def scenario():
+        await writer.startup()
+        _enqueue(writer, 1)
+        await _wait_until(lambda: writer.spilled == 1)
+        # Several replay rounds fail while the service stays down
+        await _wait_until(lambda: fake_backend.calls["store_reports"] >= 6)
+        await writer.shutdown()
+
+    asyncio.run(scenario())
+
+    assert writer.replayed == 0 and writer.spilled == 1
+    assert len(_spilled_lines(writer_settings)) == 1
+
+
+def test_reports_arriving_at_a_full_queue_are_spilled_and_replayed(fake_backend, writer_settings, monkeypatch):
+    monkeypatch.setattr(writer_settings, "REPORT_QUEUE_MAX_DEPTH", 2)
+    writer = ReportWriter()
+
+    async def scenario():
+        await writer.startup()
+        # No await in between: the writer task cannot drain the queue before it is full
+        _enqueue(writer, 5)
+        queued = writer.stats()["queue_depth"]
+        await _wait_until(lambda: writer.spilled == 3)
+        await _wait_until(lambda: writer.replayed == 3)
+        await writer.shutdown()
+        return queued
+
+    queued = asyncio.run(scenario())
+
+    assert queued == 2
+    assert writer.enqueued == 5 and writer.written == 5
+    assert len(_stored_urls(fake_backend)) == 5
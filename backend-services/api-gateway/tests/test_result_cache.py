@@ -0,0 +1,126 @@
+"""
+L1 result cache: count and byte bounds, upstream expiry, clearing on force_refresh and /invalidate
+"""
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+
+import result_cache as result_cache_module
+from fake_backend import REPORT
+from models import AnalyzeRequest, AnalysisResponse, InvalidateRequest
+from pipeline import AnalysisPipeline
+from result_cache import ResultCache, result_cache
+from utils.url_utils import normalize_url
+
+PRODUCT_URL = "https://www.amazon.in/dp/B0L1CACHE1"
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(result_cache_module.time, "monotonic", clock)
+    return clock
+
+
+def _response(trust_score: int = 82, insights: int = 1) -> AnalysisResponse:
+    report = dict(REPORT, trust_score=trust_score, key_insights=[{"message": "x" * 100}] * insights)
+    return AnalysisResponse(status="success", **report)
+
+
+def test_least_recently_used_entry_is_evicted_past_max_entries(monkeypatch):
+    monkeypatch.setattr(result_cache_module.settings, "RESULT_CACHE_MAX_ENTRIES", 2)
+    cache = ResultCache()
+
+    cache.put("a", _response(1))
+    cache.put("b", _response(2))
+    cache.get("a")
+    cache.put("c", _response(3))
+
+    assert cache.peek("b") is None
+    assert cache.get("a").trust_score == 1 and cache.get("c").trust_score == 3
+    assert cache.stats()["entries"] == 2 and cache.evictions == 1
+
+
+def test_entries_are_evicted_to_stay_within_max_bytes(monkeypatch):
+    size = len(_response().model_copy(update={"cached": True}).model_dump_json())
+    monkeypatch.setattr(result_cache_module.settings, "RESULT_CACHE_MAX_BYTES", int(size * 2.5))
+    cache = ResultCache()
+
+    for key in ("a", "b", "c"):
+        cache.put(key, _response())
+    # Larger than the whole budget: never cached
+    cache.put("huge", _response(insights=10))
+
+    assert cache.peek("a") is None and cache.peek("huge") is None
+    assert cache.peek("b") is not None and cache.peek("c") is not None
+    assert cache.bytes_used == 2 * size
+    assert cache.evictions == 1
+
+
+def test_entry_never_outlives_the_upstream_expiry(clock):
+    cache = ResultCache()
+
+    cache.put("a", _response(), expires_at=datetime.utcnow() + timedelta(seconds=30))
+    cache.put("expired", _response(), expires_at=datetime.utcnow() - timedelta(seconds=1))
+
+    assert cache.peek("expired") is None
+    clock.now += 29
+    assert cache.get("a") is not None
+    clock.now += 2
+    assert cache.get("a") is None
+    assert cache.expirations == 1 and cache.stats()["entries"] == 0
+
+
+def test_entry_is_capped_at_the_result_cache_ttl(clock, monkeypatch):
+    monkeypatch.setattr(result_cache_module.settings, "RESULT_CACHE_TTL_SECONDS", 60.0)
+    cache = ResultCache()
+
+    cache.put("a", _response(), expires_at=datetime.utcnow() + timedelta(days=7))
+    clock.now += 61
+
+    assert cache.get("a") is None
+
+
+def test_force_refresh_bypasses_and_replaces_the_l1_entry(fake_backend):
+    async def scenario():
+        pipeline = AnalysisPipeline()
+        first = await pipeline.run(AnalyzeRequest(product_url=PRODUCT_URL))
+        cached = await pipeline.run(AnalyzeRequest(product_url=PRODUCT_URL))
+        refreshed = await pipeline.run(AnalyzeRequest(product_url=PRODUCT_URL, force_refresh=True))
+        return first, cached, refreshed
+
+    first, cached, refreshed = asyncio.run(scenario())
+
+    assert not first.cached and cached.cached
+    assert not refreshed.cached
+    assert fake_backend.calls["scrape"] == 2
+    assert result_cache.peek(normalize_url(PRODUCT_URL)) is not None
+
+
+def test_invalidate_drops_the_l1_and_url_cache_entries(fake_backend, monkeypatch):
+    from routes import analysis as analysis_routes
+
+    monkeypatch.setattr(analysis_routes, "service_backend", fake_backend)
+
+    async def scenario():
+        pipeline = AnalysisPipeline()
+        await pipeline.run(AnalyzeRequest(product_url=PRODUCT_URL))
+        await pipeline.shutdown()  # URL cache write-through done
+        result = await analysis_routes.invalidate_analysis(InvalidateRequest(product_url=PRODUCT_URL), None)
+        after = await pipeline.run(AnalyzeRequest(product_url=PRODUCT_URL))
+        return result, after
+
+    result, after = asyncio.run(scenario())
+
+    assert result["l1_invalidated"] and result["url_cache"] == {"deleted": True}
+    assert not after.cached
+    assert fake_backend.calls["scrape"] == 2
@@ -0,0 +1,48 @@
+import asyncio
+
+import pytest
+
+from fake_backend import REVIEWS
+from models import AnalyzeRequest
+from pipeline import AnalysisPipeline
+import pipeline as pipeline_module
+
+PRODUCT_URL = "https://www.amazon.in/dp/B0TEST0003"
+
+
+@pytest.fixture
+def streaming(fake_backend, monkeypatch):
+    monkeypatch.setattr(pipeline_module.settings, "STREAMING_ANALYSIS", True)
+    monkeypatch.setattr(pipeline_module.settings, "SCRAPE_CHUNK_SIZE", 2)
+    return fake_backend
+
+
+def test_reviews_are_analyzed_in_sessions(streaming):
+    pipeline = AnalysisPipeline()
+    response = asyncio.run(pipeline.run(AnalyzeRequest(product_url=PRODUCT_URL)))
+
+    assert not response.cached
+    assert streaming.analyzed == {"nlp": len(REVIEWS), "behavior": len(REVIEWS)}
+    assert streaming.calls["analyze_nlp"] == streaming.calls["analyze_behavior"] == 0
+    assert pipeline.streaming_stats()["session_fallbacks"] == 0
+
+
+@pytest.mark.parametrize("lost_at", ["add_chunk", "finish_session"])
+def test_lost_session_falls_back_to_analyzing_every_review(streaming, lost_at):
+    # Another replica (without the session) answers after the first chunk
+    lose = getattr(streaming, lost_at)
+
+    async def lost_after_first_chunk(service_name, session_id, *args):
+        if lost_at == "finish_session" or len(streaming.sessions[session_id]) > 0:
+            streaming.sessions.pop(session_id, None)
+        return await lose(service_name, session_id, *args)
+
+    setattr(streaming, lost_at, lost_after_first_chunk)
+
+    pipeline = AnalysisPipeline()
+    response = asyncio.run(pipeline.run(AnalyzeRequest(product_url=PRODUCT_URL)))
+
+    assert not response.cached
+    assert streaming.calls["analyze_nlp"] == streaming.calls["analyze_behavior"] == 1
+    assert streaming.analyzed == {"nlp": len(REVIEWS), "behavior": len(REVIEWS)}
+    assert pipeline.streaming_stats()["session_fallbacks"] == 2
@@ -0,0 +1,50 @@
+"""
+URL normalization utilities (kept in line with the URL Cache Service)
+"""
+from urllib.parse import urlparse, parse_qs, urlencode, urlunparse
+import logging
+
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+
+def normalize_url(url: str) -> str:
+    """
+    Normalize product URL so equivalent URLs share one key
+
+    - Remove tracking parameters (utm_source, ref, etc.)
+    - Sort query parameters
+    - Lowercase domain
+    - Remove www. prefix
+    """
+    try:
+        parsed = urlparse(url)
+
+        # Normalize domain (lowercase, remove www.)
+        domain = parsed.netloc.lower()
+        if domain.startswith('www.'):
+            domain = domain[4:]
+
+        # Keep only essential parameters
+        params = parse_qs(parsed.query)
+        filtered_params = {
+            k: v for k, v in params.items()
+            if k.lower() not in settings.TRACKING_PARAMS
+        }
+
+        # Sort parameters for consistency
+        sorted_query = urlencode(sorted(filtered_params.items()), doseq=True)
+
+        return urlunparse((
+            parsed.scheme.lower(),
+            domain,
+            parsed.path.rstrip('/'),
+            '',  # params
+            sorted_query,
+            ''   # fragment
+        ))
+
+    except Exception as e:
+        logger.error(f"URL normalization failed: {str(e)}")
+        return url
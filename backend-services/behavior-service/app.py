@@ -5,6 +5,7 @@ Detects suspicious patterns in review behavior and temporal anomalies
 from fastapi import FastAPI
 import logging
 
+from common.deadline import DeadlineMiddleware, DeadlineExceeded, deadline_exceeded_handler
 from routes import analysis, health
 
 # Configure logging
@@ -18,6 +19,10 @@ app = FastAPI(
     description="Behavioral analysis for detecting fake review patterns"
 )
 
+# Abort work for callers that have given up (X-Deadline-Ms from the gateway)
+app.add_middleware(DeadlineMiddleware)
+app.add_exception_handler(DeadlineExceeded, deadline_exceeded_handler)
+
 # Include routers
 app.include_router(analysis.router, tags=["Analysis"])
 app.include_router(health.router, tags=["Health"])
@@ -45,6 +45,10 @@ class Settings(BaseSettings):
         "%d/%m/%Y"
     ]
     
+    # Incremental analysis sessions (reviews sent in chunks)
+    SESSION_TTL_SECONDS: int = 300  # Idle time before an open session is dropped
+    MAX_SESSIONS: int = 200
+    
     class Config:
         env_file = ".env"
         case_sensitive = True
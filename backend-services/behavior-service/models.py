@@ -53,4 +53,10 @@ class BehaviorResponse(BaseModel):
     reviewer_patterns: List[ReviewerPattern]
     rating_distribution: RatingDistribution
     aggregate_metrics: Dict[str, Any]
-    timestamp: str
\ No newline at end of file
+    timestamp: str
+    analysis_depth: str = "full"  # full, or quick (rating distribution and verification rate only)
+
+
+class SessionResponse(BaseModel):
+    session_id: str
+    reviews_received: int
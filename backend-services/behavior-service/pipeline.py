@@ -14,6 +14,7 @@ from models import (
 )
 from analyzers import TemporalAnalyzer, ReviewerAnalyzer, RatingAnalyzer
 from config import settings
+from common.deadline import DeadlineGuard
 
 logger = logging.getLogger(__name__)
 
@@ -38,13 +39,19 @@ class BehaviorPipeline:
         """
         logger.info(f"Analyzing behavior patterns for {len(reviews)} reviews...")
         
+        # Abandon the remaining analyzers once the request's deadline has passed
+        guard = DeadlineGuard(3)
+        
         # Temporal patterns
+        guard.check(0)
         temporal_patterns = self.temporal_analyzer.analyze(reviews)
         
         # Reviewer patterns
+        guard.check(1)
         reviewer_patterns = self.reviewer_analyzer.analyze(reviews)
         
         # Rating distribution
+        guard.check(2)
         rating_dist = self.rating_analyzer.analyze(reviews)
         
         # Calculate aggregate metrics
@@ -101,15 +108,7 @@ class BehaviorPipeline:
             reviewer_suspicion = sum(p.suspicion_score for p in reviewer_patterns) / len(reviewer_patterns)
         
         # Rating suspicion (based on polarization and 5-star concentration)
-        rating_suspicion = 0.0
-        if rating_dist.total > 0:
-            five_star_ratio = rating_dist.five_star / rating_dist.total
-            # High 5-star concentration is suspicious
-            if five_star_ratio > settings.HIGH_FIVE_STAR_THRESHOLD:
-                rating_suspicion = min(1.0, five_star_ratio)
-            
-            # Add polarization
-            rating_suspicion = max(rating_suspicion, rating_dist.polarization_score)
+        rating_suspicion = self._rating_suspicion(rating_dist)
         
         # Overall behavior score (0-100)
         behavior_score = (
@@ -119,8 +118,7 @@ class BehaviorPipeline:
         ) * 100
         
         # Verification rate
-        verified_count = sum(1 for r in reviews if r.verified_purchase)
-        verification_rate = (verified_count / len(reviews) * 100) if reviews else 0
+        verification_rate = self._verification_rate(reviews)
         
         return {
             "temporal_suspicion": round(temporal_suspicion, 3),
@@ -134,4 +132,73 @@ class BehaviorPipeline:
             "verification_rate": round(verification_rate, 2),
             "polarization_detected": rating_dist.polarization_score > 0.5,
             "five_star_concentration": round((rating_dist.five_star / rating_dist.total * 100) if rating_dist.total > 0 else 0, 2)
-        }
\ No newline at end of file
+        }
+    
+    def analyze_ratings(self, reviews: List[Review]) -> BehaviorResponse:
+        """
+        Quick analysis for provisional scores: rating distribution and verification rate only
+        
+        Skips the temporal and reviewer analyzers.
+        
+        Args:
+            reviews: List of reviews to analyze
+        
+        Returns:
+            BehaviorResponse without patterns (analysis_depth "quick")
+        """
+        rating_dist = self.rating_analyzer.analyze(reviews)
+        
+        return BehaviorResponse(
+            success=True,
+            total_reviews=len(reviews),
+            temporal_patterns=[],
+            reviewer_patterns=[],
+            rating_distribution=rating_dist,
+            aggregate_metrics={
+                "rating_suspicion": round(self._rating_suspicion(rating_dist), 3),
+                "verification_rate": round(self._verification_rate(reviews), 2),
+                "polarization_detected": rating_dist.polarization_score > 0.5,
+                "five_star_concentration": round((rating_dist.five_star / rating_dist.total * 100) if rating_dist.total > 0 else 0, 2)
+            },
+            timestamp=datetime.utcnow().isoformat(),
+            analysis_depth="quick"
+        )
+    
+    def _rating_suspicion(self, rating_dist: RatingDistribution) -> float:
+        """Suspicion (0-1) from 5-star concentration and polarization"""
+        rating_suspicion = 0.0
+        if rating_dist.total > 0:
+            five_star_ratio = rating_dist.five_star / rating_dist.total
+            # High 5-star concentration is suspicious
+            if five_star_ratio > settings.HIGH_FIVE_STAR_THRESHOLD:
+                rating_suspicion = min(1.0, five_star_ratio)
+            
+            # Add polarization
+            rating_suspicion = max(rating_suspicion, rating_dist.polarization_score)
+        return rating_suspicion
+    
+    def _verification_rate(self, reviews: List[Review]) -> float:
+        """Percentage of reviews from verified purchases"""
+        verified_count = sum(1 for r in reviews if r.verified_purchase)
+        return (verified_count / len(reviews) * 100) if reviews else 0
+
+
+class BehaviorSession:
+    """
+    Behavioral analysis of a product whose reviews arrive in chunks
+    
+    Temporal, reviewer and rating patterns are only meaningful over the
+    full review set, so chunks are collected and every analyzer runs in
+    finish().
+    """
+    
+    def __init__(self):
+        self.reviews: List[Review] = []
+    
+    def add_reviews(self, reviews: List[Review]):
+        """Collect one chunk of reviews"""
+        self.reviews.extend(reviews)
+    
+    def finish(self) -> BehaviorResponse:
+        """Analyze all reviews added so far"""
+        return BehaviorPipeline().analyze_reviews(self.reviews)
@@ -0,0 +1,130 @@
+"""
+Cache index benchmark - URL cache queries on a collection scan vs on the managed indexes
+
+Fills a scratch collection with --entries documents shaped like the URL
+Cache Service's (70% valid, 20% stale, 10% past the grace window), then
+times the service's queries without indexes and again with the indexes
+the service creates on startup:
+
+- /check-cache lookup: find_one by url_hash
+- /stats: valid-entry count and newest entry (sorted by cached_at)
+- /cleanup fallback: entries past the grace window (counted, not deleted,
+  so both runs see the same data)
+
+    python cache_indexes.py --mongo-uri mongodb://localhost:27017 --entries 1000000
+
+Needs pymongo. The scratch collection is dropped afterwards unless --keep.
+"""
+from typing import Dict, Any, List, Callable
+from datetime import datetime, timedelta
+import argparse
+import hashlib
+import random
+import statistics
+import time
+
+from pymongo import MongoClient, ASCENDING
+
+STALE_GRACE_HOURS = 24  # The service's default CACHE_STALE_GRACE_HOURS
+INSERT_BATCH = 10000
+
+
+def build_document(index: int, now: datetime) -> Dict[str, Any]:
+    url = f"https://www.amazon.in/dp/BENCH{index:08d}"
+    roll = random.random()
+    if roll < 0.7:
+        expires_at = now + timedelta(hours=random.uniform(1, 7 * 24))
+    elif roll < 0.9:
+        expires_at = now - timedelta(hours=random.uniform(0, STALE_GRACE_HOURS))
+    else:
+        expires_at = now - timedelta(hours=random.uniform(STALE_GRACE_HOURS, 30 * 24))
+    cached_at = expires_at - timedelta(days=7)
+    return {
+        "url_hash": hashlib.sha256(url.encode()).hexdigest(),
+        "original_url": url,
+        "normalized_url": url,
+        "report": {"trust_score": index % 100, "risk_level": "low", "key_insights": ["Mostly verified purchases"]},
+        "cached_at": cached_at,
+        "expires_at": expires_at,
+        "ttl_days": 7,
+        "created_at": cached_at,
+        "updated_at": cached_at
+    }
+
+
+def fill(collection, entries: int) -> List[str]:
+    """Insert the documents and return their url_hashes"""
+    now = datetime.utcnow()
+    hashes = []
+    for start in range(0, entries, INSERT_BATCH):
+        documents = [build_document(i, now) for i in range(start, min(entries, start + INSERT_BATCH))]
+        collection.insert_many(documents, ordered=False)
+        hashes.extend(document["url_hash"] for document in documents)
+    return hashes
+
+
+def create_indexes(collection):
+    """The indexes URL-cache-Service ensures on startup (db/indexes.py)"""
+    collection.create_index([("url_hash", ASCENDING)], unique=True)
+    collection.create_index([("expires_at", ASCENDING)], expireAfterSeconds=STALE_GRACE_HOURS * 3600)
+    collection.create_index([("cached_at", ASCENDING)])
+
+
+def time_ms(query: Callable[[], Any], repeat: int) -> float:
+    """Median wall time of `repeat` runs, in milliseconds"""
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        query()
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings)
+
+
+def run_queries(collection, hashes: List[str], repeat: int) -> Dict[str, float]:
+    now = datetime.utcnow()
+    cutoff = now - timedelta(hours=STALE_GRACE_HOURS)
+    return {
+        "lookup by url_hash": time_ms(lambda: collection.find_one({"url_hash": random.choice(hashes)}), repeat),
+        "count valid entries": time_ms(lambda: collection.count_documents({"expires_at": {"$gt": now}}), repeat),
+        "newest entry": time_ms(lambda: collection.find_one(sort=[("cached_at", -1)]), repeat),
+        "count past grace": time_ms(lambda: collection.count_documents({"expires_at": {"$lt": cutoff}}), repeat)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--mongo-uri", default="mongodb://localhost:27017")
+    parser.add_argument("--db", default="trustlens_benchmarks")
+    parser.add_argument("--entries", type=int, default=1000000)
+    parser.add_argument("--repeat", type=int, default=20, help="Runs per query (median reported)")
+    parser.add_argument("--keep", action="store_true", help="Keep the scratch collection")
+    args = parser.parse_args()
+
+    collection = MongoClient(args.mongo_uri)[args.db]["cache_index_benchmark"]
+    collection.drop()
+
+    try:
+        started = time.perf_counter()
+        hashes = fill(collection, args.entries)
+        print(f"Inserted {args.entries:,} entries in {time.perf_counter() - started:.1f}s")
+
+        scans = run_queries(collection, hashes, args.repeat)
+
+        started = time.perf_counter()
+        create_indexes(collection)
+        print(f"Built indexes in {time.perf_counter() - started:.1f}s")
+
+        indexed = run_queries(collection, hashes, args.repeat)
+    finally:
+        if not args.keep:
+            collection.drop()
+
+    print()
+    print(f"{'query':<22} {'scan ms':>10} {'index ms':>10} {'speedup':>9}")
+    for name, scan_ms in scans.items():
+        index_ms = indexed[name]
+        print(f"{name:<22} {scan_ms:>10.2f} {index_ms:>10.2f} {scan_ms / max(index_ms, 1e-6):>8.0f}x")
+
+
+if __name__ == "__main__":
+    main()
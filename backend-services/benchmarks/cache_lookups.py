@@ -0,0 +1,127 @@
+"""
+Cache lookup benchmark - single /check-cache calls vs one /check-cache/batch call
+
+Stores --urls reports in a running URL Cache Service (with /store/batch),
+then looks up the same URLs, half of them cached and half not, three ways:
+one /check-cache call after another, --concurrency calls at a time (how
+the gateway resolved batches before), and a single /check-cache/batch
+call. Reports the best and median wall time of --rounds rounds per way.
+
+    uvicorn app:app --port 8001   # in URL-cache-Service
+    python cache_lookups.py --url-cache http://localhost:8001 --urls 1000
+
+Start the service with MEMORY_CACHE_ENABLED=false to measure MongoDB
+lookups rather than the in-memory tier.
+"""
+from typing import Dict, Any, List, Callable, Awaitable
+import argparse
+import asyncio
+import statistics
+import time
+import uuid
+
+import httpx
+
+STORE_CHUNK = 1000  # The service's default BATCH_MAX_URLS
+
+
+def build_report(index: int) -> Dict[str, Any]:
+    """A cached report shaped like the gateway's AnalysisResponse"""
+    return {
+        "success": True,
+        "trust_score": 40 + index % 60,
+        "fake_reviews_percentage": float(index % 35),
+        "risk_level": "low",
+        "score_breakdown": {"nlp_score": 70.0, "behavior_score": 65.0, "statistical_score": 80.0},
+        "key_insights": ["Most reviews are from verified purchases", "Ratings are consistent over time"],
+        "total_reviews_analyzed": 100,
+        "recommendation": "Reviews look trustworthy",
+        "confidence": 0.85
+    }
+
+
+async def seed(client: httpx.AsyncClient, urls: List[str]):
+    for start in range(0, len(urls), STORE_CHUNK):
+        items = [
+            {"url": url, "report": build_report(start + offset)}
+            for offset, url in enumerate(urls[start:start + STORE_CHUNK])
+        ]
+        response = await client.post("/store/batch", json={"items": items})
+        response.raise_for_status()
+
+
+async def lookup_sequential(client: httpx.AsyncClient, urls: List[str]) -> int:
+    hits = 0
+    for url in urls:
+        response = await client.get("/check-cache", params={"url": url})
+        response.raise_for_status()
+        hits += response.json()["cached"]
+    return hits
+
+
+def lookup_concurrent(concurrency: int) -> Callable[[httpx.AsyncClient, List[str]], Awaitable[int]]:
+    async def run(client: httpx.AsyncClient, urls: List[str]) -> int:
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def lookup(url: str) -> bool:
+            async with semaphore:
+                response = await client.get("/check-cache", params={"url": url})
+                response.raise_for_status()
+                return response.json()["cached"]
+
+        return sum(await asyncio.gather(*(lookup(url) for url in urls)))
+    return run
+
+
+async def lookup_batch(client: httpx.AsyncClient, urls: List[str]) -> int:
+    hits = 0
+    for start in range(0, len(urls), STORE_CHUNK):
+        response = await client.post("/check-cache/batch", json={"urls": urls[start:start + STORE_CHUNK]})
+        response.raise_for_status()
+        hits += sum(result["cached"] for result in response.json()["results"])
+    return hits
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url-cache", default="http://localhost:8001", help="URL Cache Service base URL")
+    parser.add_argument("--urls", type=int, default=1000, help="URLs looked up per round")
+    parser.add_argument("--concurrency", type=int, default=20, help="Calls in flight for the concurrent singles")
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+
+    run_id = uuid.uuid4().hex[:8]
+    urls = [f"https://www.amazon.in/dp/CACHE{run_id}{i:06d}" for i in range(args.urls)]
+    cached_urls = urls[::2]
+
+    ways = [
+        ("single, sequential", lookup_sequential),
+        (f"single, {args.concurrency} concurrent", lookup_concurrent(args.concurrency)),
+        ("batch", lookup_batch)
+    ]
+
+    async with httpx.AsyncClient(base_url=args.url_cache, timeout=120.0) as client:
+        await seed(client, cached_urls)
+
+        print(f"{args.urls} lookups ({len(cached_urls)} cached), {args.rounds} rounds")
+        print(f"{'lookups':<24} {'best ms':>10} {'median ms':>10} {'us/URL':>8}")
+        for name, lookup in ways:
+            # Warm-up round: connections, and the service's first queries
+            await lookup(client, urls)
+
+            timings = []
+            for _ in range(args.rounds):
+                started = time.perf_counter()
+                hits = await lookup(client, urls)
+                timings.append(time.perf_counter() - started)
+                assert hits == len(cached_urls), f"{name}: {hits} hits, expected {len(cached_urls)}"
+
+            best = min(timings)
+            print(
+                f"{name:<24} {best * 1000:>10.1f} {statistics.median(timings) * 1000:>10.1f} "
+                f"{best / args.urls * 1e6:>8.0f}"
+            )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,149 @@
+"""
+Deployment mode benchmark - end-to-end latency and CPU per analysis
+
+Runs full (force_refresh) analyses against a running gateway and reports
+latency percentiles and the CPU time spent per analysis by the given
+processes (gateway and, in "services" mode, every downstream service).
+CPU time is read from /proc, so it has to run on the same Linux host.
+
+Usage (start the gateway in one mode, run, then switch modes and repeat):
+
+    PYTHONPATH=.. DEPLOYMENT_MODE=services uvicorn app:app --port 8000
+    python deployment_modes.py --label services --pids <gateway pid>,<service pids...>
+
+    PYTHONPATH=.. DEPLOYMENT_MODE=monolith uvicorn app:app --port 8000
+    python deployment_modes.py --label monolith --pids <gateway pid>
+
+Each run is appended to --output; every run recorded there is printed as a
+comparison table at the end.
+"""
+from typing import Dict, Any, List
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import time
+import uuid
+
+import httpx
+
+CLOCK_TICKS = os.sysconf("SC_CLK_TCK")
+
+
+def cpu_seconds(pids: List[int]) -> float:
+    """User + system CPU time consumed so far by the given processes"""
+    total = 0
+    for pid in pids:
+        with open(f"/proc/{pid}/stat") as f:
+            # The command name may contain spaces, fields start after its closing parenthesis
+            fields = f.read().rsplit(")", 1)[1].split()
+        total += int(fields[11]) + int(fields[12])  # utime, stime
+    return total / CLOCK_TICKS
+
+
+def percentile(samples: List[float], q: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(q / 100 * (len(ordered) - 1))))]
+
+
+async def run_analyses(gateway: str, count: int, concurrency: int, timeout: float) -> Dict[str, Any]:
+    """Send `count` uncached analyses of distinct products, `concurrency` at a time"""
+    latencies: List[float] = []
+    errors: Dict[str, int] = {}
+    semaphore = asyncio.Semaphore(concurrency)
+    run_id = uuid.uuid4().hex[:8]
+
+    async with httpx.AsyncClient(base_url=gateway, timeout=timeout) as client:
+        async def analyze(index: int):
+            payload = {
+                "product_url": f"https://www.amazon.in/dp/BENCH{run_id}{index:05d}",
+                "force_refresh": True
+            }
+            async with semaphore:
+                started = time.perf_counter()
+                try:
+                    response = await client.post("/analyze", json=payload)
+                    outcome = str(response.status_code)
+                except httpx.HTTPError as e:
+                    outcome = type(e).__name__
+                elapsed = time.perf_counter() - started
+
+            if outcome == "200":
+                latencies.append(elapsed)
+            else:
+                errors[outcome] = errors.get(outcome, 0) + 1
+
+        await asyncio.gather(*(analyze(i) for i in range(count)))
+
+    return {"latencies": latencies, "errors": errors}
+
+
+def summarize(label: str, latencies: List[float], errors: Dict[str, int], cpu: float, wall: float) -> Dict[str, Any]:
+    succeeded = len(latencies)
+    return {
+        "label": label,
+        "analyses": succeeded,
+        "errors": errors,
+        "wall_seconds": round(wall, 3),
+        "throughput_per_second": round(succeeded / wall, 2) if wall else 0.0,
+        "latency_mean_ms": round(statistics.mean(latencies) * 1000, 1) if latencies else None,
+        "latency_p50_ms": round(percentile(latencies, 50) * 1000, 1) if latencies else None,
+        "latency_p90_ms": round(percentile(latencies, 90) * 1000, 1) if latencies else None,
+        "latency_p99_ms": round(percentile(latencies, 99) * 1000, 1) if latencies else None,
+        "cpu_seconds": round(cpu, 3),
+        "cpu_ms_per_analysis": round(cpu / succeeded * 1000, 1) if succeeded else None
+    }
+
+
+def print_comparison(results: List[Dict[str, Any]]):
+    columns = [
+        ("label", "mode"), ("analyses", "n"), ("latency_p50_ms", "p50 ms"),
+        ("latency_p90_ms", "p90 ms"), ("latency_p99_ms", "p99 ms"),
+        ("throughput_per_second", "req/s"), ("cpu_ms_per_analysis", "CPU ms/analysis")
+    ]
+    print("  ".join(f"{title:>15}" for _, title in columns))
+    for result in results:
+        print("  ".join(f"{str(result.get(key)):>15}" for key, _ in columns))
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--gateway", default="http://localhost:8000")
+    parser.add_argument("--label", required=True, help="Name of this run, e.g. services or monolith")
+    parser.add_argument("--pids", default="", help="Comma-separated PIDs whose CPU time is counted")
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--warmup", type=int, default=10)
+    parser.add_argument("--timeout", type=float, default=120.0)
+    parser.add_argument("--output", default="deployment_modes.json")
+    args = parser.parse_args()
+
+    pids = [int(pid) for pid in args.pids.split(",") if pid.strip()]
+
+    # Warm-up: imports, model loading, connection pools
+    await run_analyses(args.gateway, args.warmup, args.concurrency, args.timeout)
+
+    cpu_before = cpu_seconds(pids)
+    started = time.perf_counter()
+    run = await run_analyses(args.gateway, args.requests, args.concurrency, args.timeout)
+    wall = time.perf_counter() - started
+    cpu = cpu_seconds(pids) - cpu_before
+
+    result = summarize(args.label, run["latencies"], run["errors"], cpu, wall)
+
+    results = []
+    if os.path.exists(args.output):
+        with open(args.output) as f:
+            results = json.load(f)
+    results = [r for r in results if r["label"] != args.label] + [result]
+    with open(args.output, "w") as f:
+        json.dump(results, f, indent=2)
+
+    print(json.dumps(result, indent=2))
+    print()
+    print_comparison(results)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
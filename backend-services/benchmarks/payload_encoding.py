@@ -0,0 +1,207 @@
+"""
+Payload encoding benchmark - JSON vs msgpack for the inter-service payloads of one analysis
+
+Builds the payloads the gateway exchanges with the NLP, behavior, scoring
+and report services for a product with --reviews reviews (synthetic data
+shaped like the services' models) and reports, per payload and encoding,
+the encoded size and the encode/decode time.
+
+    python payload_encoding.py --reviews 1000
+"""
+from typing import Dict, Any, List, Callable, Tuple
+import argparse
+import json
+import random
+import timeit
+
+import msgpack
+
+SAMPLE_TEXTS = [
+    "Great product! Highly recommend for daily use.",
+    "I've been using this for 3 months now and it's held up really well. The quality is good but the price is a bit high.",
+    "Works exactly as advertised. Shipping took a week which was reasonable. No complaints so far.",
+    "The build quality is solid and it does what it's supposed to. Only minor issue is the instructions could be clearer.",
+    "AMAZING PRODUCT!!! BUY NOW!!! BEST EVER!!!",
+    "Don't waste your money. Very disappointed.",
+]
+FLAGS = ["excessive_caps", "excessive_punctuation", "generic_text", "promotional_language", "very_short"]
+
+
+def build_reviews(count: int) -> List[Dict[str, Any]]:
+    """Reviews as returned by the Scraper Service"""
+    return [
+        {
+            "review_id": f"review_{i}",
+            "reviewer_name": f"Customer {i % 400}",
+            "rating": float(random.randint(1, 5)),
+            "title": random.choice(["Great!", "Not bad", "Disappointed", "Worth it"]),
+            "text": random.choice(SAMPLE_TEXTS),
+            "date": f"2024-{random.randint(1, 12):02d}-{random.randint(1, 28):02d}",
+            "verified_purchase": random.random() < 0.7,
+            "helpful_count": random.randint(0, 50)
+        }
+        for i in range(count)
+    ]
+
+
+def build_nlp_response(reviews: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """NLP Service /analyze response: one analysis per review plus aggregates"""
+    analyses = [
+        {
+            "review_id": review["review_id"],
+            "sentiment_score": round(random.uniform(-1, 1), 3),
+            "sentiment_label": random.choice(["positive", "negative", "neutral"]),
+            "sentiment_confidence": round(random.random(), 3),
+            "fake_probability": round(random.random(), 3),
+            "flags": random.sample(FLAGS, random.randint(0, 2)),
+            "text_quality_score": round(random.random(), 3),
+            "promotional_score": round(random.random(), 3),
+            "readability_score": round(random.random(), 3),
+            "subjectivity_score": round(random.random(), 3),
+            "lexical_diversity": round(random.random(), 3)
+        }
+        for review in reviews
+    ]
+    clusters = [
+        {
+            "cluster_id": i,
+            "review_ids": [r["review_id"] for r in reviews[i::50][:10]],
+            "similarity_score": round(random.uniform(0.8, 1), 3),
+            "sample_text": SAMPLE_TEXTS[i % len(SAMPLE_TEXTS)]
+        }
+        for i in range(20)
+    ]
+    return {
+        "success": True,
+        "total_reviews": len(reviews),
+        "analyses": analyses,
+        "similarity_clusters": clusters,
+        "aggregate_metrics": {
+            "average_fake_probability": 0.412,
+            "average_sentiment": 0.231,
+            "sentiment_distribution": {"positive": 540, "negative": 260, "neutral": 200},
+            "high_risk_reviews_count": 180,
+            "similarity_clusters_count": len(clusters),
+            "common_flags": {flag: random.randint(10, 200) for flag in FLAGS},
+            "nlp_fake_score": 41.2
+        },
+        "timestamp": "2024-06-01T12:00:00"
+    }
+
+
+def build_behavior_response(reviews: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Behavior Service /analyze response"""
+    return {
+        "success": True,
+        "total_reviews": len(reviews),
+        "temporal_patterns": [
+            {
+                "pattern_type": "burst",
+                "time_window": f"2024-{month:02d}",
+                "review_count": random.randint(20, 80),
+                "average_rating": 4.6,
+                "suspicion_score": 0.7,
+                "description": "Unusual number of reviews in a short period"
+            }
+            for month in range(1, 6)
+        ],
+        "reviewer_patterns": [
+            {
+                "reviewer_name": f"Customer {i}",
+                "review_count": 3,
+                "average_rating": 5.0,
+                "rating_variance": 0.0,
+                "suspicion_score": 0.6,
+                "flags": ["multiple_reviews"]
+            }
+            for i in range(20)
+        ],
+        "rating_distribution": {
+            "one_star": 120, "two_star": 80, "three_star": 150, "four_star": 250,
+            "five_star": 400, "total": 1000, "polarization_score": 0.52
+        },
+        "aggregate_metrics": {"behavior_fake_score": 38.5, "verification_rate": 0.7, "total_reviews": len(reviews)},
+        "timestamp": "2024-06-01T12:00:00"
+    }
+
+
+def scoring_payload(nlp: Dict[str, Any], behavior: Dict[str, Any], trimmed: bool) -> Dict[str, Any]:
+    nlp_results = nlp
+    if trimmed:
+        nlp_results = {k: v for k, v in nlp.items() if k not in ("analyses", "similarity_clusters")}
+    return {
+        "nlp_results": nlp_results,
+        "behavior_results": behavior,
+        "product_metadata": {"product_name": "Benchmark Product", "platform": "amazon", "average_rating": 3.7}
+    }
+
+
+ENCODINGS: Dict[str, Tuple[Callable[[Any], bytes], Callable[[bytes], Any]]] = {
+    "json": (lambda obj: json.dumps(obj).encode("utf-8"), json.loads),
+    "msgpack": (msgpack.packb, msgpack.unpackb)
+}
+
+
+def measure(payload: Any, repeat: int) -> Dict[str, Dict[str, float]]:
+    """Size and best-of-`repeat` encode/decode time per encoding"""
+    results = {}
+    for name, (encode, decode) in ENCODINGS.items():
+        encoded = encode(payload)
+        assert decode(encoded) == payload
+        results[name] = {
+            "bytes": len(encoded),
+            "encode_ms": min(timeit.repeat(lambda: encode(payload), number=1, repeat=repeat)) * 1000,
+            "decode_ms": min(timeit.repeat(lambda: decode(encoded), number=1, repeat=repeat)) * 1000
+        }
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--reviews", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    reviews = build_reviews(args.reviews)
+    nlp = build_nlp_response(reviews)
+    behavior = build_behavior_response(reviews)
+
+    payloads = {
+        "analyze request (x2: nlp, behavior)": {"reviews": reviews},
+        "nlp response": nlp,
+        "behavior response": behavior,
+        "score request, full nlp": scoring_payload(nlp, behavior, trimmed=False),
+        "score request, aggregates": scoring_payload(nlp, behavior, trimmed=True)
+    }
+
+    print(f"{args.reviews} reviews, best of {args.repeat}")
+    print(f"{'payload':<38}{'encoding':>9}{'bytes':>10}{'encode ms':>11}{'decode ms':>11}")
+    measured = {}
+    for label, payload in payloads.items():
+        measured[label] = measure(payload, args.repeat)
+        for encoding, result in measured[label].items():
+            print(
+                f"{label:<38}{encoding:>9}{result['bytes']:>10}"
+                f"{result['encode_ms']:>11.2f}{result['decode_ms']:>11.2f}"
+            )
+
+    # Bytes on the wire for one analysis (request bodies + responses)
+    def per_analysis(encoding: str, score_label: str) -> int:
+        return (
+            2 * measured["analyze request (x2: nlp, behavior)"][encoding]["bytes"]
+            + measured["nlp response"][encoding]["bytes"]
+            + measured["behavior response"][encoding]["bytes"]
+            + measured[score_label][encoding]["bytes"]
+        )
+
+    before = per_analysis("json", "score request, full nlp")
+    after = per_analysis("msgpack", "score request, aggregates")
+    print()
+    print(f"per analysis: {before} bytes (JSON, full nlp) -> {after} bytes (msgpack, aggregates), "
+          f"{(1 - after / before) * 100:.1f}% less")
+
+
+if __name__ == "__main__":
+    main()
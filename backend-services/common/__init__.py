@@ -0,0 +1,10 @@
+"""
+Modules shared by the services (negotiation, request deadlines, analysis sessions)
+
+Each service imports them as `common.<module>`. The service images copy
+this directory next to the service code (see the services' Dockerfiles,
+built from backend-services/); when running a service directly, put
+backend-services/ on PYTHONPATH:
+
+    cd nlp-service && PYTHONPATH=.. uvicorn app:app --port 8003
+"""
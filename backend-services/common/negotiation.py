@@ -0,0 +1,71 @@
+"""
+Content negotiation - msgpack request and response bodies, with JSON as the fallback
+
+Routes built with MsgPackRoute accept a msgpack body when it is sent with
+Content-Type: application/msgpack, and answer in msgpack when the Accept
+header lists application/msgpack. Everything else stays JSON.
+"""
+from contextvars import ContextVar
+from typing import Any, Callable
+from fastapi import Request, Response
+from fastapi.responses import JSONResponse
+from fastapi.routing import APIRoute
+import msgpack
+
+MSGPACK_MEDIA_TYPES = ("application/msgpack", "application/x-msgpack")
+
+# Whether the response of the request being handled is msgpack-encoded
+_respond_with_msgpack: ContextVar[bool] = ContextVar("respond_with_msgpack", default=False)
+
+
+def is_msgpack(header_value: str) -> bool:
+    return any(media_type in header_value for media_type in MSGPACK_MEDIA_TYPES)
+
+
+class MsgPackRequest(Request):
+    """Request whose msgpack body is decoded where FastAPI expects JSON"""
+
+    async def json(self) -> Any:
+        if not hasattr(self, "_json"):
+            self._json = msgpack.unpackb(await self.body())
+        return self._json
+
+
+class NegotiatedResponse(JSONResponse):
+    """JSON response, or msgpack when the client asked for it"""
+
+    def render(self, content: Any) -> bytes:
+        if _respond_with_msgpack.get():
+            self.media_type = MSGPACK_MEDIA_TYPES[0]
+            return msgpack.packb(content)
+        return super().render(content)
+
+
+class MsgPackRoute(APIRoute):
+    """
+    Route with msgpack content negotiation
+
+    Use together with NegotiatedResponse:
+    APIRouter(route_class=MsgPackRoute, default_response_class=NegotiatedResponse)
+    """
+
+    def get_route_handler(self) -> Callable:
+        route_handler = super().get_route_handler()
+
+        async def negotiated_route_handler(request: Request) -> Response:
+            if is_msgpack(request.headers.get("content-type", "")):
+                request = MsgPackRequest(_with_json_content_type(request.scope), request.receive)
+
+            token = _respond_with_msgpack.set(is_msgpack(request.headers.get("accept", "")))
+            try:
+                return await route_handler(request)
+            finally:
+                _respond_with_msgpack.reset(token)
+
+        return negotiated_route_handler
+
+
+def _with_json_content_type(scope: dict) -> dict:
+    """Copy of the scope announcing a JSON body, so FastAPI hands the decoded body to validation"""
+    headers = [(name, value) for name, value in scope["headers"] if name != b"content-type"]
+    return {**scope, "headers": headers + [(b"content-type", b"application/json")]}
@@ -0,0 +1,65 @@
+"""
+Analysis sessions - incremental analyses kept in memory while their reviews arrive in chunks
+
+A session lives in the process that created it, so every chunk of a
+session must reach the same instance (callers fall back to a one-shot
+analysis when it answers 404). Sessions that are neither finished nor
+discarded expire ttl_seconds after their last chunk.
+"""
+from typing import Any, Callable, Dict, Optional
+from collections import OrderedDict
+import logging
+import time
+import uuid
+
+logger = logging.getLogger(__name__)
+
+
+class SessionStore:
+    """Open sessions by id, oldest first, capped at max_sessions"""
+
+    def __init__(self, factory: Callable[[], Any], max_sessions: int, ttl_seconds: float):
+        self._factory = factory
+        self.max_sessions = max_sessions
+        self.ttl_seconds = ttl_seconds
+        self._sessions: "OrderedDict[str, Any]" = OrderedDict()
+        self._last_used: Dict[str, float] = {}
+
+    def create(self) -> str:
+        """Open a new session and return its id"""
+        self._evict_expired()
+        while len(self._sessions) >= self.max_sessions:
+            session_id, _ = self._sessions.popitem(last=False)
+            self._last_used.pop(session_id, None)
+            logger.warning(f"Session limit reached, dropped oldest session {session_id}")
+
+        session_id = uuid.uuid4().hex
+        self._sessions[session_id] = self._factory()
+        self._last_used[session_id] = time.monotonic()
+        return session_id
+
+    def get(self, session_id: str) -> Optional[Any]:
+        """Return an open session (None if unknown or expired) and mark it as used"""
+        self._evict_expired()
+        session = self._sessions.get(session_id)
+        if session is not None:
+            self._sessions.move_to_end(session_id)
+            self._last_used[session_id] = time.monotonic()
+        return session
+
+    def pop(self, session_id: str) -> Optional[Any]:
+        """Remove and return a session (None if unknown or expired)"""
+        self._last_used.pop(session_id, None)
+        return self._sessions.pop(session_id, None)
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def _evict_expired(self):
+        cutoff = time.monotonic() - self.ttl_seconds
+        while self._sessions:
+            session_id = next(iter(self._sessions))
+            if self._last_used[session_id] > cutoff:
+                break
+            self.pop(session_id)
+            logger.info(f"Session {session_id} expired")
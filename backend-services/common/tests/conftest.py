@@ -0,0 +1,7 @@
+"""
+Test setup - the shared modules are imported as `common.<module>`, as in the services
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
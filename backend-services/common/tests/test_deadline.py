@@ -0,0 +1,61 @@
+"""
+Aborting work once the caller's X-Deadline-Ms budget has run out
+"""
+import time
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from common.deadline import (
+    DEADLINE_EXCEEDED_HEADER,
+    DeadlineExceeded,
+    DeadlineGuard,
+    DeadlineMiddleware,
+    deadline_exceeded_handler,
+    deadline_stats
+)
+
+
+def _client() -> TestClient:
+    app = FastAPI()
+    app.add_middleware(DeadlineMiddleware)
+    app.add_exception_handler(DeadlineExceeded, deadline_exceeded_handler)
+
+    @app.post("/work")
+    def work(units: int = 10, unit_seconds: float = 0.02):
+        guard = DeadlineGuard(units)
+        for done in range(units):
+            guard.check(done)
+            time.sleep(unit_seconds)
+        return {"done": units}
+
+    return TestClient(app)
+
+
+def test_work_is_abandoned_once_the_deadline_passes():
+    aborted = deadline_stats.aborted
+
+    response = _client().post("/work", headers={"X-Deadline-Ms": "50"})
+
+    assert response.status_code == 504
+    assert response.headers[DEADLINE_EXCEEDED_HEADER] == "true"
+    assert "of 10 units" in response.json()["detail"]
+    assert deadline_stats.aborted == aborted + 1
+
+
+def test_request_arriving_after_its_deadline_is_rejected():
+    rejected = deadline_stats.rejected_on_arrival
+
+    response = _client().post("/work", headers={"X-Deadline-Ms": "0"})
+
+    assert response.status_code == 504
+    assert response.headers[DEADLINE_EXCEEDED_HEADER] == "true"
+    assert deadline_stats.rejected_on_arrival == rejected + 1
+
+
+def test_work_without_a_deadline_runs_to_completion():
+    response = _client().post("/work", params={"units": 3})
+
+    assert response.status_code == 200
+    assert response.json() == {"done": 3}
+    assert DEADLINE_EXCEEDED_HEADER not in response.headers
@@ -0,0 +1,57 @@
+"""
+msgpack content negotiation with JSON as the fallback
+"""
+from typing import List
+
+from fastapi import APIRouter, FastAPI
+from fastapi.testclient import TestClient
+from pydantic import BaseModel
+import msgpack
+
+from common.negotiation import MsgPackRoute, NegotiatedResponse
+
+
+class EchoRequest(BaseModel):
+    reviews: List[str]
+
+
+def _client() -> TestClient:
+    router = APIRouter(route_class=MsgPackRoute, default_response_class=NegotiatedResponse)
+
+    @router.post("/echo")
+    async def echo(request: EchoRequest):
+        return {"count": len(request.reviews), "reviews": request.reviews}
+
+    app = FastAPI()
+    app.include_router(router)
+    return TestClient(app)
+
+
+def test_msgpack_request_gets_a_msgpack_response():
+    response = _client().post(
+        "/echo",
+        content=msgpack.packb({"reviews": ["great", "fake"]}),
+        headers={"Content-Type": "application/msgpack", "Accept": "application/msgpack"}
+    )
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/msgpack")
+    assert msgpack.unpackb(response.content) == {"count": 2, "reviews": ["great", "fake"]}
+
+
+def test_json_request_gets_a_json_response():
+    response = _client().post("/echo", json={"reviews": ["great"]})
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/json")
+    assert response.json() == {"count": 1, "reviews": ["great"]}
+
+
+def test_msgpack_body_is_validated_like_json():
+    response = _client().post(
+        "/echo",
+        content=msgpack.packb({"reviews": "not a list"}),
+        headers={"Content-Type": "application/msgpack"}
+    )
+
+    assert response.status_code == 422
@@ -0,0 +1,40 @@
+"""
+Session store limits: oldest sessions dropped at the cap, idle ones expired
+"""
+import common.sessions as sessions_module
+from common.sessions import SessionStore
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_oldest_session_is_dropped_at_the_cap():
+    store = SessionStore(list, max_sessions=2, ttl_seconds=300)
+    first, second = store.create(), store.create()
+    store.get(first)  # Used again: second is now the oldest
+
+    third = store.create()
+
+    assert len(store) == 2
+    assert store.get(second) is None
+    assert store.get(first) == [] and store.get(third) == []
+
+
+def test_idle_sessions_expire_and_used_ones_stay(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(sessions_module.time, "monotonic", clock)
+    store = SessionStore(list, max_sessions=10, ttl_seconds=60)
+    idle, active = store.create(), store.create()
+
+    clock.now += 40
+    store.get(active)
+    clock.now += 40
+
+    assert store.get(idle) is None
+    assert store.get(active) == []
+    assert store.pop(active) == [] and len(store) == 0
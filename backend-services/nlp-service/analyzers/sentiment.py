@@ -69,6 +69,30 @@ class MLSentimentAnalyzer:
         
         return round(score, 3), label, round(confidence, 3)
     
+    def analyze_vader(self, text: str) -> Tuple[float, str]:
+        """
+        VADER-only sentiment (no TextBlob pass), for quick analyses
+        
+        Args:
+            text: Review text to analyze
+        
+        Returns:
+            Tuple of (score, label) on the same scale and labels as analyze()
+        """
+        if not text or len(text.strip()) < 5:
+            return 0.0, 'neutral'
+        
+        score = self.vader.polarity_scores(text)['compound']
+        
+        if score > settings.POSITIVE_THRESHOLD:
+            label = 'positive'
+        elif score < settings.NEGATIVE_THRESHOLD:
+            label = 'negative'
+        else:
+            label = 'neutral'
+        
+        return round(score, 3), label
+    
     def get_subjectivity(self, text: str) -> float:
         """
         Measure text subjectivity
@@ -89,6 +89,10 @@ class Settings(BaseSettings):
         r'dm.*me'
     ]
     
+    # Incremental analysis sessions (reviews sent in chunks)
+    SESSION_TTL_SECONDS: int = 300  # Idle time before an open session is dropped
+    MAX_SESSIONS: int = 200
+    
     class Config:
         env_file = ".env"
         case_sensitive = True
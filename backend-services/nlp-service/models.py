@@ -44,6 +44,7 @@ class NLPResponse(BaseModel):
     similarity_clusters: List[SimilarityCluster]
     aggregate_metrics: Dict[str, Any]
     timestamp: str
+    analysis_depth: str = "full"  # full, or quick (VADER sentiment only, no per-review analyses)
 
 
 class SentimentRequest(BaseModel):
@@ -55,4 +56,9 @@ class SentimentResponse(BaseModel):
     sentiment_score: float
     sentiment_label: str
     confidence: Optional[float] = None
-    subjectivity: Optional[float] = None
\ No newline at end of file
+    subjectivity: Optional[float] = None
+
+
+class SessionResponse(BaseModel):
+    session_id: str
+    reviews_received: int
@@ -16,6 +16,7 @@ from analyzers import (
     MLSimilarityDetector
 )
 from config import settings
+from common.deadline import DeadlineGuard
 from preprocessor import TextPreprocessor
 
 logger = logging.getLogger(__name__)
@@ -44,38 +45,74 @@ class NLPPipeline:
         """
         logger.info(f"ML Analysis: Processing {len(reviews)} reviews...")
         
-        analyses = []
+        analyses = self.analyze_each(reviews)
+        
+        return self.finalize(reviews, analyses)
+    
+    def analyze_each(self, reviews: List[Review]) -> List[ReviewAnalysis]:
+        """
+        Run the per-review analyses, checking the request deadline between reviews
         
+        Raises:
+            DeadlineExceeded: If the request's deadline passes before every review is analyzed
+        """
+        guard = DeadlineGuard(len(reviews))
+        analyses = []
         for review in reviews:
-            # Sentiment analysis (ML)
-            sentiment_score, sentiment_label, confidence = self.sentiment_analyzer.analyze(review.text)
-            
-            # Subjectivity (ML)
-            subjectivity = self.sentiment_analyzer.get_subjectivity(review.text)
-            
-            # Fake detection (ML)
-            fake_prob, flags = self.fake_detector.analyze(review, sentiment_score)
-            
-            # Text quality (ML)
-            quality_metrics = self.quality_analyzer.analyze(review.text)
-            
-            # Promotional score (Rule-based - no ML version)
-            promo_score = self.promo_scorer.analyze(review.text)
-            
-            analyses.append(ReviewAnalysis(
-                review_id=review.review_id,
-                sentiment_score=sentiment_score,
-                sentiment_label=sentiment_label,
-                sentiment_confidence=confidence,
-                fake_probability=fake_prob,
-                flags=flags,
-                text_quality_score=quality_metrics['overall'],
-                promotional_score=promo_score,
-                readability_score=quality_metrics['readability'],
-                subjectivity_score=subjectivity,
-                lexical_diversity=quality_metrics['lexical_diversity']
-            ))
+            guard.check(len(analyses))
+            analyses.append(self.analyze_review(review))
+        return analyses
+    
+    def analyze_review(self, review: Review) -> ReviewAnalysis:
+        """
+        Run the per-review analyses (sentiment, fake detection, quality, promotion)
+        
+        Args:
+            review: Review to analyze
+        
+        Returns:
+            ReviewAnalysis for the review
+        """
+        # Sentiment analysis (ML)
+        sentiment_score, sentiment_label, confidence = self.sentiment_analyzer.analyze(review.text)
+        
+        # Subjectivity (ML)
+        subjectivity = self.sentiment_analyzer.get_subjectivity(review.text)
+        
+        # Fake detection (ML)
+        fake_prob, flags = self.fake_detector.analyze(review, sentiment_score)
         
+        # Text quality (ML)
+        quality_metrics = self.quality_analyzer.analyze(review.text)
+        
+        # Promotional score (Rule-based - no ML version)
+        promo_score = self.promo_scorer.analyze(review.text)
+        
+        return ReviewAnalysis(
+            review_id=review.review_id,
+            sentiment_score=sentiment_score,
+            sentiment_label=sentiment_label,
+            sentiment_confidence=confidence,
+            fake_probability=fake_prob,
+            flags=flags,
+            text_quality_score=quality_metrics['overall'],
+            promotional_score=promo_score,
+            readability_score=quality_metrics['readability'],
+            subjectivity_score=subjectivity,
+            lexical_diversity=quality_metrics['lexical_diversity']
+        )
+    
+    def finalize(self, reviews: List[Review], analyses: List[ReviewAnalysis]) -> NLPResponse:
+        """
+        Run the analyses that need every review (similarity clusters, aggregates)
+        
+        Args:
+            reviews: All reviews of the product
+            analyses: Per-review analyses, in the same order
+        
+        Returns:
+            NLPResponse with all analyses and metrics
+        """
         # Similarity detection using ML (TF-IDF)
         similarity_clusters = self.similarity_detector.find_similar_reviews(
             reviews, 
@@ -169,4 +206,91 @@ class NLPPipeline:
                 "low_quality_count": int(len(df[df['quality_score'] < 0.3])),
                 "high_subjectivity_count": int(len(df[df['subjectivity'] > 0.7]))
             }
-        }
\ No newline at end of file
+        }
+
+
+class QuickNLPPipeline:
+    """
+    Sentiment-only analysis for provisional scores
+    
+    A single VADER pass per review: no TextBlob, fake detection, quality or
+    similarity analysis, and no per-review results in the response.
+    """
+    
+    def __init__(self):
+        self.sentiment_analyzer = MLSentimentAnalyzer()
+    
+    def analyze_reviews(self, reviews: List[Review]) -> NLPResponse:
+        """
+        Run the quick analysis
+        
+        Args:
+            reviews: List of reviews to analyze
+        
+        Returns:
+            NLPResponse with sentiment aggregates only (analysis_depth "quick")
+        """
+        scores = []
+        labels = Counter()
+        mismatched = 0
+        
+        for review in reviews:
+            score, label = self.sentiment_analyzer.analyze_vader(review.text)
+            scores.append(score)
+            labels[label] += 1
+            if self._contradicts_rating(review.rating, score):
+                mismatched += 1
+        
+        aggregate = {}
+        if reviews:
+            aggregate = {
+                "average_sentiment": round(sum(scores) / len(scores), 3),
+                "sentiment_distribution": dict(labels),
+                "sentiment_rating_mismatch_count": mismatched,
+                "sentiment_rating_mismatch_percentage": round(mismatched / len(reviews) * 100, 2)
+            }
+        
+        return NLPResponse(
+            success=True,
+            total_reviews=len(reviews),
+            analyses=[],
+            similarity_clusters=[],
+            aggregate_metrics=aggregate,
+            timestamp=datetime.utcnow().isoformat(),
+            analysis_depth="quick"
+        )
+    
+    def _contradicts_rating(self, rating: float, sentiment_score: float) -> bool:
+        """Same rule as the fake detector's sentiment-rating mismatch flag"""
+        if rating >= 4:
+            expected_sentiment = 0.5
+        elif rating <= 2:
+            expected_sentiment = -0.5
+        else:
+            expected_sentiment = 0.0
+        return abs(expected_sentiment - sentiment_score) > 0.7
+
+
+class NLPSession:
+    """
+    Incremental NLP analysis of a product whose reviews arrive in chunks
+    
+    Each chunk gets its per-review analyses as soon as it is added; the
+    similarity clusters and aggregates, which need every review, are
+    computed by finish().
+    """
+    
+    def __init__(self):
+        self.pipeline = NLPPipeline()
+        self.reviews: List[Review] = []
+        self.analyses: List[ReviewAnalysis] = []
+    
+    def add_reviews(self, reviews: List[Review]):
+        """Analyze one chunk of reviews"""
+        self.analyses.extend(self.pipeline.analyze_each(reviews))
+        self.reviews.extend(reviews)
+    
+    def finish(self) -> NLPResponse:
+        """Finalize the analysis over all reviews added so far"""
+        logger.info(f"ML Analysis: Finalizing session with {len(self.reviews)} reviews...")
+        return self.pipeline.finalize(self.reviews, self.analyses)
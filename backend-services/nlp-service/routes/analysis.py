@@ -4,12 +4,19 @@ NLP analysis routes - ML-powered
 from fastapi import APIRouter, HTTPException, status
 import logging
 
-from models import AnalyzeRequest, NLPResponse, SentimentRequest, SentimentResponse
-from pipeline import NLPPipeline
+from models import AnalyzeRequest, NLPResponse, SentimentRequest, SentimentResponse, SessionResponse
+from pipeline import NLPPipeline, NLPSession, QuickNLPPipeline
 from analyzers import MLSentimentAnalyzer
+from config import settings
+from common.negotiation import MsgPackRoute, NegotiatedResponse
+from common.sessions import SessionStore
+from common.deadline import DeadlineExceeded
 
 logger = logging.getLogger(__name__)
-router = APIRouter()
+router = APIRouter(route_class=MsgPackRoute, default_response_class=NegotiatedResponse)
+
+# Incremental analyses, fed chunk by chunk while the product is being scraped
+session_store = SessionStore(NLPSession, settings.MAX_SESSIONS, settings.SESSION_TTL_SECONDS)
 
 
 @router.post("/analyze", response_model=NLPResponse)
@@ -49,7 +56,7 @@ async def analyze_reviews(request: AnalyzeRequest):
         
         return result
         
-    except HTTPException:
+    except (HTTPException, DeadlineExceeded):
         raise
     except Exception as e:
         logger.error(f"ML analysis failed: {str(e)}", exc_info=True)
@@ -59,6 +66,31 @@ async def analyze_reviews(request: AnalyzeRequest):
         )
 
 
+@router.post("/analyze/quick", response_model=NLPResponse)
+async def quick_analyze_reviews(request: AnalyzeRequest):
+    """
+    Quick sentiment-only analysis for provisional trust scores
+    
+    One VADER pass per review; returns sentiment aggregates and the share of
+    reviews whose sentiment contradicts their rating, without per-review
+    analyses or similarity clusters (analysis_depth "quick").
+    """
+    if not request.reviews:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="No reviews provided"
+        )
+    
+    try:
+        return QuickNLPPipeline().analyze_reviews(request.reviews)
+    except Exception as e:
+        logger.error(f"Quick analysis failed: {str(e)}", exc_info=True)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Quick analysis failed: {str(e)}"
+        )
+
+
 @router.post("/sentiment", response_model=SentimentResponse)
 async def analyze_sentiment(request: SentimentRequest):
     """Quick ML-based sentiment analysis"""
@@ -79,4 +111,81 @@ async def analyze_sentiment(request: SentimentRequest):
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Sentiment analysis failed: {str(e)}"
-        )
\ No newline at end of file
+        )
+
+
+@router.post("/sessions", response_model=SessionResponse)
+async def create_session():
+    """
+    Open an incremental analysis session
+    
+    Send the reviews to /sessions/{session_id}/chunks as they arrive, then
+    call /sessions/{session_id}/finish for the result.
+    """
+    return SessionResponse(session_id=session_store.create(), reviews_received=0)
+
+
+@router.post("/sessions/{session_id}/chunks", response_model=SessionResponse)
+async def add_session_chunk(session_id: str, request: AnalyzeRequest):
+    """
+    Add a chunk of reviews to a session
+    
+    Runs the per-review analyses of the chunk right away.
+    """
+    session = session_store.get(session_id)
+    if session is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Session {session_id} not found or expired"
+        )
+
+    try:
+        session.add_reviews(request.reviews)
+    except DeadlineExceeded:
+        raise
+    except Exception as e:
+        logger.error(f"ML analysis of chunk failed: {str(e)}", exc_info=True)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Analysis failed: {str(e)}"
+        )
+
+    return SessionResponse(session_id=session_id, reviews_received=len(session.reviews))
+
+
+@router.post("/sessions/{session_id}/finish", response_model=NLPResponse)
+async def finish_session(session_id: str):
+    """
+    Finish a session
+    
+    Computes the similarity clusters and aggregates over every chunk and
+    returns the same response as /analyze. The session is closed.
+    """
+    session = session_store.pop(session_id)
+    if session is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Session {session_id} not found or expired"
+        )
+    if not session.reviews:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="No reviews provided"
+        )
+
+    try:
+        return session.finish()
+    except DeadlineExceeded:
+        raise
+    except Exception as e:
+        logger.error(f"ML analysis of session failed: {str(e)}", exc_info=True)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Analysis failed: {str(e)}"
+        )
+
+
+@router.delete("/sessions/{session_id}")
+async def discard_session(session_id: str):
+    """Drop a session without finishing it"""
+    return {"session_id": session_id, "discarded": session_store.pop(session_id) is not None}
@@ -4,6 +4,8 @@ Health check routes
 from fastapi import APIRouter
 from datetime import datetime
 
+from common.deadline import deadline_stats
+
 router = APIRouter()
 
 
@@ -13,5 +15,6 @@ async def health_check():
     return {
         "service": "healthy",
         "ml_models_loaded": True,
-        "timestamp": datetime.utcnow().isoformat()
+        "timestamp": datetime.utcnow().isoformat(),
+        "deadlines": deadline_stats.stats()
     }
\ No newline at end of file
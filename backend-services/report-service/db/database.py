@@ -4,6 +4,7 @@ Database operations for Report Service
 from typing import Optional, Dict, Any, List
 from datetime import datetime, timedelta
 from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import UpdateOne
 import logging
 
 from config import settings
@@ -122,6 +123,128 @@ async def store_report_in_db(
         raise
 
 
+async def store_reports_bulk_in_db(reports: List[Dict[str, Any]]) -> int:
+    """
+    Store several reports in one round-trip (unordered bulk upsert)
+    
+    Existing documents keep their _id, creation time and access counters,
+    exactly like store_report_in_db.
+    
+    Args:
+        reports: Dicts with url, url_hash, report and ttl_days
+        
+    Returns:
+        Number of documents inserted or updated
+    """
+    try:
+        collection = db[settings.REPORTS_COLLECTION]
+        now = datetime.utcnow()
+        
+        # Last write wins for repeated URLs (upserts on one key must not race)
+        latest = {item["url_hash"]: item for item in reports}
+        
+        operations = []
+        for item in latest.values():
+            expires_at = now + timedelta(days=item["ttl_days"])
+            operations.append(UpdateOne(
+                {"url_hash": item["url_hash"]},
+                {
+                    "$set": {
+                        "url": item["url"],
+                        "normalized_url": normalize_url(item["url"]),
+                        "report": item["report"],
+                        "metadata.updated_at": now,
+                        "metadata.expires_at": expires_at,
+                        "metadata.ttl_days": item["ttl_days"]
+                    },
+                    "$setOnInsert": {
+                        "_id": generate_report_id(item["url_hash"], now),
+                        "metadata.created_at": now,
+                        "metadata.access_count": 0,
+                        "metadata.last_accessed": None
+                    }
+                },
+                upsert=True
+            ))
+        
+        result = await collection.bulk_write(operations, ordered=False)
+        stored = result.upserted_count + result.modified_count
+        logger.info(f"Bulk stored {stored} reports ({result.upserted_count} new)")
+        return stored
+        
+    except Exception as e:
+        logger.error(f"Failed to bulk store reports: {str(e)}")
+        raise
+
+
+async def record_accesses_in_db(accesses: Dict[str, int]) -> int:
+    """
+    Add reads served outside this service to the access counters
+    
+    Args:
+        accesses: URL hash -> number of reads
+        
+    Returns:
+        Number of reports updated
+    """
+    try:
+        collection = db[settings.REPORTS_COLLECTION]
+        now = datetime.utcnow()
+        
+        operations = [
+            UpdateOne(
+                {"url_hash": url_hash},
+                {
+                    "$inc": {"metadata.access_count": count},
+                    "$set": {"metadata.last_accessed": now}
+                }
+            )
+            for url_hash, count in accesses.items()
+        ]
+        
+        result = await collection.bulk_write(operations, ordered=False)
+        return result.modified_count
+        
+    except Exception as e:
+        logger.error(f"Failed to record accesses: {str(e)}")
+        raise
+
+
+async def get_prewarm_candidates(
+    expiring_within: timedelta,
+    limit: int,
+    min_access_count: int
+) -> List[Dict[str, Any]]:
+    """
+    Most-accessed reports that expire within the given time
+    
+    Args:
+        expiring_within: How soon the reports must expire
+        limit: Maximum number of reports
+        min_access_count: Reports read fewer times are skipped
+        
+    Returns:
+        Report documents, most accessed first
+    """
+    try:
+        collection = db[settings.REPORTS_COLLECTION]
+        now = datetime.utcnow()
+        
+        cursor = collection.find(
+            {
+                "metadata.expires_at": {"$gt": now, "$lte": now + expiring_within},
+                "metadata.access_count": {"$gte": min_access_count}
+            },
+            {"url": 1, "metadata": 1}
+        ).sort("metadata.access_count", -1).limit(limit)
+        
+        return await cursor.to_list(length=limit)
+        
+    except Exception as e:
+        logger.error(f"Failed to get prewarm candidates: {str(e)}")
+        raise
+
+
 async def get_report_from_db(url_hash: str) -> Optional[Dict[str, Any]]:
     """
     Retrieve report from MongoDB by URL hash
@@ -2,7 +2,7 @@
 Pydantic models for Report Service
 """
 from pydantic import BaseModel, Field
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional
 from datetime import datetime
 
 
@@ -26,6 +26,45 @@ class StoreReportRequest(BaseModel):
         }
 
 
+class StoreReportBatchRequest(BaseModel):
+    """Request model for storing several reports in one call"""
+    reports: List[StoreReportRequest] = Field(..., min_length=1)
+
+
+class StoreReportBatchResponse(BaseModel):
+    """Response model for a batch store"""
+    success: bool
+    stored: int
+    url_hashes: List[str]
+    message: str
+
+
+class RecordAccessRequest(BaseModel):
+    """Request model for recording report reads served elsewhere (gateway cache hits)"""
+    accesses: Dict[str, int] = Field(..., min_length=1)  # URL -> number of reads
+
+
+class RecordAccessResponse(BaseModel):
+    """Response model for recorded accesses"""
+    success: bool
+    updated: int
+
+
+class PrewarmCandidate(BaseModel):
+    """A popular report close to expiry"""
+    url: str
+    access_count: int
+    expires_at: str
+    last_accessed: Optional[str] = None
+
+
+class PrewarmCandidatesResponse(BaseModel):
+    """Response model for pre-warming candidates"""
+    success: bool
+    total: int
+    candidates: List[PrewarmCandidate]
+
+
 class StoreReportResponse(BaseModel):
     """Response model for storing a report"""
     success: bool
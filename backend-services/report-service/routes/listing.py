@@ -2,12 +2,12 @@
 Report listing and browsing endpoints
 """
 from fastapi import APIRouter, HTTPException, status
-from datetime import datetime
+from datetime import datetime, timedelta
 import logging
 
-from models import ReportListItem
+from models import ReportListItem, PrewarmCandidate, PrewarmCandidatesResponse
 from config import settings
-from db.database import get_all_reports
+from db.database import get_all_reports, get_prewarm_candidates
 
 logger = logging.getLogger(__name__)
 
@@ -80,4 +80,62 @@ async def list_reports(
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to list reports: {str(e)}"
-        )
\ No newline at end of file
+        )
+
+
+@router.get("/prewarm-candidates", response_model=PrewarmCandidatesResponse)
+async def list_prewarm_candidates(
+    expiring_within_hours: float = 24.0,
+    limit: int = 20,
+    min_access_count: int = 1
+):
+    """
+    List the most-accessed reports that are about to expire
+    
+    Used by the gateway's pre-warming scheduler, which re-runs these
+    analyses before they expire so popular products stay cached.
+    
+    Args:
+        expiring_within_hours: Only reports expiring within this many hours (default: 24)
+        limit: Maximum number of reports to return (max 100, default: 20)
+        min_access_count: Skip reports read fewer times (default: 1)
+        
+    Returns:
+        Candidates, most accessed first
+        
+    Example:
+        GET /reports/prewarm-candidates?expiring_within_hours=12&limit=10
+    """
+    try:
+        limit = min(limit, settings.MAX_PAGE_SIZE)
+        
+        documents = await get_prewarm_candidates(
+            timedelta(hours=expiring_within_hours),
+            limit,
+            min_access_count
+        )
+        
+        candidates = []
+        for doc in documents:
+            metadata = doc["metadata"]
+            last_accessed = metadata.get("last_accessed")
+            
+            candidates.append(PrewarmCandidate(
+                url=doc["url"],
+                access_count=metadata.get("access_count", 0),
+                expires_at=metadata["expires_at"].isoformat(),
+                last_accessed=last_accessed.isoformat() if last_accessed else None
+            ))
+        
+        return PrewarmCandidatesResponse(
+            success=True,
+            total=len(candidates),
+            candidates=candidates
+        )
+        
+    except Exception as e:
+        logger.error(f"Failed to list prewarm candidates: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to list prewarm candidates: {str(e)}"
+        )
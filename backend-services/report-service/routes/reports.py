@@ -8,20 +8,32 @@ import logging
 from models import (
     StoreReportRequest,
     StoreReportResponse,
+    StoreReportBatchRequest,
+    StoreReportBatchResponse,
+    RecordAccessRequest,
+    RecordAccessResponse,
     GetReportResponse
 )
 from config import settings
 from utils.utils import generate_url_hash
 from db.database import (
     store_report_in_db,
+    store_reports_bulk_in_db,
+    record_accesses_in_db,
     get_report_from_db,
     get_report_by_id,
     delete_report_from_db
 )
+from common.negotiation import MsgPackRoute, NegotiatedResponse
 
 logger = logging.getLogger(__name__)
 
-router = APIRouter(prefix="/reports", tags=["Reports"])
+router = APIRouter(
+    prefix="/reports",
+    tags=["Reports"],
+    route_class=MsgPackRoute,
+    default_response_class=NegotiatedResponse
+)
 
 
 @router.post("/store", response_model=StoreReportResponse)
@@ -67,6 +79,81 @@ async def store_report(request: StoreReportRequest):
         )
 
 
+@router.post("/store/batch", response_model=StoreReportBatchResponse)
+async def store_reports_batch(request: StoreReportBatchRequest):
+    """
+    Store several analysis reports in a single database round-trip
+    
+    Same semantics as /store for each report: existing reports for a URL
+    are replaced and keep their report ID. Used by the gateway's
+    background report writer.
+    
+    Args:
+        request: List of reports (URL, report content, optional TTL)
+        
+    Returns:
+        Number of reports stored and their URL hashes
+    """
+    try:
+        items = [
+            {
+                "url": item.url,
+                "url_hash": generate_url_hash(item.url),
+                "report": item.report,
+                "ttl_days": item.ttl_days or settings.DEFAULT_TTL_DAYS
+            }
+            for item in request.reports
+        ]
+        
+        stored = await store_reports_bulk_in_db(items)
+        
+        return StoreReportBatchResponse(
+            success=True,
+            stored=stored,
+            url_hashes=[item["url_hash"] for item in items],
+            message=f"Stored {len(items)} reports"
+        )
+        
+    except Exception as e:
+        logger.error(f"Failed to store report batch: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to store report batch: {str(e)}"
+        )
+
+
+@router.post("/access", response_model=RecordAccessResponse)
+async def record_accesses(request: RecordAccessRequest):
+    """
+    Record reads of reports that were served from a cache
+    
+    The gateway answers most requests from its caches, so it reports those
+    reads here periodically. They count towards access_count exactly like
+    /get, which drives pre-warming of popular reports.
+    
+    Args:
+        request: URL -> number of reads since the last call
+        
+    Returns:
+        Number of reports updated (unknown URLs are ignored)
+    """
+    try:
+        accesses = {}
+        for url, count in request.accesses.items():
+            url_hash = generate_url_hash(url)
+            accesses[url_hash] = accesses.get(url_hash, 0) + count
+        
+        updated = await record_accesses_in_db(accesses)
+        return RecordAccessResponse(success=True, updated=updated)
+        
+    except Exception as e:
+        logger.error(f"Failed to record accesses: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to record accesses: {str(e)}"
+        )
+
+
 @router.get("/get", response_model=GetReportResponse)
 async def get_report(url: str):
     """
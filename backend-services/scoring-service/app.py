@@ -5,6 +5,7 @@ Combines NLP, Behavior, and Statistical signals into final trust score
 from fastapi import FastAPI
 import logging
 
+from common.deadline import DeadlineMiddleware, DeadlineExceeded, deadline_exceeded_handler
 from routes import scoring, health
 
 # Configure logging
@@ -18,6 +19,10 @@ app = FastAPI(
     description="Final trust score calculation and explainability"
 )
 
+# Abort work for callers that have given up (X-Deadline-Ms from the gateway)
+app.add_middleware(DeadlineMiddleware)
+app.add_exception_handler(DeadlineExceeded, deadline_exceeded_handler)
+
 # Include routers
 app.include_router(scoring.router, tags=["Scoring"])
 app.include_router(health.router, tags=["Health"])
@@ -68,6 +68,62 @@ class TrustScoreCalculator:
         
         return int(trust_score), breakdown, confidence
     
+    def calculate_quick(
+        self,
+        nlp_results: NLPResults,
+        behavior_results: BehaviorResults,
+        product_metadata: ProductMetadata
+    ) -> Tuple[int, ScoreBreakdown, float]:
+        """
+        Calculate a provisional trust score (0-100) from the quick analyses
+        
+        Uses the statistical score of the rating distribution and the share
+        of reviews whose VADER sentiment contradicts their rating. Confidence
+        is capped at QUICK_MAX_CONFIDENCE.
+        
+        Args:
+            nlp_results: Quick NLP results (sentiment aggregates)
+            behavior_results: Quick behavior results (rating distribution, verification rate)
+            product_metadata: Product information
+        
+        Returns:
+            Tuple of (trust_score, breakdown, confidence)
+        """
+        sentiment_score = nlp_results.aggregate_metrics.get("sentiment_rating_mismatch_percentage", 0)
+        statistical_score = self._calculate_statistical_score(
+            behavior_results.rating_distribution,
+            product_metadata
+        )
+        
+        weighted_fake_score = (
+            sentiment_score * settings.QUICK_SENTIMENT_WEIGHT +
+            statistical_score * settings.QUICK_STATISTICAL_WEIGHT
+        )
+        trust_score = max(0, min(100, 100 - weighted_fake_score))
+        
+        breakdown = ScoreBreakdown(
+            nlp_contribution=round(sentiment_score * settings.QUICK_SENTIMENT_WEIGHT, 2),
+            behavior_contribution=0.0,
+            statistical_contribution=round(statistical_score * settings.QUICK_STATISTICAL_WEIGHT, 2),
+            final_score=round(trust_score, 2)
+        )
+        
+        # Sample size and verification rate; there is no second signal to agree with
+        confidence = settings.BASE_CONFIDENCE
+        total_reviews = behavior_results.total_reviews or 0
+        if total_reviews >= settings.LARGE_SAMPLE_SIZE:
+            confidence += 0.2
+        elif total_reviews >= settings.MEDIUM_SAMPLE_SIZE:
+            confidence += 0.15
+        elif total_reviews >= settings.SMALL_SAMPLE_SIZE_CONF:
+            confidence += 0.1
+        
+        verification_rate = behavior_results.aggregate_metrics.get("verification_rate", 0)
+        if verification_rate > settings.HIGH_VERIFICATION_RATE:
+            confidence += 0.1
+        
+        return int(trust_score), breakdown, min(settings.QUICK_MAX_CONFIDENCE, round(confidence, 2))
+    
     def _calculate_statistical_score(
         self,
         rating_dist: Dict[str, Any],
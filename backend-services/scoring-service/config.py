@@ -13,6 +13,11 @@ class Settings(BaseSettings):
     BEHAVIOR_WEIGHT: float = 0.3  # 30% weight to behavioral patterns
     STATISTICAL_WEIGHT: float = 0.2  # 20% weight to statistical anomalies
     
+    # Quick (provisional) score: statistical anomalies + VADER sentiment-rating mismatch
+    QUICK_STATISTICAL_WEIGHT: float = 0.6
+    QUICK_SENTIMENT_WEIGHT: float = 0.4
+    QUICK_MAX_CONFIDENCE: float = 0.6  # Provisional scores never claim more than this
+    
     # Statistical Thresholds
     FIVE_STAR_CRITICAL: float = 0.8  # >80% five stars is very suspicious
     FIVE_STAR_WARNING: float = 0.7  # >70% five stars is suspicious
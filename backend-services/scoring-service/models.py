@@ -63,4 +63,5 @@ class ScoreResponse(BaseModel):
     total_reviews_analyzed: int
     recommendation: str
     confidence: float  # 0-1 (confidence in the assessment)
-    timestamp: str
\ No newline at end of file
+    timestamp: str
+    analysis_depth: str = "full"  # full, or quick (provisional score from cheap signals)
\ No newline at end of file
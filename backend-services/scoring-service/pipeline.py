@@ -16,6 +16,7 @@ from components import (
     RecommendationEngine,
     RiskClassifier
 )
+from common.deadline import DeadlineGuard
 
 logger = logging.getLogger(__name__)
 
@@ -49,7 +50,11 @@ class ScoringPipeline:
         
         logger.info("Generating final trust score...")
         
+        # Abandon the score once the request's deadline has passed
+        guard = DeadlineGuard(2)
+        
         # Calculate trust score
+        guard.check(0)
         trust_score, breakdown, confidence = self.calculator.calculate(
             nlp_results,
             behavior_results,
@@ -57,6 +62,7 @@ class ScoringPipeline:
         )
         
         # Generate insights
+        guard.check(1)
         insights = self.insight_generator.generate(
             nlp_results,
             behavior_results,
@@ -91,4 +97,48 @@ class ScoringPipeline:
             recommendation=recommendation,
             confidence=confidence,
             timestamp=datetime.utcnow().isoformat()
-        )
\ No newline at end of file
+        )
+    
+    def generate_quick_score(
+        self,
+        nlp_results: NLPResults,
+        behavior_results: BehaviorResults,
+        product_metadata: ProductMetadata
+    ) -> ScoreResponse:
+        """
+        Generate a provisional score from the quick NLP and behavior analyses
+        
+        Args:
+            nlp_results: Quick NLP results
+            behavior_results: Quick behavior results
+            product_metadata: Product information
+        
+        Returns:
+            Score response labelled with analysis_depth "quick"
+        """
+        trust_score, breakdown, confidence = self.calculator.calculate_quick(
+            nlp_results,
+            behavior_results,
+            product_metadata
+        )
+        
+        # Only the insights the quick signals support (rating and sentiment ones)
+        insights = self.insight_generator.generate(nlp_results, behavior_results, trust_score)
+        risk_level = self.risk_classifier.classify(trust_score)
+        recommendation = self.recommender.generate_recommendation(trust_score, risk_level)
+        
+        logger.info(f"Quick score generated: Trust={trust_score}, Confidence={confidence}")
+        
+        return ScoreResponse(
+            success=True,
+            trust_score=trust_score,
+            fake_reviews_percentage=round(100 - trust_score, 1),
+            risk_level=risk_level,
+            score_breakdown=breakdown,
+            key_insights=insights,
+            total_reviews_analyzed=behavior_results.total_reviews,
+            recommendation=recommendation,
+            confidence=confidence,
+            timestamp=datetime.utcnow().isoformat(),
+            analysis_depth="quick"
+        )
@@ -4,6 +4,8 @@ Health check routes
 from fastapi import APIRouter
 from datetime import datetime
 
+from common.deadline import deadline_stats
+
 router = APIRouter()
 
 
@@ -12,5 +14,6 @@ async def health_check():
     """Detailed health check"""
     return {
         "service": "healthy",
-        "timestamp": datetime.utcnow().isoformat()
+        "timestamp": datetime.utcnow().isoformat(),
+        "deadlines": deadline_stats.stats()
     }
\ No newline at end of file
@@ -6,9 +6,11 @@ import logging
 
 from models import ScoreRequest, ScoreResponse
 from pipeline import ScoringPipeline
+from common.negotiation import MsgPackRoute, NegotiatedResponse
+from common.deadline import DeadlineExceeded
 
 logger = logging.getLogger(__name__)
-router = APIRouter()
+router = APIRouter(route_class=MsgPackRoute, default_response_class=NegotiatedResponse)
 
 
 @router.post("/calculate-score", response_model=ScoreResponse)
@@ -52,11 +54,35 @@ async def calculate_score(request: dict):  # ← Changed to dict temporarily
         
         return result
         
-    except HTTPException:
+    except (HTTPException, DeadlineExceeded):
         raise
     except Exception as e:
         logger.error(f"Scoring failed: {str(e)}", exc_info=True)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Scoring failed: {str(e)}"
-        )
\ No newline at end of file
+        )
+
+
+@router.post("/calculate-score/quick", response_model=ScoreResponse)
+async def calculate_quick_score(request: ScoreRequest):
+    """
+    Provisional trust score from the quick NLP and behavior analyses
+
+    Combines the statistical score of the rating distribution with the share
+    of reviews whose sentiment contradicts their rating. The response is
+    labelled analysis_depth "quick" and its confidence is capped.
+    """
+    try:
+        pipeline = ScoringPipeline()
+        return pipeline.generate_quick_score(
+            request.nlp_results,
+            request.behavior_results,
+            request.product_metadata
+        )
+    except Exception as e:
+        logger.error(f"Quick scoring failed: {str(e)}", exc_info=True)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Quick scoring failed: {str(e)}"
+        )
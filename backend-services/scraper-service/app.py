@@ -6,6 +6,7 @@ from fastapi import FastAPI
 import logging
 
 from config import settings
+from common.deadline import DeadlineMiddleware, DeadlineExceeded, deadline_exceeded_handler
 from routes import scraper, health, platforms
 
 # Configure logging
@@ -19,6 +20,10 @@ app = FastAPI(
     description="Smart review extraction: Manual scrapers for Amazon/Flipkart, AI-powered for others"
 )
 
+# Abort work for callers that have given up (X-Deadline-Ms from the gateway)
+app.add_middleware(DeadlineMiddleware)
+app.add_exception_handler(DeadlineExceeded, deadline_exceeded_handler)
+
 # Include routers
 app.include_router(scraper.router, tags=["Scraper"])
 app.include_router(health.router, tags=["Health"])
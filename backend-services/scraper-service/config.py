@@ -14,6 +14,10 @@ class Settings(BaseSettings):
     REQUEST_TIMEOUT: float = 30.0
     USE_MOCK_SCRAPER: bool = os.getenv("USE_MOCK_SCRAPER", "false").lower() == "true"
     
+    # Streaming (/scrape/stream): reviews are sent in chunks as they are scraped
+    STREAM_CHUNK_SIZE: int = 25
+    MOCK_PAGE_DELAY_SECONDS: float = 0.0  # Simulated fetch time per page of mock reviews
+    
     # API Keys for LLM Scraping
     SCRAPINGBEE_API_KEY: str = os.getenv("SCRAPINGBEE_API_KEY", "YOUR_API_KEY_HERE")
     OPENAI_API_KEY: str = os.getenv("OPENAI_API_KEY", "YOUR_API_KEY_HERE")
@@ -1,7 +1,7 @@
 """
 Pydantic models for request/response validation
 """
-from pydantic import BaseModel, validator
+from pydantic import BaseModel, Field, validator
 from typing import Optional, List, Dict, Any
 from urllib.parse import urlparse
 
@@ -21,6 +21,10 @@ class ScrapeRequest(BaseModel):
         return v
 
 
+class ScrapeStreamRequest(ScrapeRequest):
+    chunk_size: int = Field(default=settings.STREAM_CHUNK_SIZE, ge=1)  # Reviews per streamed chunk
+
+
 class Review(BaseModel):
     review_id: str
     reviewer_name: Optional[str] = None
@@ -5,6 +5,7 @@ from fastapi import APIRouter
 from datetime import datetime
 
 from config import settings
+from common.deadline import deadline_stats
 
 router = APIRouter()
 
@@ -24,5 +25,6 @@ async def health_check():
             "scrapingbee_configured": settings.is_scrapingbee_configured,
             "OpenAI_configured": settings.is_openai_configured,
             "max_reviews": settings.MAX_REVIEWS_TO_ANALYZE
-        }
+        },
+        "deadlines": deadline_stats.stats()
     }
\ No newline at end of file
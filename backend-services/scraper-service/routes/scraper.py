@@ -1,12 +1,18 @@
 """
 Main scraping routes with hybrid approach
 """
+from typing import AsyncIterator, Awaitable, List, Tuple
 from fastapi import APIRouter, HTTPException, status
+from fastapi.responses import StreamingResponse
 import logging
+import asyncio
+import json
+import math
 
-from models import ScrapeRequest, ScrapeResponse
+from models import ScrapeRequest, ScrapeStreamRequest, ScrapeResponse, ProductMetadata, Review
 from utils.utils import detect_platform, should_use_manual_scraper
 from config import settings
+from common.deadline import DeadlineExceeded, DeadlineGuard, deadline_stats, remaining_seconds
 from scrapers import AmazonScraper, FlipkartScraper, UniversalLLMScraper, MockScraper
 from functools import lru_cache
 from hashlib import md5
@@ -35,7 +41,7 @@ async def scrape_reviews(request: ScrapeRequest):
         if settings.USE_MOCK_SCRAPER:
             logger.info(f"Using MOCK scraper (testing mode)")
             scraper = MockScraper()
-            return await scraper.scrape(request.url, 150)
+            return await _within_deadline(scraper.scrape(request.url, 150))
         
         # Decide scraping method
         use_manual = should_use_manual_scraper(platform, True)
@@ -51,7 +57,7 @@ async def scrape_reviews(request: ScrapeRequest):
             else:
                 raise ValueError(f"Manual scraper not available for {platform}")
             
-            return await scraper.scrape(request.url, 150)
+            return await _within_deadline(scraper.scrape(request.url, 150))
         else:
             # Use LLM-powered universal scraper for other platforms
             logger.info(f"Using LLM scraper for {platform}")
@@ -70,14 +76,14 @@ async def scrape_reviews(request: ScrapeRequest):
                 )
             
             scraper = UniversalLLMScraper()
-            return await scraper.scrape(request.url, 150, platform)
+            return await _within_deadline(scraper.scrape(request.url, 150, platform))
         
     except ValueError as e:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=str(e)
         )
-    except HTTPException:
+    except (HTTPException, DeadlineExceeded):
         raise
     except Exception as e:
         logger.exception("Scraping failed with stacktrace")
@@ -108,4 +114,127 @@ async def mock_scrape_reviews(request: ScrapeRequest):
         raise HTTPException(
             status_code=500,
             detail=f"Mock scraping failed: {str(e)}"
-        )
\ No newline at end of file
+        )
+
+
+@router.post("/scrape/stream")
+async def stream_scrape_reviews(request: ScrapeStreamRequest):
+    """
+    Hybrid scraping (as /scrape) with the reviews streamed back in chunks
+    
+    The response is newline-delimited JSON, one event per line:
+    - {"type": "metadata", "platform", "scraping_method", "product_metadata"}
+    - {"type": "reviews", "reviews": [...]} per chunk of at most chunk_size reviews
+    - {"type": "done", "total_reviews_scraped", "processing_time_seconds"}
+    
+    A failure after the first line is reported as a final {"type": "error", "detail"} line.
+    The manual and LLM scrapers fetch a single page, so their reviews are
+    chunked once scraped; clients can still analyze early chunks while later
+    ones are transferred.
+    """
+    result = await scrape_reviews(request)
+    return _ndjson_response(_response_pages(result, request.chunk_size), result.scraping_method)
+
+
+@router.post("/scrape/mock/stream")
+async def mock_stream_scrape_reviews(request: ScrapeStreamRequest):
+    """
+    Mock scraping streamed page by page (same format as /scrape/stream)
+    
+    Each page of mock reviews is sent as soon as it is generated, so clients
+    can start analyzing before the whole product has been scraped.
+    """
+    logger.info(f"Mock stream scrape requested for: {request.url}")
+    max_reviews = request.max_reviews or settings.MAX_REVIEWS_TO_ANALYZE
+    scraper = MockScraper()
+    pages = scraper.scrape_pages(request.url, max_reviews, request.chunk_size)
+    total_pages = math.ceil(max_reviews / request.chunk_size)
+    return _ndjson_response(_pages_until_deadline(pages, total_pages), "mock")
+
+
+async def _within_deadline(scrape: Awaitable[ScrapeResponse]) -> ScrapeResponse:
+    """
+    Await a scrape, giving up when the request's deadline passes
+    
+    Raises:
+        DeadlineExceeded: If the scrape is still running at the deadline
+    """
+    remaining = remaining_seconds()
+    if remaining is None:
+        return await scrape
+
+    try:
+        return await asyncio.wait_for(scrape, timeout=max(0.0, remaining))
+    except asyncio.TimeoutError:
+        deadline_stats.aborted += 1
+        logger.warning("Deadline exceeded while scraping, scrape cancelled")
+        raise DeadlineExceeded("Deadline exceeded while scraping")
+
+
+async def _pages_until_deadline(
+    pages: AsyncIterator[Tuple[ProductMetadata, List[Review]]],
+    total_pages: int
+) -> AsyncIterator[Tuple[ProductMetadata, List[Review]]]:
+    """Pass pages through, without fetching further pages once the request's deadline has passed"""
+    guard = DeadlineGuard(total_pages)
+    done = 0
+    async for page in pages:
+        yield page
+        done += 1
+        if done < total_pages:
+            guard.check(done)
+
+
+async def _response_pages(
+    result: ScrapeResponse,
+    chunk_size: int
+) -> AsyncIterator[Tuple[ProductMetadata, List[Review]]]:
+    """Split a finished scrape into pages of at most chunk_size reviews"""
+    for start in range(0, len(result.reviews), chunk_size):
+        yield result.product_metadata, result.reviews[start:start + chunk_size]
+
+
+def _ndjson_response(
+    pages: AsyncIterator[Tuple[ProductMetadata, List[Review]]],
+    scraping_method: str
+) -> StreamingResponse:
+    """Stream (metadata, reviews) pages as newline-delimited JSON events"""
+
+    async def events() -> AsyncIterator[str]:
+        started = time.perf_counter()
+        total_reviews = 0
+        metadata_sent = False
+
+        try:
+            async for metadata, reviews in pages:
+                if not metadata_sent:
+                    yield _ndjson_line({
+                        "type": "metadata",
+                        "platform": metadata.platform,
+                        "scraping_method": scraping_method,
+                        "product_metadata": metadata.model_dump()
+                    })
+                    metadata_sent = True
+
+                total_reviews += len(reviews)
+                yield _ndjson_line({"type": "reviews", "reviews": [review.model_dump() for review in reviews]})
+        except DeadlineExceeded as e:
+            yield _ndjson_line({"type": "error", "detail": str(e)})
+            return
+        except Exception as e:
+            # Headers are already sent, so the failure becomes the last event
+            logger.exception("Streaming scrape failed with stacktrace")
+            yield _ndjson_line({"type": "error", "detail": f"Scraping failed: {str(e)}"})
+            return
+
+        yield _ndjson_line({
+            "type": "done",
+            "total_reviews_scraped": total_reviews,
+            "processing_time_seconds": round(time.perf_counter() - started, 2)
+        })
+
+    return StreamingResponse(events(), media_type="application/x-ndjson")
+
+
+def _ndjson_line(event: dict) -> str:
+    return json.dumps(event) + "\n"
@@ -1,12 +1,15 @@
 """
 Mock scraper for testing without actual web scraping
 """
+from typing import AsyncIterator, List, Tuple
 from datetime import datetime
 import random
+import asyncio
 import logging
 
 from models import Review, ProductMetadata, ScrapeResponse
 from utils.utils import detect_platform
+from config import settings
 
 logger = logging.getLogger(__name__)
 
@@ -20,8 +23,48 @@ class MockScraper:
         logger.info(f"[MOCK] Using mock scraper for: {url}")
         
         platform = detect_platform(url)
+        reviews = self._generate_reviews(max_reviews)
+        metadata = self._generate_metadata(platform)
         
-        # Generate mock reviews
+        processing_time = (datetime.utcnow() - start_time).total_seconds()
+        
+        return ScrapeResponse(
+            success=True,
+            platform=platform,
+            scraping_method="mock",
+            product_metadata=metadata,
+            reviews=reviews,
+            total_reviews_scraped=len(reviews),
+            sampling_strategy="mock_random",
+            processing_time_seconds=round(processing_time, 2),
+            timestamp=datetime.utcnow().isoformat()
+        )
+
+    async def scrape_pages(
+        self,
+        url: str,
+        max_reviews: int,
+        page_size: int
+    ) -> AsyncIterator[Tuple[ProductMetadata, List[Review]]]:
+        """
+        Generate mock review data one page at a time
+        
+        Yields (metadata, reviews) for pages of at most page_size reviews,
+        waiting MOCK_PAGE_DELAY_SECONDS before each page to stand in for
+        the fetch of a real review page.
+        """
+        logger.info(f"[MOCK] Using paged mock scraper for: {url}")
+        
+        metadata = self._generate_metadata(detect_platform(url))
+        reviews = self._generate_reviews(max_reviews)
+        
+        for start in range(0, len(reviews), page_size):
+            if settings.MOCK_PAGE_DELAY_SECONDS > 0:
+                await asyncio.sleep(settings.MOCK_PAGE_DELAY_SECONDS)
+            yield metadata, reviews[start:start + page_size]
+    
+    def _generate_reviews(self, max_reviews: int) -> List[Review]:
+        """Pick random sample reviews, with ratings loosely matching their tone"""
         reviews = []
         
         # Expanded sample texts with mix of genuine and fake-looking reviews
@@ -107,7 +150,10 @@ class MockScraper:
                 helpful_count=random.randint(0, 50)
             ))
         
-        metadata = ProductMetadata(
+        return reviews
+    
+    def _generate_metadata(self, platform: str) -> ProductMetadata:
+        return ProductMetadata(
             product_name="Mock Product for Testing",
             platform=platform,
             total_ratings=500,
@@ -120,17 +166,3 @@ class MockScraper:
                 "1_star": 5
             }
         )
-        
-        processing_time = (datetime.utcnow() - start_time).total_seconds()
-        
-        return ScrapeResponse(
-            success=True,
-            platform=platform,
-            scraping_method="mock",
-            product_metadata=metadata,
-            reviews=reviews,
-            total_reviews_scraped=len(reviews),
-            sampling_strategy="mock_random",
-            processing_time_seconds=round(processing_time, 2),
-            timestamp=datetime.utcnow().isoformat()
-        )
\ No newline at end of file